@@ -0,0 +1,9 @@
+"""Performance checks for NT-Bonafide that run against a scratch database.
+
+Run them as modules from the repository root, e.g.
+
+    python -m benchmarks.explain_indexes --database nt_bonafide_bench
+    python -m benchmarks.time_queries --database nt_bonafide_bench --output results.json
+    python -m benchmarks.gui_reload --baseline gui-results.json
+    python -m benchmarks.render_certificates --workers 2 4
+"""
@@ -0,0 +1,195 @@
+"""Assert that the hot Database queries are served by indexes at scale.
+
+Fills a scratch database with synthetic users, submissions and notifications
+(1M rows each by default), runs every read path and transition of
+mk.Database once while recording the SQL it sends, and EXPLAINs each
+statement. A sequential scan of any CHECKED_TABLES table fails the check,
+except for the queries listed in FULL_SCAN_ALLOWED, which aggregate the whole
+table by design.
+
+    python -m benchmarks.explain_indexes --database nt_bonafide_bench [--rows 1000000]
+
+The exit status is non-zero when any query regresses to a sequential scan.
+Never point this at a production database: it inserts and updates rows.
+"""
+import argparse
+import json
+import sys
+
+import psycopg2
+import psycopg2.extensions
+
+from mk import SUBMISSION_STAGES_BACKFILL, Database
+
+# Statements that are not data queries (pool health checks, watermarks, events)
+IGNORED_PREFIXES = ("SELECT 1", "SELECT LOCALTIMESTAMP", "SELECT pg_notify", "SELECT MAX(version)")
+CHECKED_TABLES = ("submissions", "submission_stages", "notifications", "unread_counts")
+
+# Whole-table aggregates: a sequential scan is the right plan for these
+FULL_SCAN_ALLOWED = {"get_dashboard_stats (admin)"}
+
+
+class RecordingCursor(psycopg2.extensions.cursor):
+    """Cursor that remembers every statement it executes"""
+    log = []
+
+    def execute(self, query, vars=None):
+        RecordingCursor.log.append((query, vars))
+        return super().execute(query, vars)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=5432)
+    parser.add_argument("--database", required=True, help="scratch database to fill (must already exist)")
+    parser.add_argument("--user", default="postgres")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="submissions and notifications to generate")
+    parser.add_argument("--users", type=int, default=10_000, help="student accounts to spread rows over")
+    return parser.parse_args(argv)
+
+
+def populate(conn, rows: int, users: int):
+    """Generate synthetic data server-side unless the database is already filled"""
+    cur = conn.cursor()
+    cur.execute("SELECT COUNT(*) FROM submissions")
+    if cur.fetchone()[0] >= rows:
+        return
+    print(f"Generating {users} users and {rows} submissions/notifications...")
+    cur.execute("""
+        INSERT INTO users (username, password, role, stage)
+        SELECT 'bench_user_' || g, 'benchpass', 'user', NULL
+        FROM generate_series(1, %s) g
+        ON CONFLICT (username) DO NOTHING
+    """, (users,))
+    # 40% pending spread over the stages, 40% approved (half processed), 20% rejected
+    cur.execute("""
+        INSERT INTO submissions (user_id, name, reg_number, reason, status, approval_stage,
+                                 process_completed, created_at, updated_at)
+        SELECT u.id, 'Student ' || g, 'REG' || g, 'Bonafide certificate for scholarship application',
+               CASE WHEN g %% 5 < 2 THEN 'Pending' WHEN g %% 5 < 4 THEN 'Approved' ELSE 'Rejected' END,
+               CASE WHEN g %% 5 < 2 THEN 1 + g %% 4 ELSE 4 END,
+               g %% 5 = 3,
+               now() - make_interval(secs => %s - g),
+               now() - make_interval(secs => %s - g)
+        FROM generate_series(1, %s) g
+        JOIN users u ON u.username = 'bench_user_' || (1 + g %% %s)
+    """, (rows, rows, rows, users))
+    cur.execute(SUBMISSION_STAGES_BACKFILL)
+    cur.execute("""
+        INSERT INTO notifications (user_id, submission_id, message, is_read)
+        SELECT user_id, id, 'Your request has been submitted and is under review at Stage 1.', id %% 10 <> 0
+        FROM submissions
+        ORDER BY id
+        LIMIT %s
+    """, (rows,))
+    conn.commit()
+
+
+def analyze(config: dict):
+    conn = psycopg2.connect(**config)
+    conn.autocommit = True
+    conn.cursor().execute("VACUUM ANALYZE")
+    conn.close()
+
+
+def cases(db: Database, conn):
+    """(label, callable) for every query path worth guarding"""
+    cur = conn.cursor()
+    cur.execute("SELECT id FROM users WHERE username = 'bench_user_1'")
+    user_id = cur.fetchone()[0]
+    cur.execute("SELECT MAX(id) FROM submissions")
+    middle_id = cur.fetchone()[0] // 2
+    cur.execute("SELECT id FROM notifications WHERE user_id = %s LIMIT 1", (user_id,))
+    notification_id = cur.fetchone()[0]
+    cur.execute("SELECT submission_id FROM submission_stages WHERE state = 'ready' AND stage = 1 "
+                "ORDER BY submission_id DESC LIMIT 2")
+    pending_ids = [row[0] for row in cur.fetchall()]
+    cur.execute("SELECT LOCALTIMESTAMP - interval '1 minute'")
+    recently = cur.fetchone()[0]
+    conn.commit()
+
+    student = {'id': user_id, 'role': 'user', 'stage': None}
+    admin = {'id': None, 'role': 'admin', 'stage': 1}
+
+    def stream(status):
+        s = db.open_status_stream(status)
+        try:
+            s.fetch(200)
+        finally:
+            s.close()
+
+    return [
+        ("get_pending_for_stage", lambda: db.get_pending_for_stage(1, limit=101)),
+        ("get_pending_for_stage (keyset page)", lambda: db.get_pending_for_stage(1, after_id=middle_id, limit=101)),
+        ("get_approved_for_stage4_admin", lambda: db.get_approved_for_stage4_admin(limit=101)),
+        ("get_approved_for_stage4_admin (keyset page)", lambda: db.get_approved_for_stage4_admin(after_id=middle_id, limit=101)),
+        ("get_by_status", lambda: db.get_by_status("Rejected", limit=101)),
+        ("get_by_status (keyset page)", lambda: db.get_by_status("Rejected", after_id=middle_id, limit=101)),
+        ("open_status_stream", lambda: stream("Approved")),
+        ("get_user_submissions", lambda: db.get_user_submissions(user_id, limit=101)),
+        ("get_submission", lambda: db.get_submission(middle_id)),
+        ("get_submission_changes", lambda: db.get_submission_changes(recently)),
+        ("get_dashboard_stats (student)", lambda: db.get_dashboard_stats(student)),
+        ("get_dashboard_stats (admin)", lambda: db.get_dashboard_stats(admin)),
+        ("get_user_notifications_with_status", lambda: db.get_user_notifications_with_status(user_id)),
+        ("get_user_notifications", lambda: db.get_user_notifications(user_id)),
+        ("get_unread_count", lambda: db.get_unread_count(user_id)),
+        ("mark_notification_read", lambda: db.mark_notification_read(notification_id)),
+        ("approve_many", lambda: db.approve_many(pending_ids[:1], 1)),
+        ("reject_many", lambda: db.reject_many(pending_ids[1:], 1)),
+        ("mark_process_completed_many", lambda: db.mark_process_completed_many([middle_id])),
+    ]
+
+
+def seq_scans(plan: dict):
+    """Yield the checked tables a plan tree reads with a sequential scan"""
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in CHECKED_TABLES:
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", ()):
+        yield from seq_scans(child)
+
+
+def explain(conn, query, vars):
+    cur = conn.cursor()
+    cur.execute("EXPLAIN (FORMAT JSON) " + cur.mogrify(query, vars).decode())
+    plan = cur.fetchone()[0]
+    conn.rollback()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    config = {'host': args.host, 'port': args.port, 'database': args.database,
+              'user': args.user, 'password': args.password}
+
+    db = Database(dict(config, cursor_factory=RecordingCursor))
+    conn = psycopg2.connect(**config)
+    try:
+        populate(conn, args.rows, args.users)
+        analyze(config)
+
+        failures = 0
+        for label, run in cases(db, conn):
+            RecordingCursor.log.clear()
+            run()
+            statements = [(q, v) for q, v in RecordingCursor.log
+                          if not q.lstrip().startswith(IGNORED_PREFIXES)]
+            scanned = sorted({table for q, v in statements for table in seq_scans(explain(conn, q, v))})
+            if scanned and label not in FULL_SCAN_ALLOWED:
+                failures += 1
+                print(f"FAIL  {label}: sequential scan on {', '.join(scanned)}")
+            else:
+                print(f"ok    {label}")
+        print(f"{failures} regression(s)" if failures else "All queries use indexes")
+        return 1 if failures else 0
+    finally:
+        conn.close()
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+"""Time how long the MainApp tables take to load and paint 1k/10k/50k rows.
+
+Runs headless on Qt's offscreen platform against a CannedDatabase: row
+templates are captured once from a MemoryDatabase filled by
+benchmarks.synthetic, then replicated to the requested size, so the timings
+measure models, views and delegates rather than queries. Each table is
+opened once through its MainApp entry point, which builds its page, then
+reloaded --repeat times; pages are sized to hold every row, status tables are
+scrolled to the end of their stream, and the window is rendered after each
+load. Per view and size the report has wall time, peak RSS and the number of
+live QObjects, plus each role's login-to-usable-window time.
+
+    python -m benchmarks.gui_reload [--sizes 1000 10000 50000] [--baseline previous.json]
+
+The exit status is non-zero when the object count grows with the row count
+(a widget per row crept back in), when startup exceeds
+MainApp.STARTUP_BUDGET_MS, or when --baseline is given and wall time or
+memory regress beyond --tolerance.
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+from datetime import datetime
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QObject
+from PyQt5.QtWidgets import QApplication
+
+from benchmarks import synthetic
+from benchmarks.report import summarize, write_json
+from mk import KeysetStream, MainApp, MemoryDatabase, StorageBackend
+
+VIEWS = ("inbox", "my_requests", "pending", "process_done", "status:Approved", "status:Rejected")
+# QObjects a reload may leave behind regardless of size (signal helpers, runnables)
+MAX_OBJECT_GROWTH = 25
+TIMEOUT = 120.0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--repeat", type=int, default=3, help="reloads per view and size")
+    parser.add_argument("--output", default="gui-benchmark-results.json")
+    parser.add_argument("--baseline", help="earlier --output file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="allowed fractional regression over the baseline (0.5 = 50%%)")
+    return parser.parse_args(argv)
+
+
+def peak_rss_kb() -> int:
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage // 1024 if sys.platform == "darwin" else usage  # bytes on macOS
+
+
+def qobject_count(window) -> int:
+    return len(window.findChildren(QObject))
+
+
+def replicate(rows, count: int):
+    """count rows cycled from templates, with fresh ids in descending order"""
+    return [(count - n, *rows[n % len(rows)][1:]) for n in range(count)]
+
+
+def capture_templates():
+    """Real row shapes for every table, from a small synthetic data set"""
+    db = MemoryDatabase()
+    try:
+        synthetic.load(db, users=20, submissions=4000, notifications=4000)
+        student = db.get_user(f"{synthetic.USERNAME_PREFIX}1", "benchpass")
+        final_stage = db.router.workflows[db.router.default_workflow_id]['final_stage']
+        stream = db.open_status_stream("Approved")
+        approved = stream.fetch(500)
+        stream.close()
+        stream = db.open_status_stream("Rejected")
+        rejected = stream.fetch(500)
+        stream.close()
+        return {
+            'inbox': db.get_user_notifications_with_status(student['id'], limit=500),
+            'my_requests': db.get_user_submissions(student['id'], limit=500),
+            'pending': db.get_pending_for_stage(final_stage, limit=500),
+            'process_done': db.get_approved_for_stage4_admin(limit=500),
+            'status:Approved': approved,
+            'status:Rejected': rejected,
+            'stats:user': db.get_dashboard_stats(student),
+            'stats:admin': db.get_dashboard_stats({'id': None, 'role': 'admin', 'stage': final_stage}),
+            'router': db.router,
+        }
+    finally:
+        db.close()
+
+
+class CannedDatabase(StorageBackend):
+    """StorageBackend that answers every read from prepared rows, without SQL"""
+    NAME = "canned rows"
+
+    def __init__(self, templates: dict, size: int):
+        super().__init__()
+        self.templates = templates
+        self._router = templates['router']
+        self.rows = {view: replicate(templates[view], size) for view in VIEWS}
+
+    def _page(self, view: str, after_id=None, limit=None):
+        rows = self.rows[view]
+        start = 0 if after_id is None else len(rows) - after_id + 1
+        return rows[start:start + limit] if limit is not None else rows[start:]
+
+    def get_user_notifications_with_status(self, user_id: int, limit: int = 50):
+        return self.rows['inbox']  # Every row, to measure the inbox at this size
+
+    def get_user_submissions(self, user_id: int, after_id: int = None, limit: int = None):
+        return self._page('my_requests', after_id, limit)
+
+    def get_pending_for_stage(self, stage: int, after_id: int = None, limit: int = None):
+        return self._page('pending', after_id, limit)
+
+    def get_approved_for_stage4_admin(self, after_id: int = None, limit: int = None, workflow_ids=None):
+        return self._page('process_done', after_id, limit)
+
+    def open_status_stream(self, status: str):
+        return KeysetStream(lambda after_id, limit: self._page(f"status:{status}", after_id, limit))
+
+    def get_dashboard_stats(self, user: dict) -> dict:
+        return self.templates['stats:user' if user['role'] == 'user' else 'stats:admin']
+
+    def get_unread_count(self, user_id: int):
+        return 0
+
+    def get_submission_changes(self, since=None, limit: int = 1000):
+        return [], datetime.now()
+
+    def pool_stats(self) -> dict:
+        return {'backend': self.NAME}
+
+    def close(self):
+        pass
+
+
+def wait_until(app: QApplication, done):
+    deadline = time.monotonic() + TIMEOUT
+    while not done():
+        if time.monotonic() > deadline:
+            raise TimeoutError("table did not finish loading")
+        app.processEvents()
+        time.sleep(0.0005)
+
+
+def load_view(app: QApplication, window: MainApp, view: str):
+    """Open a view the way its sidebar button does and wait until every row is shown"""
+    if view.startswith("status:"):
+        (window.open_approved if view == "status:Approved" else window.open_rejected)()
+        table = window.tbl_approved if view == "status:Approved" else window.tbl_rejected
+        model = table.model()
+
+        def drained():
+            # Scrolling to the bottom keeps asking for the next batch
+            if model.canFetchMore():
+                model.fetchMore()
+            return model.complete
+        wait_until(app, drained)
+    else:
+        opener = {'inbox': window.open_inbox, 'my_requests': window.open_my_requests,
+                  'pending': window.open_pending, 'process_done': window.open_process_done}[view]
+        opener()
+        wait_until(app, lambda: not window.executor.is_pending(view))
+    window.grab()  # Paint the visible page once
+
+
+def measure(app: QApplication, templates: dict, size: int, repeat: int):
+    """Per-view results and per-role startup times (ms) at one table size"""
+    class SizedMainApp(MainApp):
+        PAGE_SIZE = size  # One page holds every row
+
+    db = CannedDatabase(templates, size)
+    users = {
+        'user': {'id': 1, 'username': "bench_student", 'role': "user", 'stage': None},
+        'admin': {'id': 2, 'username': "bench_admin", 'role': "admin",
+                  'stage': db.router.workflows[db.router.default_workflow_id]['final_stage']},
+    }
+    results = {}
+    startup = {}
+    for role, user in users.items():
+        window = SizedMainApp(db, user, started_at=time.perf_counter())
+        window.show()
+        wait_until(app, lambda: window.startup_report['usable_ms'] is not None)
+        startup[role] = round(window.startup_report['usable_ms'], 1)
+        for view in VIEWS:
+            if (view in ("inbox", "my_requests")) != (role == "user"):
+                continue
+            # The first open also builds the page; reloads are measured after it
+            started = time.perf_counter()
+            load_view(app, window, view)
+            first_load_ms = (time.perf_counter() - started) * 1000
+
+            samples = []
+            objects_before = qobject_count(window)
+            rss_before = peak_rss_kb()
+            for _ in range(repeat):
+                started = time.perf_counter()
+                load_view(app, window, view)
+                samples.append(time.perf_counter() - started)
+            stats = summarize(samples, size * repeat)
+            stats['first_load_ms'] = round(first_load_ms, 3)
+            stats['peak_rss_kb'] = peak_rss_kb()
+            stats['peak_rss_growth_kb'] = stats['peak_rss_kb'] - rss_before
+            stats['qobjects'] = qobject_count(window)
+            stats['qobject_growth'] = stats['qobjects'] - objects_before
+            results[view] = stats
+        window.executor.shutdown()
+        window.refresh_timer.stop()
+        window.hide()
+        window.deleteLater()
+        app.processEvents()
+    return results, startup
+
+
+def regressions(results: dict, startup: dict, baseline: dict, tolerance: float):
+    """Messages for every measurement worse than allowed"""
+    for size, roles in startup.items():
+        for role, usable_ms in roles.items():
+            if usable_ms > MainApp.STARTUP_BUDGET_MS:
+                yield f"startup ({role}) @ {size}: {usable_ms} ms > {MainApp.STARTUP_BUDGET_MS} ms"
+    for size, views in results.items():
+        for view, stats in views.items():
+            if stats['qobject_growth'] > MAX_OBJECT_GROWTH:
+                yield f"{view} @ {size}: {stats['qobject_growth']} QObjects created per reload"
+            before = baseline.get(size, {}).get(view)
+            if before is None:
+                continue
+            for metric in ("p50_ms", "peak_rss_growth_kb"):
+                # Small absolute floors keep timer and allocator noise from failing the run
+                floor = 5.0 if metric == "p50_ms" else 4096
+                allowed = max(before[metric] * (1 + tolerance), before[metric] + floor)
+                if stats[metric] > allowed:
+                    yield f"{view} @ {size}: {metric} {stats[metric]} > {allowed:.1f} (baseline {before[metric]})"
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    app = QApplication.instance() or QApplication(sys.argv)
+    templates = capture_templates()
+
+    results = {}
+    startup = {}
+    for size in sorted(args.sizes):
+        results[str(size)], startup[str(size)] = measure(app, templates, size, args.repeat)
+        for role, usable_ms in startup[str(size)].items():
+            print(f"{'startup (' + role + ')':18} {size:>7} rows  usable {usable_ms:>6.1f} ms")
+        for view, stats in results[str(size)].items():
+            print(f"{view:18} {size:>7} rows  p50 {stats['p50_ms']:>9.1f} ms  "
+                  f"peak RSS {stats['peak_rss_kb'] // 1024:>5} MB  QObjects {stats['qobjects']:>5}")
+
+    write_json(args.output, {'repeat': args.repeat, 'startup_ms': startup, 'results': results})
+    print(f"Results written to {args.output}")
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)['results']
+    failures = list(regressions(results, startup, baseline, args.tolerance))
+    for message in failures:
+        print(f"FAIL  {message}")
+    print(f"{len(failures)} regression(s)" if failures else "No regressions")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Measure bonafide certificate throughput (certificates/s) per worker count.
+
+Renders --count synthetic approved submissions into a scratch directory with
+CertificateRenderer, first in-process and then across process pools of each
+--workers size above one. Every pool renders one warm-up batch before it is
+timed, so the numbers are the steady state of the Stage 4 batch flow rather
+than process start-up. Each timed run starts from an empty certificate store;
+'stored' re-issues the in-process batch from its store, as a reprint would.
+
+    python -m benchmarks.render_certificates [--count 2000] [--workers 2 4 8]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks import synthetic
+from benchmarks.report import write_json
+from certificates import CHUNK_SIZE, CertificateRenderer, CertificateStore
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=2000, help="certificates per timed batch")
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({2, os.cpu_count() or 1}),
+                        help="pool sizes to time; 1 is the in-process path")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--output", default="certificate-benchmark-results.json")
+    return parser.parse_args(argv)
+
+
+def rows(count: int):
+    """(id, name, reg_number, reason, serial) tuples, as issued from the Process Done page"""
+    return [(n, f"Student {n}", f"REG{n:07d}", synthetic.REASONS[n % len(synthetic.REASONS)], n)
+            for n in range(1, count + 1)]
+
+
+def timed(renderer: CertificateRenderer, batch, chunk_size: int, store: CertificateStore = None) -> float:
+    """Seconds to issue batch; a fresh store makes every certificate a render"""
+    if store is not None:
+        renderer.store = store
+    started = time.perf_counter()
+    renderer.render_batch(batch, chunk_size=chunk_size)
+    return time.perf_counter() - started
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    batch = rows(args.count)
+    output_dir = tempfile.mkdtemp(prefix="nt_certificates_")
+    results = {}
+    try:
+        # Every renderer gets a scratch store, so nothing lands in the live one
+        store = CertificateStore(os.path.join(output_dir, "store-in-process"))
+        renderer = CertificateRenderer(output_dir, workers=1, store=store)
+        results['in-process'] = timed(renderer, batch, args.chunk_size)
+        results['stored'] = timed(renderer, batch, args.chunk_size)
+        for workers in sorted(set(args.workers) - {1}):
+            warm_up = CertificateStore(os.path.join(output_dir, f"store-{workers}-warm-up"))
+            renderer = CertificateRenderer(output_dir, workers=workers, store=warm_up)
+            try:
+                # Start the pool, then time it warm
+                renderer.render_batch(batch[:args.chunk_size * workers * 2], chunk_size=args.chunk_size)
+                store = CertificateStore(os.path.join(output_dir, f"store-{workers}"))
+                results[f"{workers} worker(s)"] = timed(renderer, batch, args.chunk_size, store)
+            finally:
+                renderer.shutdown()
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    summary = {}
+    for label, seconds in results.items():
+        summary[label] = {'seconds': round(seconds, 3), 'certificates_per_s': round(args.count / seconds, 1)}
+        print(f"{label:14} {args.count / seconds:>9.1f} certificates/s")
+    write_json(args.output, {'count': args.count, 'chunk_size': args.chunk_size, 'results': summary})
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
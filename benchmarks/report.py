@@ -0,0 +1,72 @@
+"""Latency summaries and JSON result files shared by the benchmarks."""
+import json
+import math
+import platform
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def percentile(ordered, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty sequence"""
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples, rows: int = 0) -> dict:
+    """Latency distribution (milliseconds) and throughput for a list of per-call seconds"""
+    ordered = sorted(samples)
+    total = sum(ordered)
+    return {
+        'calls': len(ordered),
+        'rows': rows,
+        'min_ms': round(ordered[0] * 1000, 3),
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+        'mean_ms': round(total / len(ordered) * 1000, 3),
+        'calls_per_s': round(len(ordered) / total, 1) if total else None,
+        'rows_per_s': round(rows / total, 1) if total else None,
+    }
+
+
+def git_revision() -> str:
+    """Short commit hash of the tree under test (with -dirty), or 'unknown'"""
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], cwd=REPO_ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def environment() -> dict:
+    return {
+        'revision': git_revision(),
+        'timestamp': datetime.now().isoformat(timespec="seconds"),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+    }
+
+
+def write_json(path, payload: dict):
+    """Write a result document with the run's environment attached"""
+    document = {'environment': environment(), **payload}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, default=str)
+        f.write("\n")
+
+
+def print_table(results: dict):
+    """Print one line per benchmark: latency percentiles and rows/s"""
+    width = max(map(len, results), default=0)
+    print(f"{'':{width}}  {'calls':>6}  {'p50 ms':>9}  {'p95 ms':>9}  {'p99 ms':>9}  {'rows/s':>11}")
+    for label, stats in results.items():
+        rows_per_s = stats['rows_per_s'] if stats['rows_per_s'] is not None else float("nan")
+        print(f"{label:{width}}  {stats['calls']:>6}  {stats['p50_ms']:>9.3f}  {stats['p95_ms']:>9.3f}  "
+              f"{stats['p99_ms']:>9.3f}  {rows_per_s:>11.1f}")
@@ -0,0 +1,219 @@
+"""Deterministic synthetic users, submissions and notifications for benchmarks.
+
+Rows are generated lazily in Python from a seeded RNG, so the same sizes and
+seed always produce the same data set. PostgreSQL is bulk-loaded with
+COPY ... FROM STDIN, streamed straight from the generators without
+materialising the 5M-row notification set in memory; the SQLite backends,
+which have no COPY, receive the same rows in executemany batches.
+
+    python -m benchmarks.synthetic --database nt_bonafide_bench [--submissions 500000]
+"""
+import argparse
+import random
+import sys
+from datetime import datetime, timedelta
+from itertools import islice
+
+from mk import SUBMISSION_STAGES_BACKFILL, Database, StorageBackend, open_database
+
+USERNAME_PREFIX = "bench_user_"
+REASONS = (
+    "Bonafide certificate for scholarship application",
+    "Bonafide certificate for bank account opening",
+    "Bonafide certificate for passport verification",
+    "Bonafide certificate for internship joining",
+    "Bonafide certificate for education loan",
+)
+# Spread of a real term: most requests are settled, a steady backlog is pending
+STATUS_WEIGHTS = (("Pending", 0.4), ("Approved", 0.4), ("Rejected", 0.2))
+PROCESSED_SHARE = 0.5
+READ_SHARE = 0.9
+SPAN = timedelta(days=365)
+BATCH_SIZE = 5000
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Options shared by every tool that needs a loaded benchmark database"""
+    parser.add_argument("--backend", choices=("postgresql", "sqlite", "memory"), default="postgresql")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=5432)
+    parser.add_argument("--database", default="nt_bonafide_bench", help="scratch database (must already exist)")
+    parser.add_argument("--user", default="postgres")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--path", default="nt_bonafide_bench.db", help="database file for --backend sqlite")
+    parser.add_argument("--users", type=int, default=50_000, help="student accounts")
+    parser.add_argument("--submissions", type=int, default=500_000)
+    parser.add_argument("--notifications", type=int, default=5_000_000)
+    parser.add_argument("--seed", type=int, default=2024)
+
+
+def open_backend(args) -> StorageBackend:
+    """Open the backend selected by add_arguments() options"""
+    if args.backend == "postgresql":
+        return open_database({'backend': 'postgresql', 'host': args.host, 'port': args.port,
+                              'database': args.database, 'user': args.user, 'password': args.password})
+    return open_database({'backend': args.backend, 'path': args.path})
+
+
+class CopyStream:
+    """Read-only file object over generated rows, in COPY text format"""
+    def __init__(self, rows):
+        self._lines = ("\t".join(map(copy_value, row)) + "\n" for row in rows)
+        self._buffer = ""
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            chunk = "".join(islice(self._lines, 1000))
+            if not chunk:
+                break
+            self._buffer += chunk
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def copy_value(value) -> str:
+    if value is None:
+        return r"\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat(" ")
+    return str(value)
+
+
+def user_rows(count: int):
+    for n in range(1, count + 1):
+        yield (f"{USERNAME_PREFIX}{n}", "benchpass", "user", None)
+
+
+def submission_rows(count: int, user_ids, workflow: dict, rng: random.Random, now: datetime):
+    statuses = [status for status, _ in STATUS_WEIGHTS]
+    weights = [weight for _, weight in STATUS_WEIGHTS]
+    step = SPAN / max(count, 1)
+    started = now - SPAN
+    for n in range(1, count + 1):
+        status = rng.choices(statuses, weights)[0]
+        stage = rng.choice(workflow['stages']) if status == "Pending" else workflow['final_stage']
+        created = started + step * n
+        updated = min(created + timedelta(seconds=rng.randint(0, 7 * 86400)), now)
+        yield (rng.choice(user_ids), f"Student {n}", f"REG{n:07d}", rng.choice(REASONS), status, stage,
+               status == "Approved" and rng.random() < PROCESSED_SHARE, created, updated, workflow['id'])
+
+
+def notification_rows(count: int, submissions, workflow: dict, rng: random.Random):
+    for _ in range(count):
+        submission_id, user_id, stage, created = rng.choice(submissions)
+        message = (StorageBackend.submitted_message(stage) if stage == workflow['first_stage']
+                   else StorageBackend.moved_message(stage))
+        yield (user_id, submission_id, message, rng.random() < READ_SHARE, created)
+
+
+USER_COLUMNS = ("username", "password", "role", "stage")
+SUBMISSION_COLUMNS = ("user_id", "name", "reg_number", "reason", "status", "approval_stage",
+                      "process_completed", "created_at", "updated_at", "workflow_id")
+NOTIFICATION_COLUMNS = ("user_id", "submission_id", "message", "is_read", "created_at")
+
+
+def bulk_insert(db: StorageBackend, conn, table: str, columns, rows):
+    """COPY rows into table on PostgreSQL, executemany batches elsewhere"""
+    cur = conn.cursor()
+    if isinstance(db, Database):
+        cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", CopyStream(rows))
+        return
+    statement = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, BATCH_SIZE))
+        if not batch:
+            break
+        cur.executemany(statement, batch)
+
+
+def counts(db: StorageBackend) -> dict:
+    """Rows currently in the benchmark tables"""
+    with db._connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT COUNT(*) FROM users WHERE username LIKE %s", (USERNAME_PREFIX + "%",))
+        users = cur.fetchone()[0]
+        cur.execute("SELECT COUNT(*) FROM submissions")
+        submissions = cur.fetchone()[0]
+        cur.execute("SELECT COUNT(*) FROM notifications")
+        notifications = cur.fetchone()[0]
+        conn.commit()
+    return {'users': users, 'submissions': submissions, 'notifications': notifications}
+
+
+def load(db: StorageBackend, users: int, submissions: int, notifications: int, seed: int = 2024) -> dict:
+    """Fill an empty database with the synthetic data set; returns the resulting counts.
+
+    A database that already holds at least the requested rows is left as is,
+    so repeated benchmark runs reuse one load.
+    """
+    existing = counts(db)
+    if (existing['users'] >= users and existing['submissions'] >= submissions
+            and existing['notifications'] >= notifications):
+        return existing
+    if existing['users'] or existing['submissions']:
+        raise Exception(f"Refusing to load into a partially filled database: {existing}")
+
+    rng = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    # Every synthetic request follows the default workflow
+    workflow = db.router.workflows[db.router.default_workflow_id]
+    with db._connection() as conn:
+        cur = conn.cursor()
+        started = datetime.now()
+        print(f"Loading {users} users...")
+        bulk_insert(db, conn, "users", USER_COLUMNS, user_rows(users))
+        cur.execute("SELECT id FROM users WHERE username LIKE %s ORDER BY id", (USERNAME_PREFIX + "%",))
+        user_ids = [row[0] for row in cur.fetchall()]
+
+        print(f"Loading {submissions} submissions...")
+        bulk_insert(db, conn, "submissions", SUBMISSION_COLUMNS,
+                    submission_rows(submissions, user_ids, workflow, rng, now))
+        # Pending requests get their stage states the way the schema migration derives them
+        cur.execute(SUBMISSION_STAGES_BACKFILL)
+        cur.execute("SELECT id, user_id, approval_stage, created_at FROM submissions ORDER BY id")
+        submission_keys = cur.fetchall()
+
+        print(f"Loading {notifications} notifications...")
+        bulk_insert(db, conn, "notifications", NOTIFICATION_COLUMNS,
+                    notification_rows(notifications, submission_keys, workflow, rng))
+        conn.commit()
+        print(f"Loaded in {(datetime.now() - started).total_seconds():.1f}s")
+
+    analyze(db)
+    return counts(db)
+
+
+def analyze(db: StorageBackend):
+    """Refresh planner statistics after a bulk load"""
+    with db._connection() as conn:
+        if not isinstance(db, Database):
+            conn.cursor().execute("ANALYZE")
+            conn.commit()
+            return
+        # VACUUM cannot run inside a transaction block
+        conn.autocommit = True
+        try:
+            conn.cursor().execute("VACUUM ANALYZE")
+        finally:
+            conn.autocommit = False
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    db = open_backend(args)
+    try:
+        print(load(db, args.users, args.submissions, args.notifications, args.seed))
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+"""Time every storage backend method and the approval flows on synthetic data.
+
+Loads the synthetic data set (50k users, 500k submissions and 5M
+notifications by default, see benchmarks.synthetic) unless the database
+already holds it, then calls each read path and transition --iterations times
+with randomised arguments, and reports p50/p95/p99 latency and rows/s. The
+results are written as JSON so runs can be compared across versions.
+
+    python -m benchmarks.time_queries --database nt_bonafide_bench [--output results.json]
+    python -m benchmarks.time_queries --backend memory --submissions 50000 --notifications 200000
+
+The transition benchmarks approve, reject and complete real rows, so each run
+moves the data set on a little; never point this at a production database.
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from benchmarks import synthetic
+from benchmarks.report import print_table, summarize, write_json
+from mk import StorageBackend
+
+PAGE = 101
+BATCH = 50
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    synthetic.add_arguments(parser)
+    parser.add_argument("--iterations", type=int, default=200, help="calls per benchmark")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--only", action="append", metavar="LABEL", help="run only benchmarks with this label prefix")
+    return parser.parse_args(argv)
+
+
+def sample(db: StorageBackend, query: str, params=(), count: int = 1000):
+    """Ids the benchmarks draw their arguments from"""
+    with db._connection() as conn:
+        cur = conn.cursor()
+        cur.execute(query + " LIMIT %s", (*params, count))
+        rows = [row[0] for row in cur.fetchall()]
+        conn.commit()
+    return rows
+
+
+def rows_in(result) -> int:
+    if result is None:
+        return 0
+    if isinstance(result, tuple) and len(result) == 2 and isinstance(result[1], datetime):
+        return len(result[0] or ())  # (rows, watermark)
+    if isinstance(result, list):
+        return len(result)
+    return 1
+
+
+def partial_call(fn, *args, **kwargs):
+    return lambda: fn(*args, **kwargs)
+
+
+def deal(ids, units, iterations: int):
+    """Split ids into one list per benchmark, units[i] rows (one call's worth) at a time in turn,
+    so each has rows of its own and all of them get calls when the sample is short"""
+    shares = [[] for _ in units]
+    start = 0
+    for _ in range(iterations):
+        for share, unit in zip(shares, units):
+            if start + unit <= len(ids):
+                share.extend(ids[start:start + unit])
+                start += unit
+    return shares
+
+
+def benchmarks(db: StorageBackend, rng: random.Random, iterations: int):
+    """(label, make_call) pairs; make_call() returns a zero-argument call with fresh arguments"""
+    stages = db.router.workflows[db.router.default_workflow_id]['stages']
+    user_ids = sample(db, "SELECT id FROM users WHERE username LIKE %s",
+                      (synthetic.USERNAME_PREFIX + "%",))
+    usernames = [f"{synthetic.USERNAME_PREFIX}{rng.randint(1, len(user_ids))}" for _ in range(100)]
+    submission_ids = sample(db, "SELECT id FROM submissions ORDER BY id DESC", count=100_000)
+    notification_ids = sample(db, "SELECT id FROM notifications WHERE is_read = FALSE ORDER BY id DESC",
+                              count=iterations)
+    # Transitions consume their rows, so each benchmark is dealt ids of its own
+    transitions = {'approve_one': 1, 'reject_one': 1, 'approve_batch': BATCH, 'reject_batch': BATCH}
+    pending = {name: {} for name in transitions}
+    for stage in stages:
+        ready = sample(db, "SELECT submission_id FROM submission_stages WHERE state = 'ready' AND stage = %s "
+                           "ORDER BY submission_id DESC", (stage,), count=iterations * sum(transitions.values()))
+        for name, share in zip(transitions, deal(ready, transitions.values(), iterations)):
+            pending[name][stage] = share
+    awaiting_one, awaiting_batch = deal(
+        sample(db, "SELECT id FROM submissions WHERE status = 'Approved' AND process_completed = FALSE "
+                   "ORDER BY id DESC", count=iterations * (1 + BATCH)),
+        (1, BATCH), iterations)
+    admins = [{'id': None, 'role': 'admin', 'stage': stage} for stage in stages]
+
+    def take(ids, count=1):
+        if len(ids) < count:
+            raise ValueError("sample exhausted")
+        taken = ids[:count]
+        del ids[:count]
+        return taken
+
+    def pending_batch(name):
+        count = transitions[name]
+        left = [stage for stage, ids in pending[name].items() if len(ids) >= count]
+        if not left:
+            raise ValueError("sample exhausted")
+        stage = rng.choice(left)
+        return take(pending[name][stage], count), stage
+
+    def middle_id():
+        return rng.choice(submission_ids)
+
+    def stream(status):
+        s = db.open_status_stream(status)
+        try:
+            return s.fetch(200)
+        finally:
+            s.close()
+
+    def recently():
+        return datetime.now() - timedelta(seconds=rng.randint(1, 300))
+
+    def approve_one():
+        (submission_id,), stage = pending_batch("approve_one")
+        return lambda: db.approve_submission(submission_id, stage)
+
+    def reject_one():
+        (submission_id,), stage = pending_batch("reject_one")
+        return lambda: db.reject_submission(submission_id, stage)
+
+    def approve_batch():
+        ids, stage = pending_batch("approve_batch")
+        return lambda: db.approve_many(ids, stage)
+
+    def reject_batch():
+        ids, stage = pending_batch("reject_batch")
+        return lambda: db.reject_many(ids, stage)
+
+    def complete_one():
+        (submission_id,) = take(awaiting_one)
+        return lambda: db.mark_process_completed(submission_id)
+
+    def complete_batch():
+        ids = take(awaiting_batch, BATCH)
+        return lambda: db.mark_process_completed_many(ids)
+
+    def read_notification():
+        (notification_id,) = take(notification_ids)
+        return lambda: db.mark_notification_read(notification_id)
+
+    def submit():
+        user_id = rng.choice(user_ids)
+        return lambda: db.add_submission(user_id, "Benchmark Student", "REGBENCH",
+                                         "Bonafide certificate for benchmark run")
+
+    def uncached_submission():
+        submission_id = middle_id()
+        db.submission_cache.invalidate(submission_id)
+        return lambda: db.get_submission(submission_id)
+
+    return [
+        ("get_user", lambda: partial_call(db.get_user, rng.choice(usernames), "benchpass")),
+        ("get_pending_for_stage", lambda: partial_call(db.get_pending_for_stage, rng.choice(stages), limit=PAGE)),
+        ("get_pending_for_stage (keyset page)",
+         lambda: partial_call(db.get_pending_for_stage, rng.choice(stages), after_id=middle_id(), limit=PAGE)),
+        ("get_approved_for_stage4_admin", lambda: partial_call(db.get_approved_for_stage4_admin, limit=PAGE)),
+        ("get_approved_for_stage4_admin (keyset page)",
+         lambda: partial_call(db.get_approved_for_stage4_admin, after_id=middle_id(), limit=PAGE)),
+        ("get_by_status", lambda: partial_call(db.get_by_status, rng.choice(("Approved", "Rejected")), limit=PAGE)),
+        ("get_by_status (keyset page)",
+         lambda: partial_call(db.get_by_status, rng.choice(("Approved", "Rejected")), after_id=middle_id(), limit=PAGE)),
+        ("open_status_stream", lambda: partial_call(stream, rng.choice(("Approved", "Rejected")))),
+        ("get_user_submissions", lambda: partial_call(db.get_user_submissions, rng.choice(user_ids), limit=PAGE)),
+        ("get_submission", uncached_submission),
+        ("get_submission (cached)", lambda: partial_call(db.get_submission, submission_ids[0])),
+        ("get_submission_changes", lambda: partial_call(db.get_submission_changes, recently())),
+        ("get_dashboard_stats (student)",
+         lambda: partial_call(db.get_dashboard_stats, {'id': rng.choice(user_ids), 'role': 'user', 'stage': None})),
+        ("get_dashboard_stats (admin)", lambda: partial_call(db.get_dashboard_stats, rng.choice(admins))),
+        ("get_user_notifications_with_status",
+         lambda: partial_call(db.get_user_notifications_with_status, rng.choice(user_ids))),
+        ("get_user_notifications", lambda: partial_call(db.get_user_notifications, rng.choice(user_ids))),
+        ("get_unread_count", lambda: partial_call(db.get_unread_count, rng.choice(user_ids))),
+        ("mark_notification_read", read_notification),
+        ("add_submission", submit),
+        ("approve_submission", approve_one),
+        ("reject_submission", reject_one),
+        ("mark_process_completed", complete_one),
+        (f"approve_many ({BATCH})", approve_batch),
+        (f"reject_many ({BATCH})", reject_batch),
+        (f"mark_process_completed_many ({BATCH})", complete_batch),
+    ]
+
+
+def run(label: str, make_call, iterations: int) -> dict:
+    samples = []
+    rows = 0
+    for _ in range(iterations):
+        try:
+            call = make_call()
+        except ValueError:
+            print(f"{label}: ran out of sample rows after {len(samples)} calls")
+            break
+        started = time.perf_counter()
+        result = call()
+        samples.append(time.perf_counter() - started)
+        rows += rows_in(result)
+    return summarize(samples, rows) if samples else None
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    db = synthetic.open_backend(args)
+    try:
+        dataset = synthetic.load(db, args.users, args.submissions, args.notifications, args.seed)
+        rng = random.Random(args.seed)
+
+        results = {}
+        empty = []
+        for label, make_call in benchmarks(db, rng, args.iterations):
+            if args.only and not label.startswith(tuple(args.only)):
+                continue
+            stats = run(label, make_call, args.iterations)
+            if stats:
+                results[label] = stats
+            else:
+                empty.append(label)
+
+        print_table(results)
+        write_json(args.output, {
+            'backend': db.NAME,
+            'dataset': dataset,
+            'iterations': args.iterations,
+            'results': results,
+            'submission_cache': db.submission_cache.stats(),
+            'pool': db.pool_stats(),
+        })
+        print(f"Results written to {args.output}")
+        if empty:
+            print(f"No results for: {', '.join(empty)}")
+            return 1
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,7 +7,7 @@ REM Go to your project folder
 cd /d "C:\Users\muthukumaran\New folder"
 
 echo 🔨 Building EXE...
-python -m PyInstaller --onefile --windowed --icon=app.ico mk.py
+python -m PyInstaller --onefile --windowed --icon=app.ico --add-data "assets;assets" mk.py
 
 echo.
 echo ✅ Build complete! Launching app...
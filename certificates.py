@@ -0,0 +1,403 @@
+"""Bonafide certificate PDFs, rendered without Qt so worker processes stay light.
+
+A CertificateTemplate compiles everything that is the same on every
+certificate once: the PDF objects for the catalog, page and the two standard
+Helvetica fonts (which need no embedding), their byte offsets, the border,
+header and signature drawing, and the font width tables used to centre and
+wrap text. Rendering a certificate then only formats the student's text and
+appends one content stream and the cross-reference table.
+
+CertificateRenderer renders small batches in-process and spreads larger
+ones over a ProcessPoolExecutor that is started once and kept warm. Each
+worker builds its own template when it starts, renders whole chunks of
+submissions and writes the files itself, so only short tuples cross process
+boundaries.
+
+Rendered files are kept in a CertificateStore, addressed by a hash of the
+template version and every field printed on the certificate. Re-issuing an
+identical certificate (a reprint, a preview) is then a file copy, and the
+hash is recorded on the submission row so the original issue date is kept.
+
+Frozen builds must call multiprocessing.freeze_support() before anything else
+in their entry point, or the workers re-run the application instead.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from functools import partial
+
+# Bump whenever the rendered output changes, so stored certificates are not reused
+TEMPLATE_VERSION = 2
+INSTITUTION = os.environ.get("NT_INSTITUTION_NAME", "NT-Bonafide")
+OUTPUT_DIR = os.environ.get("NT_CERTIFICATE_DIR", os.path.abspath("certificates"))
+STORE_DIR = os.environ.get("NT_CERTIFICATE_STORE", os.path.join(OUTPUT_DIR, ".store"))
+STORE_MAX_BYTES = int(os.environ.get("NT_CERTIFICATE_STORE_MB", "256")) * 1024 * 1024
+DATE_FORMAT = "%d-%m-%Y"
+# Submissions per worker task; large enough that IPC is negligible next to rendering
+CHUNK_SIZE = 32
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+MARGIN = 72
+BODY_SIZE = 12
+LEADING = 22
+
+# Glyph widths (1/1000 em) of the standard Helvetica fonts for ASCII 32-126
+HELVETICA_WIDTHS = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+HELVETICA_BOLD_WIDTHS = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+)
+
+
+class Font:
+    """A standard PDF font with a width table over the WinAnsi code points"""
+    def __init__(self, resource: str, base_font: str, ascii_widths):
+        self.resource = resource
+        self.base_font = base_font
+        # Characters outside ASCII get an average glyph width
+        self.widths = [556] * 256
+        self.widths[32:127] = ascii_widths
+
+    def width(self, text: str, size: float) -> float:
+        return sum(self.widths[b] for b in text.encode("cp1252", "replace")) * size / 1000
+
+    def pdf_object(self) -> bytes:
+        return (f"<< /Type /Font /Subtype /Type1 /BaseFont /{self.base_font} "
+                f"/Encoding /WinAnsiEncoding >>").encode()
+
+
+REGULAR = Font("F1", "Helvetica", HELVETICA_WIDTHS)
+BOLD = Font("F2", "Helvetica-Bold", HELVETICA_BOLD_WIDTHS)
+
+
+def pdf_string(text: str) -> str:
+    """Text as a PDF literal string, limited to what WinAnsiEncoding can show"""
+    text = text.encode("cp1252", "replace").decode("cp1252")
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def text_op(font: Font, size: float, x: float, y: float, text: str) -> str:
+    return f"BT /{font.resource} {size:g} Tf {x:.2f} {y:.2f} Td {pdf_string(text)} Tj ET\n"
+
+
+def centred(font: Font, size: float, y: float, text: str) -> str:
+    return text_op(font, size, (PAGE_WIDTH - font.width(text, size)) / 2, y, text)
+
+
+def wrap(text: str, font: Font, size: float, width: float):
+    """Split text into lines no wider than width, breaking between words"""
+    lines = []
+    line = ""
+    for word in text.split():
+        candidate = f"{line} {word}" if line else word
+        if line and font.width(candidate, size) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = candidate
+    if line:
+        lines.append(line)
+    return lines
+
+
+def serial_text(serial: int) -> str:
+    """A certificate serial number as printed; None marks a draft"""
+    return "DRAFT" if serial is None else f"NTB-{serial:07d}"
+
+
+def output_name(submission_id: int, reg_number: str, draft: bool = False) -> str:
+    """File name of a submission's certificate, or of its draft preview"""
+    name = f"bonafide_{submission_id}_{re.sub(r'[^A-Za-z0-9_-]+', '_', str(reg_number))}.pdf"
+    return f"draft_{name}" if draft else name
+
+
+class CertificateTemplate:
+    """The fixed part of every certificate, compiled to PDF bytes once"""
+    def __init__(self, institution: str = INSTITUTION):
+        self.institution = institution
+        objects = {
+            1: b"<< /Type /Catalog /Pages 2 0 R >>",
+            2: b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+            3: (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                f"/Resources << /Font << /F1 5 0 R /F2 6 0 R >> >> /Contents 4 0 R >>").encode(),
+            5: REGULAR.pdf_object(),
+            6: BOLD.pdf_object(),
+        }
+        # The content stream (object 4) varies, so it goes last and the rest keep their offsets
+        prefix = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self.offsets = {}
+        for number, body in objects.items():
+            self.offsets[number] = len(prefix)
+            prefix += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+        self.prefix = bytes(prefix)
+        self.static_content = self._static_content().encode("cp1252")
+
+    def _static_content(self) -> str:
+        top = PAGE_HEIGHT - 110
+        return "".join([
+            # Double border
+            f"q 2 w 0.12 0.16 0.22 RG 30 30 {PAGE_WIDTH - 60} {PAGE_HEIGHT - 60} re S Q\n",
+            f"q 0.75 w 0.12 0.16 0.22 RG 38 38 {PAGE_WIDTH - 76} {PAGE_HEIGHT - 76} re S Q\n",
+            centred(BOLD, 20, top, self.institution.upper()),
+            f"q 1 w {MARGIN} {top - 18} m {PAGE_WIDTH - MARGIN} {top - 18} l S Q\n",
+            centred(BOLD, 22, top - 80, "BONAFIDE CERTIFICATE"),
+            # Signature block
+            f"q 0.75 w {PAGE_WIDTH - MARGIN - 170} 170 m {PAGE_WIDTH - MARGIN} 170 l S Q\n",
+            text_op(BOLD, BODY_SIZE, PAGE_WIDTH - MARGIN - 170, 152, "Principal / Head of Institution"),
+            text_op(REGULAR, BODY_SIZE, MARGIN, 152, "Seal"),
+        ])
+
+    def content(self, serial: int, name: str, reg_number: str, reason: str, issued: str) -> bytes:
+        """The variable part of one certificate's content stream; serial None renders a draft"""
+        width = PAGE_WIDTH - 2 * MARGIN
+        y = PAGE_HEIGHT - 250
+        ops = [centred(BOLD, BODY_SIZE, y + 30, "DRAFT - NOT AN ISSUED CERTIFICATE")] if serial is None else []
+        ops += [
+            text_op(REGULAR, BODY_SIZE, MARGIN, y, f"Certificate No: {serial_text(serial)}"),
+            text_op(REGULAR, BODY_SIZE, PAGE_WIDTH - MARGIN - REGULAR.width(f"Date: {issued}", BODY_SIZE),
+                    y, f"Date: {issued}"),
+        ]
+        y -= 2 * LEADING + 20
+        paragraphs = (
+            f"This is to certify that {name} (Register No. {reg_number}) is a bonafide student "
+            f"of {self.institution}.",
+            f"This certificate is issued on the student's request for the following purpose: {reason}",
+        )
+        for paragraph in paragraphs:
+            for line in wrap(paragraph, REGULAR, BODY_SIZE, width):
+                ops.append(text_op(REGULAR, BODY_SIZE, MARGIN, y, line))
+                y -= LEADING
+            y -= LEADING
+        return "".join(ops).encode("cp1252", "replace")
+
+    def render(self, serial: int, name: str, reg_number: str, reason: str, issued: str) -> bytes:
+        """A complete single-page PDF for one submission"""
+        stream = self.static_content + self.content(serial, name, reg_number, reason, issued)
+        offsets = {**self.offsets, 4: len(self.prefix)}
+        body = self.prefix + b"4 0 obj\n<< /Length %d >>\nstream\n%s\nendstream\nendobj\n" % (len(stream), stream)
+        xref = b"".join(b"%010d 00000 n \n" % offsets[number] for number in sorted(offsets))
+        return (body + b"xref\n0 7\n0000000000 65535 f \n" + xref
+                + b"trailer\n<< /Size 7 /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % len(body))
+
+
+def certificate_hash(institution: str, serial: int, name: str, reg_number: str, reason: str,
+                     issued: str) -> str:
+    """Content address of a certificate: everything its PDF bytes depend on"""
+    key = json.dumps([TEMPLATE_VERSION, institution, serial, name, reg_number, reason, issued])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def store_path(directory: str, digest: str) -> str:
+    return os.path.join(directory, digest[:2], f"{digest}.pdf")
+
+
+def write_atomic(path: str, data: bytes):
+    """Write a file so readers never see it half written, even across processes"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(data)
+    os.replace(temporary, path)
+
+
+class CertificateStore:
+    """Rendered certificates on disk, addressed by certificate_hash() and bounded in total size.
+
+    Files live at <directory>/<first two hex digits>/<hash>.pdf, so identical
+    certificates are stored once. A read refreshes the file's modification
+    time, which orders the least recently used files for eviction, also across
+    restarts: the directory is scanned once, on first use.
+    """
+    def __init__(self, directory: str = STORE_DIR, max_bytes: int = STORE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries = None  # hash -> size, least recently used first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def path(self, digest: str) -> str:
+        return store_path(self.directory, digest)
+
+    def _index(self) -> OrderedDict:
+        if self._entries is None:
+            found = []
+            for root, _, files in os.walk(self.directory):
+                for file in files:
+                    if file.endswith(".pdf"):
+                        stat = os.stat(os.path.join(root, file))
+                        found.append((stat.st_mtime, file[:-4], stat.st_size))
+            self._entries = OrderedDict((digest, size) for _, digest, size in sorted(found))
+            self._bytes = sum(self._entries.values())
+        return self._entries
+
+    def get(self, digest: str):
+        """Path of a stored certificate, marked as just used; None if it is not stored"""
+        with self._lock:
+            entries = self._index()
+            if digest in entries:
+                try:
+                    os.utime(self.path(digest))
+                    entries.move_to_end(digest)
+                    self.hits += 1
+                    return self.path(digest)
+                except FileNotFoundError:
+                    # Removed behind our back; forget it and render again
+                    self._bytes -= entries.pop(digest)
+            self.misses += 1
+            return None
+
+    def add(self, digest: str, size: int):
+        """Account for a certificate written to path(digest), then evict down to max_bytes"""
+        with self._lock:
+            entries = self._index()
+            self._bytes += size - entries.pop(digest, 0)
+            entries[digest] = size
+            # The newest entry always stays, even if it alone exceeds the bound
+            while self._bytes > self.max_bytes and len(entries) > 1:
+                oldest, oldest_size = entries.popitem(last=False)
+                self._bytes -= oldest_size
+                self.evictions += 1
+                try:
+                    os.remove(self.path(oldest))
+                except FileNotFoundError:
+                    pass
+
+    def put(self, digest: str, data: bytes) -> str:
+        """Store rendered certificate bytes; returns their path"""
+        write_atomic(self.path(digest), data)
+        self.add(digest, len(data))
+        return self.path(digest)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._index()
+            return {'files': len(entries), 'bytes': self._bytes, 'max_bytes': self.max_bytes,
+                    'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+
+# Per-process template; worker processes build theirs once in _start_worker
+_template = None
+
+
+def _start_worker(institution: str):
+    global _template
+    _template = CertificateTemplate(institution)
+
+
+def _render_chunk(store_dir: str, jobs):
+    """Render a chunk of (hash, serial, name, reg_number, reason, issued) jobs into the store; returns their sizes"""
+    sizes = []
+    for digest, *fields in jobs:
+        data = _template.render(*fields)
+        write_atomic(store_path(store_dir, digest), data)
+        sizes.append(len(data))
+    return sizes
+
+
+class CertificateRenderer:
+    """Issues certificate PDFs for submission rows (id, name, reg_number, reason, serial, ...).
+
+    A row without a serial gets a draft, marked as such and named draft_*.pdf.
+    Certificates come from the store when an identical one was rendered before;
+    the rest are rendered, in worker processes when there is more than one
+    chunk. Every certificate is then copied into output_dir under a readable
+    name for printing.
+    """
+    def __init__(self, output_dir: str = OUTPUT_DIR, workers: int = None, institution: str = INSTITUTION,
+                 store: CertificateStore = None):
+        self.output_dir = output_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.institution = institution
+        self.template = CertificateTemplate(institution)
+        self.store = store if store is not None else CertificateStore()
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def render(self, row, issued_at: datetime = None):
+        """Issue one certificate in this process; returns (id, hash, issued_at, path)"""
+        return self.render_batch([row], {row[0]: issued_at} if issued_at else None)[0]
+
+    def render_batch(self, rows, issued=None, chunk_size: int = CHUNK_SIZE):
+        """Issue a certificate for every row; returns (id, hash, issued_at, path) per row.
+
+        issued maps submission ids to the time their certificate was first
+        issued, so a reprint carries its original date and is served from the
+        store. Rows without one are dated now.
+        """
+        now = datetime.now()
+        issued = issued or {}
+        certificates = []
+        missing = []
+        for submission_id, name, reg_number, reason, serial, *_ in rows:
+            issued_at = issued.get(submission_id) or now
+            fields = (serial, name, reg_number, reason, issued_at.strftime(DATE_FORMAT))
+            digest = certificate_hash(self.institution, *fields)
+            certificates.append((submission_id, digest, issued_at, reg_number, serial is None))
+            if self.store.get(digest) is None:
+                missing.append((digest, *fields))
+
+        # Render into the store first, export, and only then let the store evict
+        sizes = self._render_missing(missing, chunk_size)
+        os.makedirs(self.output_dir, exist_ok=True)
+        exported = []
+        for submission_id, digest, issued_at, reg_number, draft in certificates:
+            path = os.path.join(self.output_dir, output_name(submission_id, reg_number, draft))
+            shutil.copyfile(self.store.path(digest), path)
+            exported.append((submission_id, digest, issued_at, path))
+        for (digest, *_), size in zip(missing, sizes):
+            self.store.add(digest, size)
+        return exported
+
+    def _render_missing(self, jobs, chunk_size: int):
+        if len(jobs) <= chunk_size or self.workers == 1:
+            sizes = []
+            for digest, *fields in jobs:
+                data = self.template.render(*fields)
+                write_atomic(self.store.path(digest), data)
+                sizes.append(len(data))
+            return sizes
+        chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+        try:
+            return [size for chunk in self._executor().map(partial(_render_chunk, self.store.directory), chunks)
+                    for size in chunk]
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool next time instead of failing forever
+            self.shutdown()
+            raise
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # Spawned rather than forked: the GUI process has Qt and database threads running
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                                 initializer=_start_worker, initargs=(self.institution,))
+            return self._pool
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker processes; the next batch starts new ones"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
@@ -1,36 +1,98 @@
 import sys
 import os
+import time
+import threading
+import inspect
+import logging
 import psycopg2
-from psycopg2.extras import RealDictCursor
-from functools import partial
-from datetime import datetime
-import base64
-
-from PyQt5.QtCore import Qt, QSize, QTimer
-from PyQt5.QtGui import QPixmap, QIcon
+import psycopg2.errors
+from psycopg2 import sql
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from psycopg2.pool import ThreadedConnectionPool
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache, partial, wraps
+from datetime import datetime, timedelta
+import json
+import select
+import socket
+import itertools
+import math
+import multiprocessing
+import re
+import sqlite3
+
+from certificates import CertificateRenderer
+
+from PyQt5.QtCore import (
+    Qt, QSize, QTimer, QObject, QRunnable, QThread, QThreadPool, pyqtSignal,
+    QAbstractTableModel, QModelIndex, QEvent, QRect, QUrl
+)
+from PyQt5.QtGui import QPixmap, QPixmapCache, QIcon, QColor, QFont, QPainter, QDesktopServices
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout,
     QLineEdit, QTextEdit, QMessageBox, QStackedWidget, QFrame, QTableWidget,
-    QTableWidgetItem, QSizePolicy, QSpacerItem, QHeaderView, QDialog, QFormLayout
+    QTableWidgetItem, QSizePolicy, QSpacerItem, QHeaderView, QDialog, QFormLayout,
+    QTableView, QStyledItemDelegate, QComboBox, QSpinBox
 )
-LOGO_DATA = """
-/9j/4AAQSkZJRgABAQAAAQABAAD/2wCEAAYGBgYHBgcICAcKCwoLCg8ODAwODxYQERAREBYiFRkVFRkVIh4kHhweJB42KiYmKjY+NDI0PkxERExfWl98fKcBBgYGBgcGBwgIBwoLCgsKDw4MDA4PFhAREBEQFiIVGRUVGRUiHiQeHB4kHjYqJiYqNj40MjQ+TERETF9aX3x8p//CABEIApgDyAMBIgACEQEDEQH/xAAuAAEBAQEAAwEAAAAAAAAAAAAAAQIGAwQHBQEBAQAAAAAAAAAAAAAAAAAAAAH/2gAMAwEAAhADEAAAAuaxYgAAAAAAAACweSTJYAAAAAAAACzyEuaMAAAAAAAAABqXRDJcgAAAAAAAAKWbhlAAAAAAAAAKTeNgyXIAAAAAAAAAAAAAAAAAAAAAAF0KgzAAAAAAAAAAA3ikAAAAAAAAAs2WKTKAAAAAAAAADeKaMlyAAAAAAAAAAAAAAAAAAAAAABdEUMWAAAAAAAAAAAAAAAAAAAADWdCgxYAAAAAAAAAAAayAAAAAAAAAAAAAAAAAAAAAAADyeOlkAAAAAAAAAAAAAAAAAAAADWaamoJIAAAAAAAAAAAAAAAAAAAAAAAaKTPkwQAAAAAAAAAAAAAAAAAAAA0ZahAAAAAAAAAAAAbwAAAAAAAAAAAAAAAAAAAAAAApLRZciAAAAAAAAAAAAAAAAAAAAA1NFkggAAAAAAAAAAAAAAAAAAAAVdHjbyQAAAAAAAAAAApdQDIgAAAAAAACkKQAAAAAAAAAApNagMlyAAAAAAAAAAAAAAAAAAAACtEWDIAAAAAAAAAAAGqS4pAAAAAAAAALNi5pmWAAAAAAAAAF1nQXAgAAAAAAAAGhlrIAAAAAAAAAKTTRCEgAAAAAAAAAAAW2GkyIAAAAAAAABqhKMwAAAAAAAAANTZmawayAAAAAAAAApahrCAAAAAAAAADUGmaMgAAAAAAAA1nQaHjKTWoWMiAAAAAAAAA3nZmgygAAAAAAAABd5oXJIAAAAAAAABdmaDKAAAAAAAAApGqXNhkAAAAAAAAA0TQQGdahKyIAAAAAAAAA2ZnkwazAAAAAAAAABo0QhIAAAAAAAACwbTRM+575+G6bRy7qfzj8cAAAAAApK0CEgAAAAAAAAK0WKTKAHkzAgAAAAAAAAN40WwMwAAAAAAAAAXWdmbcFyAAAAAAAABfOeH3Ok/dOd/c9irKADnuh5444IAAAAKTU0WQMgAAAAAAAANE1kbxcgAAAAAAAAAACzyEAygAAAAAAAAAA3gAAAAAAAAAD9s8XZefQC0AADnuh5444AIAAA1keSXBcgAAAAAAAAXZ4/JAxrIAAAAAAAAAAAs8hjVgxYAAAAAAAAAAAAAAAAAAAALPaPe7fxecFWKAAAHPdDzxxwAQAAACwAAAAAAAADQUEkAAAAAAAAAAAAGsjWbAAAAAAAAAAAAAAAAAAAABYPJ2nOd4AqgAAAA57oeeOOACAAAAAAAAAAAAF0SyiMgAAAAAAAAAAAAAAAAAAAAAA0ZaGQAAAAAAAGvaPTfp0/LfqYPzjzHZfs52AoAAAADnuh5444AIAAAAAAAAAAABd+PYygAAAAAAAAAAAAAAAAAAAAAAA1NBAyAAAAA8p4vN03RHKftfqjx+QAH4X7vJHNfufh9YdMAFAAAAAc90PPHHAq6TE8mCAAAAAAAAAAAAAAAAAAAAAAFItMgAAAAAAAAAFJrUBCQAAAAB0B6faexoBQAAHD9xwR+V3HD94frCAoAAAABz3Q86ceuhKSZAAAAAAAAAAAAAAAAAAAAAAAbFxomQAAAAAAAAAusaKZEAAAAAfpHudnNAKAgLBQOA7/gD8zvOD7w/WAAAAAAIPwP3+fORlgyAIAAAAAAAAAAAAAAAAAAAAAaFsDMAAAAAAAAApNTQxvJcgAAAABv6Fz/WgKAQiZ8B7c9QvuPUHt8B2fEn5/ecH2h+89Qe29Qe29Qe29SHuPH5ABAfgfv8APnHwQAAAAAAABrOgtPG1kAAAAAAAAAqjIG8bM6CRAAAAAAAAABuUEJAAAAAAaz+0dh7AoCWI5rz8eeX17AAAAAAAAF7LoPwP3gsAHP8AQc+ccEAAAAAAAFGghkAAAAAAAAAHkPG2MGhncEgAAAAAAAAAus6C4EAAAAAAB2fGfRj3AqABwP5vs+qgAAAAAAAA/eXo/wBAABRzvRc0ckAEAAAAAVosBJAAAAAAAAAC2aFyKwN1BmAAAAAAAAAB5PHslZLkAAAAAAANfTvm30osFAA4fwfQB8/fQB8/fQB8/wAfQ/RPnYATze57Pbnz99AHz/yd5DnugpQBQBx/YfPz80AIAAAANGdXBvNyAAAAAAAAAVdEsEyAG8oAAAAAAAAAALBYAAAAAAAAHsfSfm/0gBRQAAAB6PveifOwAn7fb8R24CpRFgKAAeH5p1/HgAIAAAs2Z0DKAAAAAAAAAC3RlYXAAAAAAAAAAAAAAAAAAAAAAAFHtfRvnP0YBVAAAAB6PveifOwAn7fb8R24CgAAAJefOa9IQAAAAuiUEkAAAAAAAAAAHk8dEAAAAAAAAAAAAAAAAAAAAAAADySD2fo3zf6QUKAAAAA9H3vRPnYAT9vt+I7cBQAAB4zw/Pfc/NQAAAAeQxqUZuQAAAAAAAAAAAAAAAAAAAAAAUl0MLAAAAAAAAAAABYPY+k/NvpJQoAAAAD0fe9I+dABP2+34jtwFAAHqnm4jw/nAIAAAA3impIAAAAAAAAAAAAAAAAAAAAAAANTRNSDIAAAAAAAAAAAAex9J+bfSShQAAAAHoe/+OcNZomfJlP2u25DrwFHrnsZ5znTpeU8QABAAAAAAAAAAAAABSKIAAAAAAAAAAAAaI0BCQAAAAAAAAAAAAAPY+k/NvpJQoAAAAhea6TiT8fOoMifs/rcgOp9X8Ae/wCjCgAgAAAAAAAAAAAAAACzZWKMgAAAAAAAAAAA3imkDIAAAAAAAALNmZ5MmQAAAex9J+bfSShQAABAQ8Xzrp+UGQBAAAAAAAAAAAAAAAAAAAFtCUYAAAAAAAAAAAUmlLjeSQAAAAAAAABoKGUAAAAPY+k/NvpJQoAACA8Pl40/J9cQAAAAAAABZoqaMTWQAAAAAAAABvOzNuRmwAAAAAAAAKIAUmlBDIAAAAAAAAFoUGLAAAAAD2PpPzb6SUKAIAWTmxyYAgKCAAAAAFDQMoAAAAAAAAALNmZvJrAAAAAAAAAAVoYA8nj2DJcgAAAAAAAAKaY0XNyAAAAAAex9J+bfSShRAeM8ni/C5k/W/AAAEAAAAAAaz5CARkAAAAAAAAAbzoAYAAAAAAAAAujOgrIzvGimS5AAAAAAAAA1SagzLAAAAAAADz9/85H0efOS9/6PIw/d/I8UGRAAAAAAAABozd+M0yAAAAAAAAAKbICZAAAAAAAAADcoRkAAsAAAAAAAAA0FlGLAAAAAAAAAADbJbkQAAAAAAABrOhQucgAAAAAAAABrOzOrkuAAAAAAAAAFGgxqQAAAAAAAAAAAKNWBlAAAAAAAAAAAAAAAAAAAABZ5DNBGQAAAAAAAAABvAsAAAAAAAAAU0UZuAAAAAAAAAAAADdxoZgAAAAAAAAAAAAAAAAAAAAHkPHsGbkAAAAAAAAAAAAAAAAAAAAFNAhkAAAAAAAAAAAAAWAAAAAAAAAAAAAAAAAAAAABrI3m5AAAAAAAAAAAAAAAAAAAAANy0iZAAAAAAAAAAAAAAAAAAAAAAAG80ud5MgAAAAAAAAAAAAAAAAAAAFItMgAAAAAAAAAAAtyAAAAAAAAAAAAAAAAAAAAAAAFaEuS5AAAAAAAAAAAAAAAAAAAABZsXGiZAAAAAAAAAAAAAAAAAAAAAABrOhnyQwsAAAAAAAAALpCkLgAAAAAAAACiAAAAAAAAAAANUWBmAAAAAAAAAAAAAAAAAAAAAAAC0ECAAAAAAAAAAtC4AAAAAAAAADYJkAAAAAAAAAGwlCZAAAAAAAAAAAAAAAAAAAAD//xAAC/9oADAMBAAIAAwAAACFGEEEEEEEEEEkEEEEEEEEHEnkEEEEEEEEFE0EEEEEEEEUHEEEEEEEEEEEEUEEGEEEEEEEEEEEEEEEEEEEH0UmEEEEEEEEEHGEEEEEEEEEEEEEEEEEEEEFH1EEEEEEEEEEEEEEEEEEEEEEF1XEEEEEEEEEEEEEEEEEEEEEUFEEEEEEEEEEEEEEEEEEEEEEEEkEEEEEEEEEEEU0EEEEEEEEEEEEEEEEEEEEFEUEEEEEEEEEEEEEEEEEEEEEEFlUEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEFXEEEEEEEEEEEEEEEEEEEEEEFUkEEEEEEEEEEEEEEEEEEEFkEkEEEEEEEEEEUEGEEEEEEEEEkEEEEEEEEEEEGUEEEEEEEEEEEEEEEEEEEEEn0kEEEEEEEEEEEkGEEEEEEEEEGGEEEEEEEEEGFEEEEEEEEEEWUkEEEEEEEEWEWkEEEEEEEEEFEUEEEEEEEEEFFGEEEEEEEEEEEEEEEEEEEEEWkEEEEEEEEEFHUEEEEEEEEEEFFVGEEEEEEEEEGkEEEEEEEEEEFGkEEEEEEEFmEEEEEEEEEEF12EEEEEEEEEE0GG1UEEEEEEEFEEEEEEEEEEEEGFGEEEEEEEFUG2UUEEEEEEUGGEEEEEEEEEkFEFkFEEEEEEEEkGEEEEEEEEEGHUkEEEEEEEUE0iAAAEEEEEEFkEEEEEEEEEEkEEEEEEEEEEEHkEEEEEEEEEEEEHGEEEEEEEUUUQAAAAAEEEEFEEEEEEEEEEG1XEEEEEEEEEEFmHGEEEEEEEEEEEEEEEEEEEEE1DAAAAAAEEEEEEEEEEEEEEEGVEEEEEEEEEEEFVGEEEEEEEEEEEEEEEEEEEEFlyAAAAAAAEEEEEEEEEEEEEFEFEEEEEEEEEEEEEEEEEEEEEEFEkEEEEEEEEUkFkAAAAAAAAEEEEEEEEEEEEEGEEEEEEEEEEEEEEEEEEEEEEEEVEEEEEEVFGEEEUEAAAAAAACEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEGEGEEEEEHkAAABAAIAAAAAARQkEEEEEEEEEEEEEEEEEEEEEEFHGEEEEEEEEEEVXEEEEEHEABiwBRQAAAAAASAAgEEEEEEEEEEEEEEEEEEEEEFUE0EEEEEEEEE100EEEEFkAAnlwBxAAwwwABiQEEEEEEEEEEEEEEEEEEEEEEEHGUEEEEEEEEEFEEEEEEFEABUFkEEEEEEECySygEEEEEEEEV2GEEEEEEEEFnFFkEEEEEEEEEEGWEEEEEEEEByBEEEEEEEEEBBDhAAEEEEEEEWkEEEEEEEEEU00UEEEEEEEEEGXWEEEEEEEGUzwzDDDQAHnHUjiABQAEEEEEHVEEEEEEEEEEEnEEEEEEEEEEEEFFEEEEEEEEGESgAAABQAGkBDAgABAAEEEEHXmEEEEEEEEGH1EEGEEEEEEEEEEEEEEEEEEEEGESAAAABQAGkAAAAAQEEEEEEHHEEEEEEEEEEHFEEEEEEEEEEEEEEEEEEEEEFF0EAAAAABQAGkAAAASkEEEEk3EEEEEEEEEEEEEEEEEEEEEEEGk0kEEEEEEEEEGF0AAAAABAAGkAAADgEEEEFEEEEEEEEEEEEEEEEEEEEEEEEE0EEEEEEEEEEEEEH0AAAAAAQTGEARzAAEEEEEHEEEEEEEEEEEEEEEEEEEEEEFUEEEEEEEEEEEEEEH0AAAAAQAAmHGAAEEEEEEEEEEEEEEEFEEEEEEEEEEEEEFEEkEEEEEEEG3UEEEH0AAAATygAEEEEEEEEUEEEEEEEEEEElEEEEEEEEEEEEUUF0EEEEEEEEU2kEEEH0AAABygEEEEEEEEEEEEEEEEEEEEGHHUkEEEEEEEEEEHWEEEEEEEEFlkkEEEEH0AATgygEAEEEEEEWVWkEEEEEEEEUFEEEEEEEEEH0U0F0EEEEEEEEUEEEEEEEH0ATQyAAEEEEEEEFEWkEEEEEEEGHF0kEEEEEEEEE1FGUEEEEEEEEE2kEEEEEEEEBAwEEEEEEEEEEE2kEEEEEEEFEFmkEEEEEEFFGUFGEEEEEEEEEFlkEEEEEEEEEEAEEEEEEEEEE0kEEEEEEEEG2WkEEEEEEEEmW0EEEEEEEEEEEkXEEEEEEEEEEEEEEEEEEEEEEFEEEEEEEEEEEUmEEEEEEEEHEGEEEEEEEEEEEEGkGEEEEEEEEEEEEEEEEEEFH2UEEEEEEEEEEFEEEEEEEEFE2EEEEEEEEEEEEEEGEEEEEEEEEkEEEEEEEEEEEUEEEEEEEEEEEEEEEEEEEEFGGGEEEEEEEEEEEEEEEEEEEEEEG0kEEEEEEEEEEFGEEEEEEEEE00EEEEEEEEEEEGEEEEEEEEEEEEEEEEEEEEEEUV0EEEEEEEEEEEEEEEEEEEEEGF0EEEEEEEEEEEEEEEEEEEEEEUEEEEEEEEEEE2UEEEEEEEEEEkEEEEEEEEEVmE3EEEEEEEEEEEEEEEEEEEEEEH2EEEEEEEEEEEF0EEEEEEEEF30EEEEEEEEF110EEEEEEEEGEEEEEEEEEEH//EAAL/2gAMAwEAAgADAAAAEN//AP8A/wD/AP8A/wD77/8A/wD/AP8A/wD/AP8Asv8A/wD/AP8A/wD/AP8A/b/f/wD/AP8A/wD/AP8A/wC3/wD/AP8A/wD/AP8A+/8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A+e//AP8A/wD/AP8A/wD/AP7/AP8A/wD/AP8A/wD/AO61/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/APX/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wDP/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8Arfv/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A9vf/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wDvf/8A/wD/AP8A/wD/AP8A/wD3/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AL//AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8Af/8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A7z//AP8A/wD/AP8A/wD/AP8A99//AP8A/wD/AP8A/wDv/wD/AP8A/wD/AP8A/wD/AO1/z/8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A9/8A/wD/AP8A/wD/AP8A/wD/AN//AP8A/wD/AP8A/wD/ALn3/wD/AP8A/wD/AP8A/vT/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AO7/AP8A/wD/AP8A/wD/AP8A/wD/AOv/AP8A/wD/AP8A/wD/ADfv/wD/AP8A/wD/AP8A/nH/AP8A/wD/AP8A/wD/AP73/wD/AP8A/wD/AP8A/wDP/wD/AP8A/wD/AP8A/wD/AD/92/8A/wD/AP8A/wD/AP4+5/8A/wD/AP8A/wD/APx8/wD/AP8A/wD/AP8A/wD+f/8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8APzv/AH//AP8A/wD/AP8A/wD07/8A/wD/AP8A/wD/AP2+3/8A/wD/AP8A/wD/AP56/wDf/wD/AP8A/wD/AL6//wD/AP8A/wD/AP8A6w3/ANv/AP8A/wD/AP8A/wD++u//AP8A/wD/AP8A/wD+Pf8A/wD/AP8A/wD/AP8A7nMsMIX/AP8A/wD/AM37/wD/AP8A/wD/AP8A/wDsf/8A/wD/AP8A/wD/AP8A/wD3x/8A/wD/AP8A/wD/AP8A+/8A/wD/AP8A/wD/AP8A/X8888oW/wD/AP8Avb//AP8A/wD/AP8A/wD7v3//AP8A/wD/AP8A/wD/AP8Auf8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD2NLPPKFv/AP8A/wD3/wD/AP8A/wD/AP8A+37/AP8A/wD/AP8A/wD/AP8A/wD/APf/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wC8vzyzzzyhb/8A/wD/AP8A/wD/AP8A/wD/APt+/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AO/9/wD/AP8A/wD/AP737/b8s8s88oW//wD/AP8A/wD/AP8A/wD/AP8Ar3//AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8Aft//AP8A/wDvs000GsHzzzzzyhb/AH//AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AO+//wD/AP8A/wD/AP8A/wD+P/f/AP8A/wDPXzzzyib7zzzzzyx7v/8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wC7/wD/AP8A/wD/AP8A/wD9t/8A/wD/AP8A7j888888W8888888kae//wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wBz7/8A/wD/AP8A/wD/AO/33/8A/wD/APw/PP8AvbD5LDDDTTzzT9f/AP8A/wD/AP8A729//wD/AP8A/wD/AP8Az/7+9/8A/wD/AP8A/wD/AP8Adv8A/wD/AP8A/wD/ADzNP9//APvP/wDwlKIKF/8A/wD/AP8A/wD/AH5//wD/AP8A/wD/AP8A+8/27/8A/wD/AP8A/wD/AP357/8A/wD/AP8A/wD88wf/AP8A/wD/AP8A/wDSUg84W/8A/wD/AP8A9x//AP8A/wD/AP8A/wD/APe/+e//AP8A/wD/AP8A/wD+/wDv/wD/AP8A/wD/AOfjR77zy5L9vGcoTjyhb/8A/wD/APv/AH//AP8A/wD/AP8A/wDjr/8A7/8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/APwDPPPPPAv7fHOPPPOFv/8A/wDv/wD/AP8A/wD/AP8A/wD/AOP9/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AM7/ADTzzzzwL/nzxzzygXf/AP8A9+//AP8A/wD/AP8A/wD/AP8Av/8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD9/wD8888888C/p88888nXX/8A+/8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AO7/AP8A/wD/AP8A/wD/AP8A/wD7/wDzzzzzzgL+nzzziic9/wD/AP7/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD83/8A/wD/AP8A/wD/AP8A/wD/AP8Azzzzzzy7+nzyywx//wD/AP8A/wD/AP8A/wD/AP8A/wD3/wD/AP8A/wD/AP8A/wD/AP8A7Xff/wD/AP8A/wD/AP8A/wD/AP8A/wD/ADzzzzzzq8f876t//wD/AP8A/wD/AP8A/wD/AP8A/wD/AD3/AP8A/wD/AP8A/wD/AP8A/wC/3/8A/wD/AP8A/wD/AP8Af/8A/wD/APzzzzzTC7//AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A6+//AP8A/wD/AP8A/wD/AP8A/nvf/wD/AP8A/wD/AP8A/vv/AP8A/wD/APPPPPOPT/8A/wD/AP8A/wDrv3//AP8A/wD/AP8A/wDjz3//AP8A/wD/AP8A/wD/AO5/3/8A/wD/AP8A/wD/AO2//wD/AP8A/wD/AM884MeTS/8A/wD/AP8A991//wD/AP8A/wD/AP8A7+//AP8A/wD/AP8A/wD/AP8A/v7/AP8A/wD/AP8A/wD/AP29/wD/AP8A/wD/AP8APPHIFP8A/wD/AP8A/wDrb/8A/wD/AP8A/wD/AP8A8+3/AP8A/wD/AP8A/wD99z+//wD/AP8A/wD/AP8A/wDs/wD/AP8A/wD/AP8A+d7759f/AP8A/wD/AP8A+5//AP8A/wD/AP8A/wD/APf/AP8A/wD/AP8A/wD/AP8A85//AP8A/wD/AP8A/wD/AP8A/f8A/wD/AP8A/wD/AP8A/wD95Pff/wD/AP8A/wDrfP8A/wD/AP8A/wD/AP8A/wC+v/8A/wD/AP8A/wD+7/8A/wD/AP8A/wD/AP8A/wD/AP7/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/f8A/wD/AP8A629//wD/AP8A/wD/AP8A/wC//wD/AP8A/wD/AP8A/wD7H/8A/wD/AP8A/wD/AP8A/wD8f/8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/APv/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP7/AL//AP8A/wD/AP8A/wD/AP8A/wD7/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AH//AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD7j/8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD8/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/v8A/wD/AP8A/wD/AP8A/wD/AP8Av/8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wCf/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD77/8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP3/AP8A/wD/AP8A/wD/AL/z/wD/AP8A/wD/AP8A9/8A/wD/AP8A/wD/AP8A/wD77P8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/APf/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/AP8A/wD/xAAUEQEAAAAAAAAAAAAAAAAAAACw/9oACAECAQE/ACAv/8QAFBEBAAAAAAAAAAAAAAAAAAAAsP/aAAgBAwEBPwAgL//EAEMQAAECAwQHAwgHCAIDAAAAAAEAEQIDQAQFEDESITA0QVByBiBTExQVMlFgYYIiIzVCUnGBFjNDYnORobEkYyVUwf/aAAgBAQABPwI5UowekZaNMAmQTI0jIjAmkCyTI1YpQcDSjDUnpGqOCCPMMsHT03CkGDop6QZLNZJ+XhEYZcsZZYPShFPzCHA8rGBXCofl4wZOn5XCnWSf3JflYTLJakfckHlz8wC4o+4wy5iyBRKJ5UyGaPuS2DJ+W6keVMgKwJ0U/LDgTysJlo1LILitSJ5WAtSdE8rCKBRqBgydGkNOwQTI8rATLUjVOhSDAhNSBFa03LGXBBGpCOD0nBOjShPShk2tGlAWpOtaeoZaOJpNHDVSsiMCaRkCinpAtWD0bIZ90FFGkZAa0UcuWMs0yekbE1bo0bIFEJ6QYOjqT0kKdFPTHXTFDAIjABqbUsk9IyyWaNGyC4rUjRhMtWD0gC1J0TgE+tGlamCIRQpBgydGmZGkYIJkcCmTomkFOE6yT0rqEFS7vtk31ZMSguC2nPRCHZuZxnw/2X7Of96/Zz/vV4XV5nLhj8ppOdsy4orgtKjGLdzNOno2TBZLVSBMgmRNLZ7DaLT+7l/rwVm7PyxrnzH+AUqyWaT+7lQjvdod2l9e2FOCn7wpQ6K4U7o0bKTZps+PRlwuVYrjlS2in/Si9nBQwiHIbDtFu0vr2jJkExRpGRGD1DIZIFZU4pbvu6bay/qwe1WezSrNBoy4W/8Auy7RbtL69oMGRJps6vJauWXXdRtB8pM/d/7UEEEEIhhDAbPtFu0vr2vCkGDo6k9QyCIXDlYV23cbXMeL92M1DDDDCIYQwG07RbtL69q9IyywNXlyyx2aO0z4ZcP6qRJgkS4ZcA1Da9ot2l9deEQihVwo8rGFz2HzeRpn14/9bbtFu0vrrwnWSesPLLqsvnNphf1YdZ2/aLdpfXWhaODIn3JuOzeSsgjPrTNe37RbtL669xzAJkaEQxRZQkqCwWyP1ZEaF0Xgf4K9DXh4S9DXh4Sm3XbZUEUccDAYWeUZ0+XLH3ogFDCIYRCMht+0W7S+uuHMQE+BO1k2edOLS5ZiVn7PTYtc6Zo/Aa1Juewyv4ekf5lDLlwepBDD+Q7t/wA3QsYh/HFhcMrTtul+CF6DtFu0vrxAwPuVwTJ9pKkzZ0ehLhJKsdwQhorQX/lClypcuHRghAGw7Rx/WyYPhh2cg+hPj+LUHaLdpfXiMT7jhaSK0tpYLrnWsv6sv2qzWSRZoNGXC3x2V/H/AJ56RhcAawP7YzQdot2l9eJQR5eQm1UzIZLitSO0uq6DOadO9TgPaoYRDCBCGA2d9H/yE3C5fs+X+ZoO0W7S+tALVg/MmFKU2B2l0XX5eLy00fVjIe1M20vj7QnYXL9ny6DtBu0vrQTI8whqHQR2l22E2ue33B6ygghghEMIYDa3x9oTsLl+z5dB2g3aX1puYtg4pQE2D7SCCKOOGCEayWCsNkhstnhgGf3j8dtfH2hOwuX7Pl0HaDd5fXSBMoqoBMyK4UrIYHa3BY3iitEXDVDsIo4IfWiAXnllH8aD+68+sfjwLz6yePAvP7H48C8+sfjwLz6yePAr1jgjt02KEuMLptdnl2GXDFNAK8/sfjwLz+x+PAvP7J48C8/snjwLz+yePAvP7J48C8/snjwLz+x+PApc2XNDwRAjv9od2l9dIAnwJpIe66zWVKC6K4J9rBCY44YRmSyssiGRIlyxwHfvG+tAmXZ8/wASmzps3XHGTRdndzmf1e/2h3aX10nBMnqXTo0oCbA7a45HlbZpnKAP377tplSxKgP0os/yTomi7O7nM/q9/tDu0vrognRT0xx0cAnpGXBAI7fs/J0bLFM/HF/rv3rNMdvn/At/ZE0d1yPIWKVCczrP69/tFu0rroGQXFMiaMJk2GWEOBFKETg9Bd8vydikQ/yD/Ovv27fLR/Ui/wB0d0XaZ0YnTB9WMvjsO0h+rkD4nbhFMcDShMosMsNKl1JlqRNBAHjhHxUMOjCB7A3ftV1W6O0z4hJ1GOJeiLw8BeiLw8BeiLw8BeiLw8BeiLw8BeiLw8BTLstsuCKOOSwGfdkSJs+PQlwuV6IvDwF6IvDwCvRF4eAV6IvDwFBctviPqCH81ZLhlQERT4tM+zggAAwGw7RR/XyoPZBQaSCNG2GSzWl3MqbNEomhswe0Suobe8txtPR3bg3/AOQ7Bu/e03ytvnH2Fv7bYBNg9IMcu4U9MCjRWTeZPWO5w2d5bjaeju3Bv/yHbWiaJMmZMP3YXUURiJiOZ2rIJkaRlDhF3Tyqyj/kyesbe8txtPR3bg3/AOQ7btBadGRDJH38/wAtrmiUU9IMGT8wsu8Sesbe8txtPR3bg3/5DtYiIQSeCvC0+c2mOPhw2gC1YE078vbCzbzJ6xt7y3G09HduDf8A5Dtb9t3kpXkID9KPP8tmEQuCDo5078wfCy7xJ6xt7y3G09HduDf/AJDtLXaoLNJimRfop86OfNjmR5nZhE68H9yAirJvMnrG3vLcbT0d24N/+Q7OZMglwRRRFgFeV4RWyd/IPVG0bAn3KKsm8yesbe8txtPR3bg3/wCQ7KZMglwGKMsArzvOK1xaMOqUP87TMJ0Ty8Jnwaqsm8yesbe89xtPR3bg3/5DsbVbJNlg0pkX5BW+8p1si9kHCHahHmAT4PVWTeZPWNvehawWjpQRCOHZ/fvk75ihhDksFbb9ly3gkfSi/FwU6dNnx6cyIk8+ZBMjV2TeZPWNvfcWjYI/iUAnx7Ow/XzovZD3Z1qs8gfWTYYVae0MoOJEGl8TqVpt1ptJ+sj1ezhyJsDVNgVwrbJvMnrG37RTPq5Uv2l1wTJ8LrvKVYoY9KWYjEV+0cjwIv7qLtJ+GzqZ2htR9WCCFTb0t031p0X6akSTmeSDBkRUAIIp0TW2TeZPWNvfc/yltMP4NWGlyzhgaplkiaNlw2Vk3mT1jbT5sMmVHMiyhhdTIjMjijOZLo8sYYPWGlZNsbJvMnrG11q/7V9CGzjjriR5WyCZGpFPCjs7JvMnrG1nzoZMqKZEdQVpnxT50cyLM0YTLgmpnTVLJllgaRsNSJ2Vk3mT1ja3zePl5nkZfqQ/5NIE+D0urDKjHeCKGVIAmRQ2lk3mT1jaXzemi8iSdf3jSMgmpmpgO6AnWSJowE6zwfaWTeZPWNnel8aDyZB+lxiRL0hXBPS8Kfh3ckyNIFqRT7WybzJ6xsZs6VKg0pkTBXjfMc15cn6MHt4mjAQRTomkZalknpAn7pQpWwDInbWTeZPWO/HMglwvHEAPirVfsqDVIGkfbwVptU60R6UyN6VlkiaXWEUcqQYMjhwWeBNIKKzEQ2iUT+ILz+x+PAvP7F/7EC9IWLx4FHe9gg/jP+SmdoLMPUgiiU+/rXFqgAgU2dNmnSjjJPxT0r4GjCIXBA02vA4hFPRhNg6JpGCbA0gFTknpdJOj3SaRsBT5ImjZMssDSaKCIRypAE2D1DIJ0U9MEaQFFDljIYGpGGpE8qZBOskTTBGkzT4OahkyzCCPLWR5WAmwNSMX5YeWshkgjVnlrYPyx8H9yAin5WwTe5hPLMwnR5gy+77jBHmACfB+VBEI+5LIJkeVjEt7kHB+WDLB+XshTMginT8s1YPzDLDVS8EyyRo2TU4WSZcOYBFBGldayjSstGlyWvA8p//EACsQAQACAgECBQQDAQEBAQAAAAEAESExQBBBIDBQUWFxkaHxYIGx8MHR4f/aAAgBAQABPyHCnFVMou5v8Ry44QW1HPoPZmDLFt4dsWTMqDHcdvED3ZRBqWcTXMq19ohzHivC54ysp4tkbHjX2hd/HQr34W+lvafMq8vEp6fGJqpg49OBemBMJKd42eMt8QqZjZDPMSMU8RxiKfkR9PrMsmypUPHvFcQPeV2amHMbPFVMwMS3p9JNpaM1uX6VXUSn4hvJDCuXx9K9P3i5pmOpjsjb0sbYWwxf6RT/AAgyXF3FX0ojKuoZZlbR36hrk0RbfSxplZuJii49PZqVQhb1K/gq9RUDM7EQlnpRY3B3TZ/hNolkPdGxXpYIXCnMZpePSrVcs5dMM3mGSKfSzfSXuWelr3hR6HDyL1cyJaRbzLPS+5C2JhhmHHpYtI+0xZm2+RvEVmPefKK3hAsqCq41SyIyQq32jt9LsmORiKICjlXltrFt4aTUS8ksjXiG2K8EsSjmLmr4muMFtdJmsvc2eSKLYCuiniGLQyisu4t8RVK+0G9y+G9GYQcyuJZGmoBxKDiPx45mKJaHtKzbFnhmWU95rDKGYvEPfKIOZZriAC2WYYk7RtxH2lCYSyXrhlyDu8Nm4kZrLeGNLlEWHjVPtKvM2/ETPEt7RKQruNuIJ6BbEBRxAQuFOelX0AC2YYDTHbw6BmAEsySxsi3w1TKHM31FC3h0wZZe4qyRTxDczfxMmOKbnbLb6KmWQyVNiOXhm4g5uZ4l2qNuId7KfolGUdvDvVxWRaj3xW8MC5m/xKWpfZiAo4neZlMMMt103iiNLlvEUdAAu4tvDreZRmBTE0zL4e0RX4lzvPluIXHEBdQ9mWub8Op3IjUxbuO3pTvPeSnclnE1si0Z3Erim25RxM/RG/FtEuBX2Jk3D3qib3/fcqfhRf8AWf8AdT2snXnFiBoxVqbtLVXDNsW8BLTepRzF+ephHPEbcNvqUbn4S94tvDAuY+2WJTdy7HEAC2LF1e/EUqH9MggUverfu8WKXqWO4oFHEoZWDZmX4FTHLw9yj6QXkjjPijTK0kQNSnbhbjSFGP8AiBf4Lg1AB2DocIhMUTWoAx8QuZlENx9nHC2NJhaWtMW0W3jLFcUWsLl9/pDpx3e/1R10OGT7TN12lLxAY4lSrpn4R3yDc+GfKY5i2+k76FiQv/SGDwAOQV7S+GqZQ5m9RQ35F5gyxsny9LVMrEi5e/xDcCoDtUCuQRQriF5T9Eocx3yDDLxZKGZHxFv0vuH7ewbZQwL7+mFWUTTETTcvlLtHn0vaNaYFH3X47DwV6SRzAOJn6I8vqK30yvGfrB6WQtj7IYcym7naP4TTj/w9uleQehENMruMYKdvT6940Zvwfx0E26/qdwn1n/Bn/BlBV5b6f/UaIWtBQfT00nYnqOC2HZFrtLPNs+vjX3lUI/VT8tlc/HIHh+AQ+3TOzC/+OGVkDNQU/wAJp9pVwLvHCvMMJfYJmzf1QEFdg6VKlSpXS2/pr0EYbAeGVjMw5iC5gDX8HOZg6irJFPmGXf5P0hM/u7n6sPJvD26Q+84QImmJbtEPpwWyiI40SXMoWopR9jzKOp/fkMgKA7eXZ/V0NcFAuZ7ZdYYnt6ebnwyiqj7nEMsto1L+8scO5S8eZVZZ9SQAoKDwr1PB/k6f6fOXobiwUl7jz6hos3LxTxryzmLPmHljOv8AyAcBQe1eF6bmfD/k6f6fPWKom0VGr9QobmDJO7Ft4mC2IqzpevMuRVj6ynZ29xeG49Lz4v8AJ0/0+bfgS0eHW8xo/E24oX4SZSkF5JrLiIkHNKYivxKXjzat43fd7+G+ov3Jr/YuzJ+4n7yfsJ+4n7yCjfSdCh67Fn7CfsJ++n76fvp++n76fsJX+mlHv1XwKuJMFsOyLXaWa4i8AAXDK6ggzKRuLfE7iJGObS3v5ox2If3AZ9/6+Bel1uY3Iw9v9TLffdm+D+a/wi9dzfFin2iXA49nEq/CBMyntMaSLfEwWyjqXeGPsedWB/vOodV6XKv52vaPlLOEM3y/w6YlzUviQbZvUwyRbxCaqiZ6303LdEEbPDGmNiGaRBm/nm9v8PhVKIqOqf4SzhbaIpKi/vmpqVfWuCFpkal1pKObna4Ytm8r2ZfZlgx02mj5mC+LkyhjqyX4H1eOtfgV/wDNlw89N275ojqDfhH6+8/aW0T5pY4ZS8cQHtF2dyw9VAmEs6Ft4ZvMfdMMktbmCjgfMAPvCH0H2S+nvLx1SsvDZq58j7k+R9yfI+5PkfcnyPuT5X3IuAdqzHht6ruvpPnfcn7wn7wnzvuSvPzHPj6WDQAMB011Drfe733eBaWW2K3hiZWYtAJpPozLvpspgUeMYSjBLODQPfwWpjrXj/P+Z+nyFbaq/h5wbYirOl64l7iXqYSncwMeDtY241DKXjiIuJDoPJ/P+f4eDWQkIZaW/wB+YiS7BimKX4lLxwwuKOgsfEVvpSEglzT0ryvz/l+dTw3Uyr+h5o90QmlxXEdMvNT3EWRVfT+8gYlHm/n/ABeeKoeFSqBa/SLf70fg8zBbKWpd4Z2DjDi5a79PtVw2S2CBrzvz/C/+hl7f/vy1TLC4ZpAHkRT1DS5QkudIrzfz/B9u9GHu+0eq3v6fHl7yiHOSL/hD7R9olC4Goeb+f4HinHa/SWQxj8pN5jUxySx3OweoVi+SYivqg838/wCf55RWrM90YP8Ab5hBpiWdvT1TGiyIoS3t6Sj8p4dfkiUp9x+kyHH/ANPmqmbY9QN5mDibLIv0lAfVfzCO5RO3oN/ZeNwcNqwYJqtrHCX3fXhsFYelU49KR9MhLIdkaCKdpf7BOly5iWj4hc/aWKr6aWxX2cehC0rNQU8oSXAyRozdpb7+loMM5VEJEsUY6DdtLGsE/VoX/wBmB/jLl2CHtg/EQtF9/RLdphzELuUd+RZuIFLgUxNMwKo9JQvUw3B+/vHGT004wgtxCcmrCpXuy/6SzBw2krbioeu1YL+ojOUn6x0V6WFvQ1hlAxyhSAuWO8cQyUzSo/PioZUCI/8AkNEoa4lYvj5hBTUVc1OSbZs1iMt4gzE3BszHhoXpcPUDf1jFZeGqY2LIlipb24gW1GgqFSo2yRUxLvj63C+4EJfeLtxA1mVWtT3yzhoXpiLRbMgZ8vEDeWYOJdmIt4g0x74I4l9k3wgLnxKvpLJibLl8OyYZhsslqzw0L1O/Sjnevt8HEGkwKZv8Rc0cQFijpYGOJZ4ESXblFqXaezwwq2GV1LBMkU8RF3FqXi4QLdO2fB8xEq2vfhAsDJGjN3luKeyL2iU8U9vgMmYZTe474iEpmM0sinhIXrXtHQS7sBs9zhi0vtMXct2lEzOwcSiYmOJ7u0r2i3wxbKDUcZOlNX0tWJkZjxL1O8HdLOIh1FhV3Vf7FFvvcTdAux2OIlmOnaWa4gLAgLyTscOlmRHDEOZgV0GKIybzPZ4hzLrcRS+A8lAyz99M3/pENl/cO0+5Mb+MmFV7hbPkZyuX4oiAuWO+GLcyifGZJdLFV4RuKhRAneGYYOrzUValq4YEgAzKHUp3ln04ffoXGyYdxAY4l0KTJHct4gWyzU/CUNS74oSx58NnEFubKYKtjvimSLAJrPDvVwkIS4+xwwtj7Jg5ljZFXEWStY6a8jXEOYsZrcU8ZUzfiUTTEyM8U3G9kx3jjTHPCqCe00qJ2IQeTgSs2S3uXPpSiG4BxNviYKOM+024ggqNNTZfJhpFEIBNxW+lmTMCpvcd8fTHPDslO02UxUUcl2VC3cruMbelU9NSoZMx3v0o3EJZOxAjHnlDTHj0y8XKOoWbj7fSwtjRJvJL8y8V6Y+0VYJavS8EsTDFAo9QrF8qz0w0RBiIT083GxZKin2/gqpm/qFjKDidsR9Ki2UQUH8JEzHEvcwweli2D2Y0GZgx/BguBmKsEuyX9NM3HCn0/XEO+MJmDUGMQCZiAx6WFswxNZlfaLb6eXHySpfjiHtl58tRFY4aiFi+ObKiCjbJHFPUN5vLBcVvFEQh2nEGymFBJbi6Q+M3h3BXfiVi+L//xAArEAEAAgICAQQCAgICAwEAAAABABEhMUBBURAwUGEgcYGRobFgwdHh8PH/2gAIAQEAAT8Q7jPFoGLZepXCr8oxKUcLdqilC29TTeY/2BG1S5YPDY26nU2eSUVOZc6VDwdcQQO6bY4l66uLjo4iXBjU1mVv6mFO4AC3+KVbxhVK4hY2bmo7gv2uY8HmOTiZrdylDmKao0/UZjI4QKoLlN1WYWDaUOt+CYHCdEd8MYsFjhpjaSGJGJWj8z8Pa11KppgDsFfMMow/XUKnsf5jXTriGMxLSZvh5bruAioWM0FTAtPU3PEtwCydSZgDELSgpm/yv4hgh3ByNzF7CQBVbuK149/oly+CFsIX3lleXaIx4zN9dS+JUeGL9yVCX8cCtEUZKgze5bu5SowxTt+KdFbZTvlErC8VTg1x257efj0GcOgYe42W6+o9hcZ5+LDyMB/0RtMqE11yAz8gwUWkRc/qO5+KYb66jYV/EugMMpcpbo0fHVKiKpOTd+pYNVfxdQyjTglqksmIKPj9gb8zMBi4pokijYn/AAQhrF6+RLPZme0yNFRfr8Ud23iV1Gp/kcg+Q20QPNSjqCWwljXxf+vYhBuZG9xYh8UhgxMu9HLSqzepkVMksVdXUazBe5sH4utb1LUeIQU1AZRXpXxLhWrqEyaY5YSDBd8g3H8R0ClxaUwxyAXCrWj4q4SKyHUR4V/EQ6LJZQVDfxWRaueCUTQtXTEmC/vkUrc8aJfIowDjchYjHC0pLXUw31xhFKNTCangPiLkQODR8XTtaIWFiupk7z3ymg02S/EALB+4jrw0P8oBNkw26YxVTiDl6iujBClZglur/UYVicP/AHEVTxv2CLL8QYDAM7qPVyRrrvRMzQM0wGlxxKedGLEChT6ibK8RXZMVw5aURQtNHDzAyxrJkiroU/UUbE4l1vRLwBvuYVeYd0IlUUZvjC1RA8OmFGyYltkbWMEBaal8IIB3CjOUKH9TO2uWK8S4tVFN3iACyzxKVacTsawV/QzK5E/jzXDIvym+xG4E7i1KP3L4RXjmaw1+JANiXS8TIvcUMvDEhM9TdJaYgum5pvfp1wkpp3Km1ShFkDURqcDzAEDiHCBWiV5ipp1Mh1iALsOIFYREczELU/tVxMy/xEod+gtJSKPU3ugHjDEabJhDRw/tiRkZiZ2YlNkd28PJ1cHhgMGkRYNwiqDhoVhzKE7IbOrjMTc2LxBYPLEo0CZG1d8UYXqXCmoThr0QaLuUbNwF/ZLVnBGI8NgFi4tJWgMcNk+4zt4lwJQwRZmMa8who4ZkP6gDdXEZTDG2SXK7wa4eYIEVsDqwZXO3iITMBHUQcYRpo1KFYHcRNkrvPqUA14ZcUvDBWgtgFpRL+4WdvEdnhv7nUv01CLp9Rtun3LFg0cOtblXGDIIClYiYC/8AfEywja1sCx1HdThlKUaYs4YrUzP94LrIOD0WgxMEWP2UXHqHDFPZGAzXURU44potEEq/zF0lw4oK4g02Q1n+pTvDC2Zx1hwVL+/uiA/rRP8A05t5TnZp4t912blADuPUFRfESIeTzHLfC2uiP4CFakNUNfZHtLJ6sC9kfwBGrfUeCZYAFwPSzKBZlf4iG1sz3D8aEBu2fESomPMUaUmg1xCZ3cDktyFX8s8/nGb0TT/uRgVr8vvPulFeoBtZ6lKtybw3O+Gkk9EvqYiiwcfhvtdxiprhgqiLaMUYJp24tQzJRXmWgRJ4QFAGYzpnXPgMDyvRGfMaDbARuorBD2C9+3qYhkitdp9UhWFZ7eJmFVxXZk8xBZyeJeUKOPQF7jvOTzCIDMwQSwKxHuddHFJclEy8MabIXbhtn6GfyjB3l9syg9kvft1r0YOSDCmZE8RZSfsi228EFaN+lt0xBTRKVkoQAqccgKK3GqEzDKtGIuY/Uz3HvhAqgtiI0zEvV0s6kGHUVAQfMc6h7K9+2NMzo3LXt4eSq4PIpkK6iZBYxxQVxwtqIF7ipXEYM0WsJcsX4pcHfUClE6r+LDCrOoGAEvbiSpXsr37iIO+JUta8QzBuE4cS0Bo5CQTqKrV9kSWlMXER+0ff4qk2Qcm3e03iU6TDyu1+5vMtv3F752dHcV2agUf6SoeHcUWDidcoLgteJa7b+KQG4lQXeobqkM7mdZJcr3C98668VVqL0XDpQQ5QqE2TJVXxmQFSIBAAMATZA91e+YeZ11A7fxG1CLNKEsyfz8giVffIdRKrT+Eqt98XvmVDGyVPMsU/3LmTXx4bQim9XDhiV+5XvvAg+RlQkveJP94gT6v9Z9X+sFjbOfTbl+hFS/xDMlm0Ao4C98y59CR38gakrxCcn9T74lOgCHuD0Jprh+9CC7H1T7+Dd+TQC1/4k/FQ9/wE57h1R/lbjwV79Ka2RUrEsCPIFNNQj8d3WqYdOSOcKIv/AGe47t8Wv5fBBRPOyfNqBBKz+YKSwmrmetwfF79CVNdnmBSdk88TEO3/AINTV1iX3euo4GkQ9bsgFe4e43L35k4W95n8+0A6+VyQxpwVXtmSS4OkqbisrcfjcVdRH5GADm142EKJgCGJkKxFd3n9wU6iV7Tp+p2grRGubxqB4PbT6oZeIX2uCvYLolLCriPF6YAQzuPxoUBuDZXmIFOIMu0d8MgD3A0P9oCNQYDQiWCvctMymgLHBQBgPcH+V6f8334tQ5Ff6GUXJiHj5AV2IqrdwELxBpufURNZxLHH2yhUn+uIUsxygfkXUSERAT8P8r0/5vv+qLAuiNPmZ4sctvDRKvvlgqB3AdbMAejuIfaPc8QnpeInQmooDB7i6CwmVVENej/cj7AfxTZZB/D/ACvT/m+9LUUIrmUAairlzL4N6O2op0XAwx1xVdH4dyxvcUK83MeBnIc8Lc2hElwVS/uAL0jXUe6d43l23fmIumpZDfJWhsG/hKnEZ6/LVraldeJ6JF9ezUpVrWtZ1OfmwVGvwM1HGY59GruPocAW1UJy/ufroJoUcQBR26/CxquIIWuUDBio+UXd4d1mAKySYBqPAwxcr3VaAb9qpVECPt3X8hFlAbtlub/bDpJVc9lSr/Wors3KPEo8SjxKPEo8SvSiUeJR4lHiV9SvqV9fjXFi5mhU2o0SuJX3Jgx6jHOKjVnOuGLQX9SkacP4BQROg+kAsBibvCC4lbgeBKVuk8QHlkFDUe8dpqfZq/EOoC3Mes0LcbmTlmua4D6Vu7pncyIkai9NT6EF4VU0PTBykxwYia6nZDK1O51whaEyQH2yjwsePQFUGZg2TI5gVuyNdL4WYq4dwUwlnCYlidRC0h7wpp/f/D7jc3iHbNhPHwTu1WDgsBALXAS8z5PksheUu9kTkRyVA9DD9jgDC1iAGxHP0YrgCU0cMKFqXxvHmYez9zAsp8x7QvpgmXcuVELNvXFFIxKeoLv5iuL98La8wA+kn3k/367R1Mys3LdejlUrgMdSWgKoiatdETkRrDNLUMnqIzt3vgSMvQGoCYEAaUmhpK4aHBlvQPM0s2PPplkFg6QkobGPc64YEdICUAItEEXRg+DK9/8A/TuTQs79CvQsHCiMnHp1AxZfMmj+emmmmnjVKNSkv8Mi71oY2c/iIwwII86CEFIGsUjucCUB4CWLTLcNk6xK/Ar/AA98xhlAYLO4rhiEqel8E1TRLYOJVCWWGyDCmClbLhqMzIGbV4tKWCwLqUtVwQT0L/MG4yjuGX1EbdxleipRKJRKPzTq/HrMrEHZiJW7jqoH4LCyQv8AFH7zC/ETgE7ilMHE6uu4We08IHmKq1rr8FQDTGeeMVbpis6cPpMHUuLGHtA98nV+P3G2qimmfpgfiBuYEtaNROSbvarfc2hAVhPsUyDAn6rho6CI5JoncGruUxe5d/gtjrj1c0cEFaNvpK6QK0wv6OCTq/HT0Vlgfkonxf3PTDFbRHBiKz2iyrmeHjOmLLCx1GjoYhSFyxMPjTZW5r7f9sNMuFhbccsDgJ1e7gTarNALWX1I+m9KvYC2iagPTlS3klC7IVGo4phgOK0imaLbb8dgUxB/dBb/APizLKVA4KdXu5DRO1t/5vXfsUDAq7n17M51EKqHGqp0y7+OGm5oBfmNlVM/+M7g3jhk6vcwlhV29Yis01nA6H0Er0r2AJGLV1BTvIkpfQ/4PH0aO4plX/bBhwydXt7lkPcBGaDX/sPpfpf5Ur0gdDLISI+rBrp+O3ERpiwLTyUoSX/ExinDJ1e12r9FQR+/hWo9N9H2KgOyXwZ8wyB8eoWrhdlBKskT3y3TmKr4ri5fwZXWtw/793+vlVq+QEK6hqMMVsYkq6l8rp7yyuwhD/CWhNQmhj0a/X82TqLGAmfG1F7b6mjwGg+j54a9TN7u5cbUqWA6OZ096v2DPbNaISrR8MYLLI8wLh/hsF+Ux15dW/62Zva4BFnbmFo/CucxU6l6rDcOo8cqgDEfIYYArGIuduLFK5vT3VqK8m4qKwzEcfcMXT9x7gfI04An38qaQ6V9oJykk6XsP1WWaDabWVK+CYyL8yqRsl6aMDzcilek0AEIK1mBcOJhPHO6e4XFuW0i/wC6FXodkUlBUv0r0v0r8a+AVflDJBYUTcz28fuKMwISLb5WoY6OECtEbf3J09tUM3GoC9Grpg/a4j7VtO1XAAuYb+Kx0K6vMsBTUVml/UW2+RUEoWUqNTCHXDN43Fg8/cAJOINLrNd37PT2ridBAMkyzUfvskNJe+88L9SmKB0eNnogUD+4D2gMLfuVo7hyDseuoIiggF2DXUoKFriApTWorPqYTHHcWUFT2untmPUR49W7dB+2I4Uv6OiXbwslULEXFMNRLa4iEO5ouZUIlkemP2pfMUrYcYSRmOLVT9oYZ6ENoaOIKzgXeUNmyXLtGvb6eyGcy6YhMgB2wUtpOs5v0rgj4BMl08TZcATXEq2JNkWLVMRSRRVW8KoYfk+9wRKl0LfzLcO7lxGsTpiFo8Sh6R37nT8xajqaw3qqgijhfr6d8KwH+YbMVwrkwQlQ7lcNXBOuhV5xN+tYtt8NHej8BRe4CvQhjMaXhhJXbhk6UAqwgkalGo2ENp93p+S1AYTxIjcFRdjEzfl8sJ2Ram1fU98RQxN8YYADXUXM2RQq3ilT2n769x6nihfN+HX7mg6Yhoa7goDriWWl6ZUGJg9KV73T8Ral3EO2YA7MpV/rzH+dZrKXfocDJGoQg4eZcCtQhRToOGVZeonMdov+IurK/wARHIz+oit4eCjiuIq9fj06BqExPCJrH8xUoLXDC4LapVUTMZla6mIGj3+n4LUF4TZWww/uNQd1sF/6WP1kVdvqcBBEECGXMuodMAUMcRXBMhs7qCYYlOeGagwlaSh0V5jlGIMufS2wa6lawplnQp5JYUK4hOXiWSrHRFHXgCXXDQX6PDoT5EyUlv8ABYSuf3UkXaIwC9f7MYq7jltmOGJQtRmxrzBQHXDIBYi3QxBodozRzF1tMsC8IWDzCQdQWu/MEPbKUTW479KLNMq0KuL0uHCr3f3ES4ZDyS/TJNMxwHcr6JX0QBFzAYiBkqNdRSt/R4QNXRLNAIawMQIq8cSrIo3heG/KU1GWKSvo8EaROoCsmZi1VOi6m/UablU4f6g60ZhgyS2jg1FafPF1+zcEUZgyuGXVNxUtai57GACmj6gtFrvhpQRDa4q6VGsJglti28P9ENxazmmoUAGY5bePRKrYV72RD2SgDhhtPGyXTuVzMwjCPAbFuoFsq/USp/lFdXxEgTqWUu4iArcaatIlWqyuCoBTDNAqhpspjNFR5gCv55O+sQ2z9TcpcwRohzK9yraJQ2QVb1FmhUWgcqG9B3xSd6NWP8et8G4ty6AxFw8J6Sq2y+NYL/URyQUhslraoTp6HxGmYdNwGjp7lcDiGgOuMQUE2RKt28Oyq0E7nk1LO47gcnsgcmowa6lAaUSwvxVhdNeYbJa7pHfSJsCr4pAFLICouC1o+PQvR6iq28moYlE/mOviu4GoD7JTsUxDQsl5Qo+LqRlUDEcB8xq0H3Ft5a3Jj4yhVpjmivuL0v4oBQY0it6i2zMa84T0U38fb6L5I03AJRr4zuMkBNmYQZhfx1AXqFiLlsKzc+5yX4ypzh3Kat+fkP1RuYPXuLd6RUqqfMd/EgAtS3ZkhU/R/wCD6AhurbHxKiHbvc7+KWo/ufs4KgxKcGY/8FS1GpYLMXFIEBfpImVctcr8WKdbgKncoQ2/HuxXCu2ya4rONeZnYJG1GG5SsZVO8p+KoCW+GZdaZPEasUYlj6PxtS3TsgGewim3P7lbriA07Q7Gpai1qdcXh7GXFtdcYF0QERmAKmKmY9y1+QpvGv0qZJqWlFHFIocS1uiOjYnD/UKppn2BHoSJTTX8cRo6LYgqbSw6RKJWfiKrbL4Vvo4v/9k=
-"""
-
-def create_logo_pixmap():
-    """Create a pixmap from the logo data"""
-    try:
-        # In a real implementation, you would load your actual logo file
-        # For now, create a simple colored rectangle as placeholder
-        if LOGO_DATA.strip():
-            data = base64.b64decode(LOGO_DATA)
-            pixmap = QPixmap()
-            pixmap.loadFromData(data)
-            return pixmap
-    except:
-        pass
-    # Return None if loading fails
-    return None
+# ========================
+# Image Assets
+# ========================
+# Images ship as files next to mk.py (inside the bundle when frozen by PyInstaller)
+ASSET_DIR = os.path.join(getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__))), "assets")
+LOGO = "logo.jpg"
+# Window icon sizes; headers ask for their own size through pixmap()
+ICON_SIZES = (16, 24, 32, 48)
+
+
+class AssetCache:
+    """Decodes each image asset once per process and keeps its scaled copies in QPixmapCache"""
+    def __init__(self, directory: str = ASSET_DIR):
+        self.directory = directory
+        self._originals = {}
+        self._icons = {}
+
+    def original(self, name: str):
+        """Full-size pixmap, decoded on first use; None if the file is missing or unreadable"""
+        if name not in self._originals:
+            pixmap = QPixmap(os.path.join(self.directory, name))
+            if pixmap.isNull():
+                log.warning("Image asset %s could not be loaded from %s", name, self.directory)
+                pixmap = None
+            self._originals[name] = pixmap
+        return self._originals[name]
+
+    def pixmap(self, name: str, size: int = None):
+        """Asset scaled to fit size x size, or at full size when size is None"""
+        original = self.original(name)
+        if original is None or size is None:
+            return original
+        key = f"nt_asset:{name}@{size}"
+        pixmap = QPixmapCache.find(key)
+        if pixmap is None or pixmap.isNull():
+            # QPixmapCache may evict under its size limit; rescaling needs no decode
+            pixmap = original.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            QPixmapCache.insert(key, pixmap)
+        return pixmap
+
+    def icon(self, name: str):
+        """Window icon with a pre-scaled pixmap for every ICON_SIZES entry"""
+        if name not in self._icons:
+            icon = None
+            if self.original(name) is not None:
+                icon = QIcon()
+                for size in ICON_SIZES:
+                    icon.addPixmap(self.pixmap(name, size))
+            self._icons[name] = icon
+        return self._icons[name]
+
+
+assets = AssetCache()
+
+
+def create_logo_pixmap(size: int = None):
+    """The logo scaled to fit size x size (full size by default), or None if it is missing"""
+    return assets.pixmap(LOGO, size)
 # ========================
 # Database Configuration Dialog
 # ========================
@@ -39,18 +101,24 @@ class DatabaseConfigDialog(QDialog):
         super().__init__()
         self.setWindowTitle("Database Configuration")
         self.setModal(True)
-        self.setFixedSize(400, 300)
+        self.setFixedSize(400, 370)
         
         layout = QVBoxLayout(self)
         
         # Title
-        title = QLabel("PostgreSQL Database Configuration")
+        title = QLabel("Database Configuration")
         title.setStyleSheet("font-size: 16px; font-weight: bold; margin-bottom: 20px;")
         layout.addWidget(title)
         
         # Form
         form_layout = QFormLayout()
         
+        # PostgreSQL serves many PCs; an SQLite file suits a single desk PC
+        self.backend_input = QComboBox()
+        self.backend_input.addItem("PostgreSQL server", "postgresql")
+        self.backend_input.addItem("SQLite file (single PC)", "sqlite")
+        self.backend_input.currentIndexChanged.connect(self.on_backend_changed)
+        self.path_input = QLineEdit("nt_bonafide.db")
         self.host_input = QLineEdit("localhost")
         self.port_input = QLineEdit("5432")
         self.database_input = QLineEdit("nt_bonafide")
@@ -58,6 +126,8 @@ class DatabaseConfigDialog(QDialog):
         self.password_input = QLineEdit()
         self.password_input.setEchoMode(QLineEdit.Password)
         
+        form_layout.addRow("Backend:", self.backend_input)
+        form_layout.addRow("SQLite file:", self.path_input)
         form_layout.addRow("Host:", self.host_input)
         form_layout.addRow("Port:", self.port_input)
         form_layout.addRow("Database:", self.database_input)
@@ -103,9 +173,21 @@ class DatabaseConfigDialog(QDialog):
         btn_layout.addWidget(connect_btn)
         btn_layout.addWidget(cancel_btn)
         layout.addLayout(btn_layout)
+        self.on_backend_changed()
+
+    def on_backend_changed(self):
+        """Enable only the fields the selected backend uses"""
+        sqlite = self.backend_input.currentData() == "sqlite"
+        self.path_input.setEnabled(sqlite)
+        for field in (self.host_input, self.port_input, self.database_input,
+                      self.username_input, self.password_input):
+            field.setEnabled(not sqlite)
         
     def get_config(self):
+        if self.backend_input.currentData() == "sqlite":
+            return {'backend': 'sqlite', 'path': self.path_input.text().strip()}
         return {
+            'backend': 'postgresql',
             'host': self.host_input.text().strip(),
             'port': int(self.port_input.text().strip()),
             'database': self.database_input.text().strip(),
@@ -116,8 +198,891 @@ class DatabaseConfigDialog(QDialog):
 # ========================
 # Database Layer
 # ========================
-class Database:
-    def __init__(self, config=None):
+# LISTEN/NOTIFY channels: one per approval stage, one per user, and a shared
+# channel for changes to the Approved/Rejected/Process Done lists.
+STATUS_CHANNEL = "nt_status"
+
+
+def stage_channel(stage: int) -> str:
+    """Channel carrying changes to the pending queue of one approval stage"""
+    return f"nt_stage_{int(stage)}"
+
+
+def user_channel(user_id: int) -> str:
+    """Channel carrying changes to one user's submissions and notifications"""
+    return f"nt_user_{int(user_id)}"
+
+
+class SubmissionCache:
+    """Thread-safe LRU of submission rows keyed by id, bounded in size and age.
+
+    Database invalidates the ids its own writes touch; changes made by other
+    clients are invalidated from change notifications, and the TTL bounds how
+    stale a row can get if one of those is missed.
+    """
+    def __init__(self, max_size: int = 1024, ttl: float = 30.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._rows = OrderedDict()  # id -> (row, expires_at), least recently used first
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def generation(self) -> int:
+        """Changes whenever anything is invalidated; pass it back to put()"""
+        return self._generation
+
+    def get(self, submission_id: int):
+        """Get a cached row, or None on a miss"""
+        with self._lock:
+            entry = self._rows.get(submission_id)
+            if entry is not None and entry[1] > time.monotonic():
+                self._rows.move_to_end(submission_id)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._rows[submission_id]
+            self.misses += 1
+            return None
+
+    def put(self, submission_id: int, row, generation: int = None):
+        """Cache a row read at generation; dropped if an invalidation happened since"""
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._rows[submission_id] = (row, time.monotonic() + self.ttl)
+            self._rows.move_to_end(submission_id)
+            while len(self._rows) > self.max_size:
+                self._rows.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *submission_ids):
+        with self._lock:
+            self._generation += 1
+            for submission_id in submission_ids:
+                if self._rows.pop(submission_id, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._rows)
+            self._rows.clear()
+
+    def stats(self) -> dict:
+        """Get hit/miss counters and the current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'size': len(self._rows),
+                'max_size': self.max_size,
+            }
+
+
+class SerialAllocator:
+    """Numbers certificates from serial blocks reserved in the database.
+
+    A block is reserved with a single statement and logged in
+    certificate_serial_blocks under this client's name; its numbers are then
+    handed out locally, so a batch costs one round trip per block rather than
+    one per certificate, and admins issuing at the same time never share a
+    block. Numbers a claim did not use are handed out again, and those still
+    unused when the session ends are released, which records them on the
+    block as a gap.
+    """
+    def __init__(self, db, client: str = None):
+        self.db = db
+        self.client = client or f"{socket.gethostname()}:{os.getpid()}"
+        self._block = None  # [block_id, next_serial, last_serial]
+        self._lock = threading.Lock()
+        self.blocks = 0
+        self.assigned = 0
+
+    def take(self, count: int, claim=None):
+        """The next count serial numbers, reserving new blocks as needed.
+
+        claim(serials), if given, runs while the allocator is still locked and
+        returns how many of them it kept, always the first ones. The rest are
+        given back: the current block hands them out again, and an earlier
+        block that ran out meanwhile is released with unused_from set to them.
+        If claim raises, all of them are given back before the error propagates.
+        """
+        serials = []
+        with self._lock:
+            taken = []  # [block_id, first serial taken from it, last serial taken from it]
+            while len(serials) < count:
+                if self._block is None or self._block[1] > self._block[2]:
+                    self._block = list(self.db.allocate_serial_block(self.client))
+                    self.blocks += 1
+                block_id, next_serial, last_serial = self._block
+                n = min(count - len(serials), last_serial - next_serial + 1)
+                serials.extend(range(next_serial, next_serial + n))
+                taken.append([block_id, next_serial, next_serial + n - 1])
+                self._block[1] += n
+            self.assigned += count
+            if claim is None:
+                return serials
+            try:
+                kept = claim(serials)
+            except Exception:
+                if serials:
+                    self._give_back(taken, serials[0])
+                self.assigned -= count
+                raise
+            if kept < count:
+                self._give_back(taken, serials[kept])
+                self.assigned -= count - kept
+        return serials[:kept]
+
+    def _give_back(self, taken, unused_from: int):
+        """Return every serial from unused_from on, out of the blocks one take drew from"""
+        for block_id, first, last in taken:
+            if unused_from > last:
+                continue
+            if block_id == self._block[0]:
+                self._block[1] = max(first, unused_from)
+            else:
+                self.db.release_serial_block(block_id, max(first, unused_from))
+
+    def release(self):
+        """Give the rest of the current block back, recording its unused numbers"""
+        with self._lock:
+            block, self._block = self._block, None
+        if block is not None:
+            block_id, next_serial, last_serial = block
+            self.db.release_serial_block(block_id, next_serial if next_serial <= last_serial else None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            left = self._block[2] - self._block[1] + 1 if self._block else 0
+            return {'client': self.client, 'blocks': self.blocks, 'assigned': self.assigned, 'left_in_block': left}
+
+
+class WorkflowRouter:
+    """Approval workflows, loaded once from the workflow tables into lookup dicts.
+
+    Stages are the admin desks of users.stage. A workflow (one per certificate
+    type) is a graph of its stages: each transition says to_stage waits for
+    from_stage, so stages with no path between them (say the HOD and the
+    accounts office) review a request at the same time. A stage becomes ready
+    once all of its prerequisites have approved, and approval at the
+    workflow's final stage, which waits on every other, completes the request.
+    Every routing question the transitions and pages ask is answered from
+    memory; approving a batch never needs a query to find out what it unlocks.
+    """
+    DEFAULT_CERTIFICATE_TYPE = "bonafide"
+
+    def __init__(self, workflows, stages, transitions):
+        """workflows: (id, certificate_type, name, first_stage, final_stage) rows;
+        stages: (workflow_id, stage, name); transitions: (workflow_id, from_stage, to_stage)"""
+        self.workflows = {}
+        self._by_type = {}
+        self._stage_names = {(workflow_id, stage): name for workflow_id, stage, name in stages}
+        self._requires = {}  # (workflow_id, stage) -> stages it waits for
+        unlocks = {}
+        for workflow_id, from_stage, to_stage in transitions:
+            self._requires.setdefault((workflow_id, to_stage), []).append(from_stage)
+            unlocks.setdefault((workflow_id, from_stage), []).append(to_stage)
+        # stage -> [(workflow_id, stage waiting on it)] and stage -> workflows completed there
+        self._successors = {}
+        self._final = {}
+        for workflow_id, certificate_type, name, first_stage, final_stage in workflows:
+            order = self._ordered(workflow_id, name, [stage for wid, stage in self._stage_names if wid == workflow_id],
+                                  unlocks)
+            dead_ends = [stage for stage in order if stage != final_stage and (workflow_id, stage) not in unlocks]
+            if final_stage not in order or (workflow_id, final_stage) in unlocks or dead_ends:
+                raise Exception(f"Workflow '{name}' has stages that never lead to its final stage {final_stage}")
+            if (workflow_id, first_stage) in self._requires:
+                raise Exception(f"Workflow '{name}' starts at stage {first_stage}, which waits for other stages")
+            self.workflows[workflow_id] = {
+                'id': workflow_id,
+                'certificate_type': certificate_type,
+                'name': name,
+                'first_stage': first_stage,
+                'final_stage': final_stage,
+                'stages': order,
+            }
+            self._by_type[certificate_type] = workflow_id
+            self._final.setdefault(final_stage, []).append(workflow_id)
+            for stage in order:
+                self._successors.setdefault(stage, []).extend(
+                    (workflow_id, following) for following in unlocks.get((workflow_id, stage), ()))
+        if not self.workflows:
+            raise Exception("No approval workflows are defined")
+
+    def _ordered(self, workflow_id: int, name: str, stages, unlocks):
+        """A workflow's stages in dependency order; raises on a cycle"""
+        waiting = {stage: len(self._requires.get((workflow_id, stage), ())) for stage in stages}
+        ready = sorted(stage for stage, count in waiting.items() if count == 0)
+        order = []
+        while ready:
+            stage = ready.pop(0)
+            order.append(stage)
+            for following in unlocks.get((workflow_id, stage), ()):
+                waiting[following] -= 1
+                if waiting[following] == 0:
+                    ready.append(following)
+        if len(order) != len(waiting):
+            raise Exception(f"Workflow '{name}' has a cycle between its stages")
+        return order
+
+    @property
+    def default_workflow_id(self) -> int:
+        return self._by_type.get(self.DEFAULT_CERTIFICATE_TYPE, min(self.workflows))
+
+    def workflow_for_type(self, certificate_type: str) -> int:
+        """Workflow id for a certificate type, falling back to the default workflow"""
+        return self._by_type.get(certificate_type, self.default_workflow_id)
+
+    def first_stage(self, workflow_id: int = None) -> int:
+        return self.workflows[workflow_id or self.default_workflow_id]['first_stage']
+
+    def prerequisites(self, workflow_id: int, stage: int):
+        return self._requires.get((workflow_id, stage), [])
+
+    def successors(self, stage: int):
+        """(workflow_id, stage) for every stage that waits on approval at stage"""
+        return self._successors.get(stage, [])
+
+    def stage_states(self, workflow_id: int, approved=()):
+        """(stage, state, waiting_on) for every stage of a workflow once the approved stages are done"""
+        approved = set(approved)
+        states = []
+        for stage in self.workflows[workflow_id]['stages']:
+            waiting_on = sum(1 for required in self.prerequisites(workflow_id, stage) if required not in approved)
+            state = 'approved' if stage in approved else ('ready' if waiting_on == 0 else 'waiting')
+            states.append((stage, state, waiting_on))
+        return states
+
+    def initial_states(self, workflow_id: int):
+        """Stage states of a new request: stages without prerequisites are ready at once"""
+        return self.stage_states(workflow_id)
+
+    def states_at(self, stage: int):
+        """(workflow_id, stage, state, waiting_on) putting a request back at stage: everything
+        stage waits for is approved, in every workflow passing through it"""
+        states = []
+        for workflow_id, workflow in self.workflows.items():
+            if stage not in workflow['stages']:
+                continue
+            earlier, pending = set(), list(self.prerequisites(workflow_id, stage))
+            while pending:
+                required = pending.pop()
+                if required not in earlier:
+                    earlier.add(required)
+                    pending.extend(self.prerequisites(workflow_id, required))
+            states.extend((workflow_id, *state) for state in self.stage_states(workflow_id, earlier))
+        return states
+
+    def stage_name(self, workflow_id: int, stage: int) -> str:
+        return self._stage_names.get((workflow_id, stage)) or f"Stage {stage}"
+
+    def workflows_ending_at(self, stage: int):
+        """Ids of the workflows whose final approval happens at stage"""
+        return self._final.get(stage, [])
+
+    def is_final_stage(self, stage: int) -> bool:
+        """True when some workflow is fully approved at stage (its admins run Process Done)"""
+        return bool(self.workflows_ending_at(stage))
+
+    def ends_every_workflow(self, stage: int) -> bool:
+        return len(self.workflows_ending_at(stage)) == len(self.workflows)
+
+    @property
+    def stages(self):
+        """Every stage some workflow passes through, in order"""
+        return sorted({stage for workflow in self.workflows.values() for stage in workflow['stages']})
+
+
+# ========================
+# Query Instrumentation
+# ========================
+log = logging.getLogger("nt_bonafide")
+slow_query_log = logging.getLogger("nt_bonafide.slow_queries")
+
+# Upper bounds (ms) of the latency histogram buckets; slower calls land in a final overflow bucket
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def redact(value) -> str:
+    """Describe a call argument by type and size only, so logs never carry user data"""
+    if value is None or isinstance(value, bool):
+        return repr(value)
+    if isinstance(value, (list, tuple, set, frozenset, dict)):
+        return f"<{type(value).__name__} of {len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def rows_returned(result) -> int:
+    """Rows in a storage call result (lists of rows, or a (rows, watermark) pair)"""
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, tuple) and len(result) == 2 and isinstance(result[1], datetime):
+        return len(result[0] or ())
+    return 0 if result is None else 1
+
+
+class QueryMetrics:
+    """Thread-safe per-method call counts, latency histograms, rows and errors.
+
+    wrap() times a storage method; calls slower than slow_query_ms are also
+    written to the slow-query log as one JSON object, with arguments redacted.
+    Only the outermost call on a thread is recorded, so a method delegating to
+    another (approve_submission to approve_many) is counted once.
+    """
+    def __init__(self, slow_query_ms: float = 500.0):
+        self.slow_query_ms = slow_query_ms
+        self._methods = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()  # depth: wrapped calls in progress on this thread
+        self.slow_queries = 0
+
+    def wrap(self, method: str, fn):
+        """Return fn timed and recorded under method"""
+        @wraps(fn)
+        def instrumented(*args, **kwargs):
+            depth = getattr(self._local, 'depth', 0)
+            if depth:
+                return fn(*args, **kwargs)
+            self._local.depth = 1
+            started = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                self.record(method, time.perf_counter() - started, 0, args, kwargs, error=e)
+                raise
+            finally:
+                self._local.depth = 0
+            self.record(method, time.perf_counter() - started, rows_returned(result), args, kwargs)
+            return result
+        return instrumented
+
+    def record(self, method: str, seconds: float, rows: int, args=(), kwargs=None, error=None):
+        elapsed_ms = seconds * 1000
+        bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if elapsed_ms <= bound),
+                      len(LATENCY_BUCKETS_MS))
+        slow = self.slow_query_ms is not None and elapsed_ms >= self.slow_query_ms
+        with self._lock:
+            stats = self._methods.get(method)
+            if stats is None:
+                stats = self._methods[method] = {
+                    'calls': 0, 'errors': 0, 'rows': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                    'histogram': [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                }
+            stats['calls'] += 1
+            stats['errors'] += error is not None
+            stats['rows'] += rows
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            stats['histogram'][bucket] += 1
+            if slow:
+                self.slow_queries += 1
+        if slow:
+            slow_query_log.warning(json.dumps({
+                'event': "slow_query",
+                'method': method,
+                'duration_ms': round(elapsed_ms, 1),
+                'threshold_ms': self.slow_query_ms,
+                'rows': rows,
+                'error': type(error).__name__ if error is not None else None,
+                'args': [redact(value) for value in args],
+                'kwargs': {name: redact(value) for name, value in (kwargs or {}).items()},
+            }))
+
+    @staticmethod
+    def _percentile(histogram, calls: int, fraction: float, max_ms: float) -> float:
+        """Upper bound of the bucket holding the given fraction of calls"""
+        rank = max(1, math.ceil(fraction * calls))
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, histogram):
+            seen += count
+            if seen >= rank:
+                return min(bound, max_ms)
+        return max_ms
+
+    def snapshot(self):
+        """Per-method summaries, slowest total time first"""
+        with self._lock:
+            methods = {name: dict(stats, histogram=list(stats['histogram']))
+                       for name, stats in self._methods.items()}
+        summaries = []
+        for name, stats in methods.items():
+            calls = stats['calls']
+            summaries.append({
+                'method': name,
+                **stats,
+                'mean_ms': stats['total_ms'] / calls,
+                'p50_ms': self._percentile(stats['histogram'], calls, 0.50, stats['max_ms']),
+                'p95_ms': self._percentile(stats['histogram'], calls, 0.95, stats['max_ms']),
+                'p99_ms': self._percentile(stats['histogram'], calls, 0.99, stats['max_ms']),
+            })
+        summaries.sort(key=lambda summary: summary['total_ms'], reverse=True)
+        return summaries
+
+    def reset(self):
+        with self._lock:
+            self._methods.clear()
+            self.slow_queries = 0
+
+
+# Stage states for requests that are pending but have none yet: the stages
+# their approval_stage waits on (transitively) are approved, approval_stage is
+# ready and the rest wait on their unapproved prerequisites. Plain SQL both
+# engines run, for the schema migration and for bulk-loaded data.
+SUBMISSION_STAGES_BACKFILL = """
+    WITH RECURSIVE done (submission_id, workflow_id, stage) AS (
+        SELECT s.id, s.workflow_id, t.from_stage
+        FROM submissions s
+        JOIN workflow_transitions t ON t.workflow_id = s.workflow_id AND t.to_stage = s.approval_stage
+        WHERE s.status = 'Pending'
+        UNION
+        SELECT d.submission_id, d.workflow_id, t.from_stage
+        FROM done d
+        JOIN workflow_transitions t ON t.workflow_id = d.workflow_id AND t.to_stage = d.stage
+    )
+    INSERT INTO submission_stages (submission_id, stage, state, waiting_on)
+    SELECT s.id, ws.stage,
+           CASE WHEN ws.stage = s.approval_stage THEN 'ready'
+                WHEN d.stage IS NOT NULL THEN 'approved'
+                ELSE 'waiting' END,
+           CASE WHEN ws.stage = s.approval_stage OR d.stage IS NOT NULL THEN 0
+                ELSE COUNT(t.from_stage) - COUNT(dt.stage) END
+    FROM submissions s
+    JOIN workflow_stages ws ON ws.workflow_id = s.workflow_id
+    LEFT JOIN done d ON d.submission_id = s.id AND d.stage = ws.stage
+    LEFT JOIN workflow_transitions t ON t.workflow_id = s.workflow_id AND t.to_stage = ws.stage
+    LEFT JOIN done dt ON dt.submission_id = s.id AND dt.stage = t.from_stage
+    WHERE s.status = 'Pending'
+      AND NOT EXISTS (SELECT 1 FROM submission_stages st WHERE st.submission_id = s.id)
+    GROUP BY s.id, ws.stage, s.approval_stage, d.stage
+"""
+
+
+class StorageBackend:
+    """The storage API the application talks to, independent of the database engine.
+
+    The queries here are plain SQL that PostgreSQL and SQLite both accept,
+    written with %s/%(name)s placeholders; a backend supplies _connection(),
+    its driver's Error/IntegrityError, and the dialect-specific parts: schema,
+    transitions, streams, change watermarks and change events.
+    """
+    NAME = "database"
+    Error = Exception
+    IntegrityError = Exception
+    supports_notifications = False  # LISTEN/NOTIFY push updates across clients
+
+    APPROVED_MESSAGE = "Congratulations! Your request has been fully approved."
+    REJECTED_MESSAGE = "Your request has been rejected. Please contact administration for details."
+    PROCESS_DONE_MESSAGE = "🎉 PROCESS COMPLETED! Your bonafide certificate is ready for collection. Please visit the administration office."
+
+    # Clients keep a watermark (the database clock at their last delta) and
+    # only ask for rows whose updated_at moved past it. updated_at is stamped
+    # at transaction start, so a writer that commits a little after our read
+    # can land just behind the watermark; re-reading a short overlap window
+    # covers that, and merging a row twice is harmless.
+    DELTA_OVERLAP_SECONDS = 10
+
+    # Public methods left untimed: bookkeeping and one-off schema setup rather than storage calls
+    UNINSTRUMENTED = frozenset({"close", "pool_stats", "ensure_schema", "migrate", "get_schema_version",
+                                "load_workflows"})
+
+    # Columns of a cached submission row: get_submission's, then the certificate fields
+    CACHED_COLUMNS = ("id, user_id, name, reg_number, reason, status, approval_stage, created_at, "
+                      "certificate_hash, certificate_issued_at, certificate_serial")
+
+    def __init__(self, cache_size: int = 1024, cache_ttl: float = 30.0, slow_query_ms: float = 500.0):
+        # Read-through cache for get_submission and get_certificate_sources
+        self.submission_cache = SubmissionCache(cache_size, cache_ttl)
+        self.metrics = QueryMetrics(slow_query_ms)
+        self._router = None
+        self._instrument()
+
+    def _instrument(self):
+        """Route every public storage method of this backend through self.metrics"""
+        for name in dir(type(self)):
+            if name.startswith("_") or name in self.UNINSTRUMENTED:
+                continue
+            # Plain functions only: static methods and properties are not storage calls
+            if inspect.isfunction(inspect.getattr_static(type(self), name)):
+                setattr(self, name, self.metrics.wrap(name, getattr(self, name)))
+
+    @staticmethod
+    def _notify(cur, channel: str, event: str, **payload):
+        """Queue a change event for other clients; backends without push updates ignore it"""
+
+    @staticmethod
+    def submitted_message(stage: int) -> str:
+        return f"Your request has been submitted and is under review at Stage {stage}."
+
+    @staticmethod
+    def moved_message(stage: int) -> str:
+        return f"Your request has been moved to Stage {stage} for review."
+
+    # -------- Workflows --------
+    @property
+    def router(self) -> WorkflowRouter:
+        """The approval workflows, read from the database on first use"""
+        if self._router is None:
+            self._router = self.load_workflows()
+        return self._router
+
+    def load_workflows(self) -> WorkflowRouter:
+        """Read every workflow definition and build its routing table"""
+        try:
+            with self._connection() as conn:
+                cur = conn.cursor()
+                cur.execute("SELECT id, certificate_type, name, first_stage, final_stage FROM workflows ORDER BY id")
+                workflows = cur.fetchall()
+                cur.execute("SELECT workflow_id, stage, name FROM workflow_stages")
+                stages = cur.fetchall()
+                cur.execute("SELECT workflow_id, from_stage, to_stage FROM workflow_transitions")
+                transitions = cur.fetchall()
+                conn.commit()
+        except self.Error as e:
+            raise Exception(f"Failed to load approval workflows: {e}")
+        return WorkflowRouter(workflows, stages, transitions)
+
+    # -------- Users --------
+    def add_user(self, username: str, password: str) -> bool:
+        """Add a new user to the database"""
+        try:
+            with self._connection() as conn:
+                cur = conn.cursor()
+                cur.execute(
+                    "INSERT INTO users (username, password, role, stage) VALUES (%s, %s, 'user', NULL)",
+                    (username, password)
+                )
+                conn.commit()
+                return True
+        except self.IntegrityError:
+            return False
+        except self.Error as e:
+            raise Exception(f"Failed to add user: {e}")
+
+    def get_user(self, username: str, password: str):
+        """Authenticate user and return user details"""
+        try:
+            with self._connection() as conn:
+                cur = conn.cursor()
+                cur.execute(
+                    "SELECT id, username, role, stage FROM users WHERE username = %s AND password = %s",
+                    (username, password)
+                )
+                row = cur.fetchone()
+                if row:
+                    return dict(zip(("id", "username", "role", "stage"), row))
+                return None
+        except self.Error as e:
+            raise Exception(f"Failed to authenticate user: {e}")
+
+
+    # -------- Submissions --------
+    @staticmethod
+    def _keyset(after_id, limit, column: str = "id"):
+        """SQL tail and params for keyset pagination over column (id by default) DESC.
+
+        after_id is the last id of the previous page (None for the first page);
+        limit=None returns every remaining row.
+        """
+        # No LIMIT clause at all for limit=None: SQLite rejects LIMIT NULL
+        limit_sql, limit_params = ("", ()) if limit is None else (" LIMIT %s", (limit,))
+        if after_id is None:
+            return f"ORDER BY {column} DESC" + limit_sql, limit_params
+        return f"AND {column} < %s ORDER BY {column} DESC" + limit_sql, (after_id, *limit_params)
+
+    def get_pending_for_stage(self, stage: int, after_id: int = None, limit: int = None):
+        """Get submissions ready for review at a specific approval stage, newest first.
+
+        A request waiting on parallel stages is listed at each of them, with
+        this stage in the approval_stage column.
+        """
+        page_sql, page_params = self._keyset(after_id, limit, "st.submission_id")
+        try:
+            with self._connection() as conn:
+                cur = conn.cursor()
+                cur.execute(
+                    """SELECT s.id, s.name, s.reg_number, s.reason, st.stage, s.created_at
+                       FROM submission_stages st
+                       JOIN submissions s ON s.id = st.submission_id
+                       WHERE st.state = 'ready' AND st.stage = %s AND s.status = 'Pending' """ + page_sql,
+                    (stage,) + page_params
+                )
+                return cur.fetchall()
+        except self.Error as e:
+            raise Exception(f"Failed to get pending submissions: {e}")
+
+    def get_approved_for_stage4_admin(self, after_id: int = None, limit: int = None, workflow_ids=None):
+        """Get approved submissions that haven't been marked as process completed (for final-stage admins).
+
+        workflow_ids limits the list to those workflows, for an admin whose
+        stage is final in only some of them; None lists every workflow.
+        """
+        page_sql, page_params = self._keyset(after_id, limit)
+        workflow_sql, workflow_params = "", ()
+        if workflow_ids is not None:
+            if not workflow_ids:
+                return []
+            workflow_sql = f"AND workflow_id IN ({', '.join(['%s'] * len(workflow_ids))}) "
+            workflow_params = tuple(workflow_ids)
+        try:
+            with self._connection() as conn:
+                cur = conn.cursor()
+                cur.execute(
+                    """SELECT id, name, reg_number, reason, approval_stage, created_at 
+                       FROM submissions 
+                       WHERE status = 'Approved' AND process_completed = FALSE """ + workflow_sql + page_sql,
+                    workflow_params + page_params
+                )
+                return cur.fetchall()
+        except self.Error as e:
+            raise Exception(f"Failed to get approved submissions: {e}")
+
+    def get_by_status(self, status: str, after_id: int = None, limit: int = None):
+        """Get submissions with a specific status, newest first"""
+        page_sql, page_params = self._keyset(after_id, limit)
+        try:
+            with self._connection() as conn:
+                cur = conn.cursor()
+                cur.execute(
+                    """SELECT id, name, reg_number, reason, approval_stage, created_at 
+                       FROM submissions 
+                       WHERE status = %s """ + page_sql,
+                    (status,) + page_params
+                )
+                return cur.fetchall()
+        except self.Error as e:
+            raise Exception(f"Failed to get submissions by status: {e}")
+
+    def get_user_submissions(self, user_id: int, after_id: int = None, limit: int = None):
+        """Get submissions by a specific user, newest first"""
+        page_sql, page_params = self._keyset(after_id, limit)
+        try:
+            with self._connection() as conn:
+                cur = conn.cursor()
+                cur.execute(
+                    """SELECT id, name, reg_number, reason, status, approval_stage, created_at, updated_at 
+                       FROM submissions 
+                       WHERE user_id = %s """ + page_sql,
+                    (user_id,) + page_params
+                )
+                return cur.fetchall()
+        except self.Error as e:
+            raise Exception(f"Failed to get user submissions: {e}")
+
+    def get_dashboard_stats(self, user: dict) -> dict:
+        """Get every home-page counter for a user in one round trip"""
+        if user['role'] == 'user':
+            query = """
+                SELECT status, approval_stage, process_completed, COUNT(*)
+                FROM submissions
+                WHERE user_id = %s
+                GROUP BY status, approval_stage, process_completed
+                UNION ALL
+                SELECT 'Unread', NULL, NULL,
+                       COALESCE((SELECT unread FROM unread_counts WHERE user_id = %s), 0)
+            """
+            params = (user['id'], user['id'])
+        else:
+            query = """
+                SELECT status, approval_stage, process_completed, COUNT(*)
+                FROM submissions
+                GROUP BY status, approval_stage, process_completed
+                UNION ALL
+                SELECT 'Ready', NULL, NULL, COUNT(*)
+                FROM submission_stages
+                WHERE state = 'ready' AND stage = %s
+            """
+            params = (user.get('stage'),)
+
+        stats = {
+            'pending': 0,
+            'pending_for_stage': 0,
+            'approved': 0,
+            'rejected': 0,
+            'ready_for_process': 0,
+            'unread': 0,
+        }
+        try:
+            with self._connection() as conn:
+                cur = conn.cursor()
+                cur.execute(query, params)
+                for status, stage, process_completed, count in cur.fetchall():
+                    if status == 'Unread':
+                        stats['unread'] = count
+                    elif status == 'Ready':
+                        stats['pending_for_stage'] = count
+                    elif status == 'Pending':
+                        stats['pending'] += count
+                    elif status == 'Approved':
+                        stats['approved'] += count
+                        if not process_completed:
+                            stats['ready_for_process'] += count
+                    elif status == 'Rejected':
+                        stats['rejected'] += count
+            return stats
+        except self.Error as e:
+            raise Exception(f"Failed to get dashboard stats: {e}")
+
+    def _cached_submissions(self, submission_ids) -> dict:
+        """id -> CACHED_COLUMNS row of the listed submissions that exist; only cache misses are queried"""
+        rows = {}
+        missing = []
+        for submission_id in submission_ids:
+            row = self.submission_cache.get(submission_id)
+            if row is None:
+                missing.append(submission_id)
+            else:
+                rows[submission_id] = row
+        if missing:
+            generation = self.submission_cache.generation
+            for row in self._fetch_submissions(missing):
+                self.submission_cache.put(row[0], row, generation)
+                rows[row[0]] = row
+        return rows
+
+    def get_submission(self, submission_id: int):
+        """Get a specific submission by ID, served from the cache when fresh"""
+        try:
+            row = self._cached_submissions([submission_id]).get(submission_id)
+        except self.Error as e:
+            raise Exception(f"Failed to get submission: {e}")
+        return row[:8] if row is not None else None
+
+    def get_certificate_sources(self, submission_ids):
+        """Get (id, name, reg_number, reason, certificate_hash, certificate_issued_at,
+        certificate_serial) of every listed submission that is approved, newest first.
+
+        Served from the submission cache when fresh; issuing invalidates what it numbers.
+        """
+        try:
+            rows = self._cached_submissions(submission_ids)
+        except self.Error as e:
+            raise Exception(f"Failed to get certificate details: {e}")
+        return [(row[0], *row[2:5], *row[8:11])
+                for submission_id, row in sorted(rows.items(), reverse=True) if row[5] == 'Approved']
+
+    # -------- Stage transitions --------
+    def approve_submission(self, submission_id: int, stage: int):
+        """Approve one submission pending at stage; returns the moved row, or None if it is no longer pending there"""
+        rows = self.approve_many([submission_id], stage)
+        return rows[0] if rows else None
+
+    def reject_submission(self, submission_id: int, stage: int):
+        """Reject one submission pending at stage; returns the row, or None if it is no longer pending there"""
+        rows = self.reject_many([submission_id], stage)
+        return rows[0] if rows else None
+
+    def mark_process_completed(self, submission_id: int):
+        """Mark an approved submission as process completed; returns None if it was not awaiting completion"""
+        rows = self.mark_process_completed_many([submission_id])
+        return rows[0] if rows else None
+
+    # -------- Notifications --------
+    def add_notification(self, user_id: int, submission_id: int, message: str):
+        """Add a notification for a user"""
+        try:
+            with self._connection() as conn:
+                cur = conn.cursor()
+                cur.execute(
+                    "INSERT INTO notifications (user_id, submission_id, message, is_read) VALUES (%s, %s, %s, FALSE)",
+                    (user_id, submission_id, message)
+                )
+                self._notify(cur, user_channel(user_id), "notification", submission_id=submission_id, user_id=user_id)
+                conn.commit()
+        except self.Error as e:
+            raise Exception(f"Failed to add notification: {e}")
+
+    def get_user_notifications_with_status(self, user_id: int, limit: int = 50):
+        """Get notifications for a user with submission status"""
+        try:
+            with self._connection() as conn:
+                cur = conn.cursor()
+                cur.execute("""
+                    SELECT n.id, n.submission_id, n.message, n.is_read, n.created_at, 
+                           s.status, s.approval_stage
+                    FROM notifications n
+                    JOIN submissions s ON n.submission_id = s.id
+                    WHERE n.user_id = %s
+                    ORDER BY n.id DESC
+                    LIMIT %s
+                """, (user_id, limit))
+                return cur.fetchall()
+        except self.Error as e:
+            raise Exception(f"Failed to get notifications with status: {e}")
+
+    def get_user_notifications(self, user_id: int, limit: int = 50):
+        """Get notifications for a user"""
+        try:
+            with self._connection() as conn:
+                cur = conn.cursor()
+                cur.execute(
+                    """SELECT id, submission_id, message, is_read, created_at 
+                       FROM notifications 
+                       WHERE user_id = %s 
+                       ORDER BY id DESC 
+                       LIMIT %s""",
+                    (user_id, limit)
+                )
+                return cur.fetchall()
+        except self.Error as e:
+            raise Exception(f"Failed to get notifications: {e}")
+
+    def mark_notification_read(self, notification_id: int):
+        """Mark a notification as read"""
+        try:
+            with self._connection() as conn:
+                cur = conn.cursor()
+                cur.execute("UPDATE notifications SET is_read = TRUE WHERE id = %s RETURNING user_id", (notification_id,))
+                changed = cur.fetchone()
+                if changed:
+                    # Lets the same student's other devices update their badge
+                    self._notify(cur, user_channel(changed[0]), "notification_read", user_id=changed[0])
+                conn.commit()
+        except self.Error as e:
+            raise Exception(f"Failed to mark notification as read: {e}")
+
+    def get_unread_count(self, user_id: int):
+        """Get count of unread notifications for a user (kept current by triggers)"""
+        try:
+            with self._connection() as conn:
+                cur = conn.cursor()
+                cur.execute("SELECT unread FROM unread_counts WHERE user_id = %s", (user_id,))
+                row = cur.fetchone()
+                return row[0] if row else 0
+        except self.Error as e:
+            raise Exception(f"Failed to get unread count: {e}")
+
+    def test_connection(self):
+        """Test database connection"""
+        try:
+            with self._connection() as conn:
+                cur = conn.cursor()
+                cur.execute("SELECT 1")
+                return True
+        except self.Error:
+            return False
+
+
+class Database(StorageBackend):
+    """PostgreSQL backend: pooled connections and LISTEN/NOTIFY push updates"""
+    NAME = "PostgreSQL"
+    Error = psycopg2.Error
+    IntegrityError = psycopg2.IntegrityError
+    supports_notifications = True
+
+    def __init__(self, config=None, minconn: int = 1, maxconn: int = 8,
+                 checkout_timeout: float = 10.0, health_check_interval: float = 30.0,
+                 cache_size: int = 1024, cache_ttl: float = 30.0, slow_query_ms: float = 500.0):
+        super().__init__(cache_size, cache_ttl, slow_query_ms)
         if config is None:
             # Default configuration - you should modify these for your setup
             config = {
@@ -127,370 +1092,1767 @@ class Database:
                 'user': 'postgres',
                 'password': 'password'
             }
-        
+
+        self.config = dict(config)
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+
+        # Pool bookkeeping: a semaphore bounds concurrent borrowers so callers
+        # wait for a free connection instead of getting PoolError, and the
+        # thread-local lets nested Database calls reuse the caller's connection.
+        self._pool = None
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._last_used = {}
+        self._stats = {
+            'checkouts': 0,
+            'checkins': 0,
+            'waits': 0,
+            'wait_time': 0.0,
+            'timeouts': 0,
+            'health_checks': 0,
+            'discarded': 0,
+        }
+
         try:
-            self.conn = psycopg2.connect(**config)
-            self.conn.autocommit = False
-            self.create_tables()
-            self.seed_users()
+            self._pool = ThreadedConnectionPool(minconn, maxconn, **self.config)
+            self.ensure_schema()
+            # Routing is read once, before anyone logs in
+            self._router = self.load_workflows()
         except psycopg2.Error as e:
+            if self._pool:
+                self._pool.closeall()
             raise Exception(f"Failed to connect to PostgreSQL: {e}")
 
-    def create_tables(self):
-        """Create all necessary tables"""
+    # -------- Connection pool --------
+    @contextmanager
+    def _connection(self):
+        """Borrow a pooled connection for the duration of a with-block"""
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            # Nested call (e.g. add_submission -> add_notification) shares the connection
+            yield held
+            return
+
+        conn = self._checkout()
+        self._local.conn = conn
         try:
-            cur = self.conn.cursor()
-            
-            # Users table
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    id SERIAL PRIMARY KEY,
-                    username VARCHAR(50) UNIQUE NOT NULL,
-                    password VARCHAR(100) NOT NULL,
-                    role VARCHAR(20) NOT NULL CHECK(role IN ('admin','user')),
-                    stage INTEGER NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Submissions table
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS submissions (
-                    id SERIAL PRIMARY KEY,
-                    user_id INTEGER NOT NULL REFERENCES users(id),
-                    name VARCHAR(100) NOT NULL,
-                    reg_number VARCHAR(50) NOT NULL,
-                    reason TEXT NOT NULL,
-                    status VARCHAR(20) NOT NULL DEFAULT 'Pending',
-                    approval_stage INTEGER NOT NULL DEFAULT 1,
-                    process_completed BOOLEAN NOT NULL DEFAULT FALSE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            yield conn
+        finally:
+            self._local.conn = None
+            self._checkin(conn)
+
+    def _checkout(self):
+        """Take a healthy connection out of the pool, waiting for a free slot if needed"""
+        started = time.monotonic()
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self._stats['waits'] += 1
+            if not self._slots.acquire(timeout=self.checkout_timeout):
+                with self._stats_lock:
+                    self._stats['timeouts'] += 1
+                raise psycopg2.OperationalError(
+                    f"timed out after {self.checkout_timeout}s waiting for a pooled connection "
+                    f"({self.maxconn} in use)"
                 )
-            """)
-            
-            # Notifications table
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS notifications (
-                    id SERIAL PRIMARY KEY,
-                    user_id INTEGER NOT NULL REFERENCES users(id),
-                    submission_id INTEGER NOT NULL REFERENCES submissions(id),
-                    message TEXT NOT NULL,
-                    is_read BOOLEAN DEFAULT FALSE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        waited = time.monotonic() - started
+
+        try:
+            # Idle connections can all have died together (server restart), so
+            # keep discarding until one answers; maxconn tries reach a fresh one
+            for _ in range(self.maxconn):
+                conn = self._pool.getconn()
+                if self._is_healthy(conn):
+                    break
+                self._discard(conn)
+            else:
+                raise psycopg2.OperationalError(
+                    f"no healthy pooled connection after {self.maxconn} attempts"
                 )
-            """)
-            
-            # Create indexes for better performance
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_submissions_user_id ON submissions(user_id)")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_submissions_status ON submissions(status)")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_submissions_stage ON submissions(approval_stage)")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_notifications_user_id ON notifications(user_id)")
-            
-            self.conn.commit()
-        except psycopg2.Error as e:
-            self.conn.rollback()
-            raise Exception(f"Failed to create tables: {e}")
-
-    def seed_users(self):
-        """Create default users for testing"""
-        seeds = [
-            ("user1",  "userpass",  "user",  None),
-            ("user2",  "userpass",  "user",  None),
-            ("admin1", "adminpass", "admin", 1),
-            ("admin2", "adminpass", "admin", 2),
-            ("admin3", "adminpass", "admin", 3),
-            ("admin4", "adminpass", "admin", 4),  # New 4th stage admin
-        ]
-        
-        try:
-            cur = self.conn.cursor()
-            for username, password, role, stage in seeds:
-                cur.execute("SELECT id FROM users WHERE username = %s", (username,))
-                if not cur.fetchone():
-                    cur.execute(
-                        "INSERT INTO users (username, password, role, stage) VALUES (%s, %s, %s, %s)",
-                        (username, password, role, stage)
-                    )
-            self.conn.commit()
-        except psycopg2.Error as e:
-            self.conn.rollback()
-            # Don't raise error for seeding, just print warning
-            print(f"Warning: Failed to seed users: {e}")
+        except Exception:
+            self._slots.release()
+            raise
 
-    # -------- Users --------
-    def add_user(self, username: str, password: str) -> bool:
-        """Add a new user to the database"""
+        with self._stats_lock:
+            self._stats['checkouts'] += 1
+            self._stats['wait_time'] += waited
+        return conn
+
+    def _checkin(self, conn):
+        """Return a connection to the pool, rolling back anything left uncommitted"""
         try:
-            cur = self.conn.cursor()
-            cur.execute(
-                "INSERT INTO users (username, password, role, stage) VALUES (%s, %s, 'user', NULL)",
-                (username, password)
-            )
-            self.conn.commit()
+            broken = bool(conn.closed)
+            if not broken and conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
+
+            if broken:
+                self._discard(conn)
+            else:
+                self._last_used[conn] = time.monotonic()
+                self._pool.putconn(conn)
+        finally:
+            with self._stats_lock:
+                self._stats['checkins'] += 1
+            self._slots.release()
+
+    def _discard(self, conn):
+        """Close a broken connection and drop it from the pool"""
+        self._last_used.pop(conn, None)
+        with self._stats_lock:
+            self._stats['discarded'] += 1
+        try:
+            self._pool.putconn(conn, close=True)
+        except psycopg2.Error:
+            pass
+
+    def _is_healthy(self, conn) -> bool:
+        """Health check on borrow; connections used recently are trusted without a round trip"""
+        if conn.closed:
+            return False
+        last_used = self._last_used.get(conn)
+        if last_used is not None and time.monotonic() - last_used < self.health_check_interval:
             return True
-        except psycopg2.IntegrityError:
-            self.conn.rollback()
+
+        with self._stats_lock:
+            self._stats['health_checks'] += 1
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.fetchone()
+            conn.rollback()
+            return True
+        except psycopg2.Error:
             return False
-        except psycopg2.Error as e:
-            self.conn.rollback()
-            raise Exception(f"Failed to add user: {e}")
 
-    def get_user(self, username: str, password: str):
-        """Authenticate user and return user details"""
+    def pool_stats(self) -> dict:
+        """Get connection pool statistics"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['minconn'] = self.minconn
+        stats['maxconn'] = self.maxconn
+        stats['in_use'] = stats['checkouts'] - stats['checkins']
+        stats['idle'] = len(self._last_used)
+        return stats
+
+    def open_listen_connection(self):
+        """Open a dedicated autocommit connection for LISTEN (kept outside the pool)"""
+        conn = psycopg2.connect(**self.config)
+        conn.autocommit = True
+        return conn
+
+    @staticmethod
+    def _notify(cur, channel: str, event: str, **payload):
+        """Queue a pg_notify event; it is delivered when the transaction commits"""
+        payload['event'] = event
+        cur.execute("SELECT pg_notify(%s, %s)", (channel, json.dumps(payload)))
+
+    # -------- Schema migrations --------
+    # The schema is described by ordered, append-only steps. A client start
+    # costs one version check; only when the database is behind does it take
+    # the migration lock and apply the missing steps, each recorded in
+    # schema_version inside the same transaction. Ship schema changes by
+    # appending a step, never by editing one that has been released.
+    MIGRATION_LOCK_ID = 0x4E54424F  # pg_advisory_xact_lock key shared by all clients
+
+    MIGRATIONS = [
+        (1, "users, submissions and notifications tables", [
+            """CREATE TABLE IF NOT EXISTS users (
+                   id SERIAL PRIMARY KEY,
+                   username VARCHAR(50) UNIQUE NOT NULL,
+                   password VARCHAR(100) NOT NULL,
+                   role VARCHAR(20) NOT NULL CHECK(role IN ('admin','user')),
+                   stage INTEGER NULL,
+                   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+               )""",
+            """CREATE TABLE IF NOT EXISTS submissions (
+                   id SERIAL PRIMARY KEY,
+                   user_id INTEGER NOT NULL REFERENCES users(id),
+                   name VARCHAR(100) NOT NULL,
+                   reg_number VARCHAR(50) NOT NULL,
+                   reason TEXT NOT NULL,
+                   status VARCHAR(20) NOT NULL DEFAULT 'Pending',
+                   approval_stage INTEGER NOT NULL DEFAULT 1,
+                   process_completed BOOLEAN NOT NULL DEFAULT FALSE,
+                   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                   updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+               )""",
+            """CREATE TABLE IF NOT EXISTS notifications (
+                   id SERIAL PRIMARY KEY,
+                   user_id INTEGER NOT NULL REFERENCES users(id),
+                   submission_id INTEGER NOT NULL REFERENCES submissions(id),
+                   message TEXT NOT NULL,
+                   is_read BOOLEAN DEFAULT FALSE,
+                   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+               )""",
+            "CREATE INDEX IF NOT EXISTS idx_submissions_user_id ON submissions(user_id)",
+            "CREATE INDEX IF NOT EXISTS idx_submissions_status ON submissions(status)",
+            "CREATE INDEX IF NOT EXISTS idx_submissions_stage ON submissions(approval_stage)",
+            "CREATE INDEX IF NOT EXISTS idx_notifications_user_id ON notifications(user_id)",
+        ]),
+        (2, "default users for testing", [
+            """INSERT INTO users (username, password, role, stage) VALUES
+                   ('user1',  'userpass',  'user',  NULL),
+                   ('user2',  'userpass',  'user',  NULL),
+                   ('admin1', 'adminpass', 'admin', 1),
+                   ('admin2', 'adminpass', 'admin', 2),
+                   ('admin3', 'adminpass', 'admin', 3),
+                   ('admin4', 'adminpass', 'admin', 4)
+               ON CONFLICT (username) DO NOTHING""",
+        ]),
+        (3, "index for delta refresh", [
+            "CREATE INDEX IF NOT EXISTS idx_submissions_updated_at ON submissions(updated_at)",
+        ]),
+        (4, "composite and partial indexes shaped like the list queries", [
+            # Each list is "filter, newest first, LIMIT": an index on the filter
+            # columns followed by id DESC serves every keyset page as a short
+            # range scan. Partial indexes keep the hot queues small as history grows.
+            """CREATE INDEX IF NOT EXISTS idx_submissions_pending_stage
+               ON submissions (approval_stage, id DESC) WHERE status = 'Pending'""",
+            """CREATE INDEX IF NOT EXISTS idx_submissions_ready_for_process
+               ON submissions (id DESC) WHERE status = 'Approved' AND process_completed = FALSE""",
+            "CREATE INDEX IF NOT EXISTS idx_submissions_status_id ON submissions (status, id DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_submissions_user_id_id ON submissions (user_id, id DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_notifications_user_id_id ON notifications (user_id, id DESC)",
+            """CREATE INDEX IF NOT EXISTS idx_notifications_unread
+               ON notifications (user_id) WHERE is_read = FALSE""",
+            # Superseded by the composite indexes above
+            "DROP INDEX IF EXISTS idx_submissions_user_id",
+            "DROP INDEX IF EXISTS idx_submissions_status",
+            "DROP INDEX IF EXISTS idx_submissions_stage",
+            "DROP INDEX IF EXISTS idx_notifications_user_id",
+        ]),
+        (5, "trigger-maintained unread notification counters", [
+            # The inbox badge reads one row per user instead of counting a
+            # notification history that is never pruned. Statement-level
+            # triggers fold a whole bulk transition into one upsert per user,
+            # taken in user_id order so concurrent writers cannot deadlock.
+            """CREATE TABLE IF NOT EXISTS unread_counts (
+                   user_id INTEGER PRIMARY KEY REFERENCES users(id),
+                   unread INTEGER NOT NULL DEFAULT 0
+               )""",
+            """CREATE OR REPLACE FUNCTION nt_track_unread() RETURNS trigger AS $$
+               BEGIN
+                   IF TG_OP = 'INSERT' THEN
+                       INSERT INTO unread_counts (user_id, unread)
+                       SELECT user_id, COUNT(*) FROM new_rows
+                       WHERE NOT COALESCE(is_read, FALSE)
+                       GROUP BY user_id ORDER BY user_id
+                       ON CONFLICT (user_id) DO UPDATE SET unread = unread_counts.unread + EXCLUDED.unread;
+                   ELSIF TG_OP = 'UPDATE' THEN
+                       INSERT INTO unread_counts (user_id, unread)
+                       SELECT user_id, SUM(delta) FROM (
+                           SELECT user_id, CASE WHEN COALESCE(is_read, FALSE) THEN 0 ELSE 1 END AS delta FROM new_rows
+                           UNION ALL
+                           SELECT user_id, CASE WHEN COALESCE(is_read, FALSE) THEN 0 ELSE -1 END FROM old_rows
+                       ) changes
+                       GROUP BY user_id HAVING SUM(delta) <> 0 ORDER BY user_id
+                       ON CONFLICT (user_id) DO UPDATE SET unread = unread_counts.unread + EXCLUDED.unread;
+                   ELSE
+                       UPDATE unread_counts c SET unread = c.unread - gone.n
+                       FROM (SELECT user_id, COUNT(*) AS n FROM old_rows
+                             WHERE NOT COALESCE(is_read, FALSE) GROUP BY user_id) gone
+                       WHERE c.user_id = gone.user_id;
+                   END IF;
+                   RETURN NULL;
+               END
+               $$ LANGUAGE plpgsql""",
+            # Block writers while the counters are backfilled so none are missed
+            "LOCK TABLE notifications IN SHARE ROW EXCLUSIVE MODE",
+            "DROP TRIGGER IF EXISTS trg_notifications_unread_insert ON notifications",
+            "DROP TRIGGER IF EXISTS trg_notifications_unread_update ON notifications",
+            "DROP TRIGGER IF EXISTS trg_notifications_unread_delete ON notifications",
+            """CREATE TRIGGER trg_notifications_unread_insert AFTER INSERT ON notifications
+               REFERENCING NEW TABLE AS new_rows
+               FOR EACH STATEMENT EXECUTE PROCEDURE nt_track_unread()""",
+            """CREATE TRIGGER trg_notifications_unread_update AFTER UPDATE ON notifications
+               REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+               FOR EACH STATEMENT EXECUTE PROCEDURE nt_track_unread()""",
+            """CREATE TRIGGER trg_notifications_unread_delete AFTER DELETE ON notifications
+               REFERENCING OLD TABLE AS old_rows
+               FOR EACH STATEMENT EXECUTE PROCEDURE nt_track_unread()""",
+            """INSERT INTO unread_counts (user_id, unread)
+               SELECT user_id, COUNT(*) FROM notifications WHERE is_read = FALSE GROUP BY user_id
+               ON CONFLICT (user_id) DO UPDATE SET unread = EXCLUDED.unread""",
+        ]),
+        (6, "certificate references on submissions", [
+            # The PDF lives in the issuing PC's content-addressed store; the row
+            # keeps its hash and the issue date needed to render it identically
+            "ALTER TABLE submissions ADD COLUMN IF NOT EXISTS certificate_hash CHAR(64)",
+            "ALTER TABLE submissions ADD COLUMN IF NOT EXISTS certificate_issued_at TIMESTAMP",
+        ]),
+        (7, "block-allocated certificate serial numbers", [
+            # Each nextval reserves a whole block of INCREMENT BY serials for one
+            # client. Every block is logged; released_at/unused_from record the
+            # numbers a client gave back, and any other number in a block that no
+            # submission carries was lost to a failed issue.
+            "CREATE SEQUENCE IF NOT EXISTS certificate_serial_seq INCREMENT BY 100 MINVALUE 1 START WITH 1",
+            """CREATE TABLE IF NOT EXISTS certificate_serial_blocks (
+                   id SERIAL PRIMARY KEY,
+                   first_serial BIGINT NOT NULL,
+                   last_serial BIGINT NOT NULL,
+                   client VARCHAR(200) NOT NULL,
+                   allocated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                   released_at TIMESTAMP NULL,
+                   unused_from BIGINT NULL
+               )""",
+            "ALTER TABLE submissions ADD COLUMN IF NOT EXISTS certificate_serial BIGINT",
+            """CREATE UNIQUE INDEX IF NOT EXISTS idx_submissions_certificate_serial
+               ON submissions (certificate_serial) WHERE certificate_serial IS NOT NULL""",
+        ]),
+        (8, "configurable approval workflows", [
+            # One workflow per certificate type routes requests between the
+            # stage desks; clients load all three tables once into a
+            # WorkflowRouter. Existing requests join the default workflow,
+            # which is the original four-stage pipeline.
+            """CREATE TABLE IF NOT EXISTS workflows (
+                   id SERIAL PRIMARY KEY,
+                   certificate_type VARCHAR(50) UNIQUE NOT NULL,
+                   name VARCHAR(100) NOT NULL,
+                   first_stage INTEGER NOT NULL,
+                   final_stage INTEGER NOT NULL
+               )""",
+            """CREATE TABLE IF NOT EXISTS workflow_stages (
+                   workflow_id INTEGER NOT NULL REFERENCES workflows(id),
+                   stage INTEGER NOT NULL,
+                   name VARCHAR(100) NOT NULL,
+                   PRIMARY KEY (workflow_id, stage)
+               )""",
+            """CREATE TABLE IF NOT EXISTS workflow_transitions (
+                   workflow_id INTEGER NOT NULL,
+                   from_stage INTEGER NOT NULL,
+                   to_stage INTEGER NOT NULL,
+                   PRIMARY KEY (workflow_id, from_stage),
+                   FOREIGN KEY (workflow_id, from_stage) REFERENCES workflow_stages (workflow_id, stage),
+                   FOREIGN KEY (workflow_id, to_stage) REFERENCES workflow_stages (workflow_id, stage)
+               )""",
+            """INSERT INTO workflows (id, certificate_type, name, first_stage, final_stage)
+               VALUES (1, 'bonafide', 'Bonafide certificate', 1, 4)
+               ON CONFLICT (id) DO NOTHING""",
+            "SELECT setval(pg_get_serial_sequence('workflows', 'id'), (SELECT MAX(id) FROM workflows))",
+            """INSERT INTO workflow_stages (workflow_id, stage, name) VALUES
+                   (1, 1, 'Stage 1'), (1, 2, 'Stage 2'), (1, 3, 'Stage 3'), (1, 4, 'Stage 4')
+               ON CONFLICT DO NOTHING""",
+            """INSERT INTO workflow_transitions (workflow_id, from_stage, to_stage) VALUES
+                   (1, 1, 2), (1, 2, 3), (1, 3, 4)
+               ON CONFLICT DO NOTHING""",
+            """ALTER TABLE submissions
+               ADD COLUMN IF NOT EXISTS workflow_id INTEGER NOT NULL DEFAULT 1 REFERENCES workflows(id)""",
+        ]),
+        (9, "parallel approval stages", [
+            # Transitions become prerequisite edges, so a stage may unlock
+            # several others and wait on several. Each pending request keeps
+            # one row per stage of its workflow; waiting_on counts unapproved
+            # prerequisites, so concurrent approvals of parallel stages meet
+            # on that row's lock instead of each reading the other's state.
+            "ALTER TABLE workflow_transitions DROP CONSTRAINT IF EXISTS workflow_transitions_pkey",
+            "ALTER TABLE workflow_transitions ADD PRIMARY KEY (workflow_id, from_stage, to_stage)",
+            """CREATE TABLE IF NOT EXISTS submission_stages (
+                   submission_id INTEGER NOT NULL REFERENCES submissions(id),
+                   stage INTEGER NOT NULL,
+                   state VARCHAR(20) NOT NULL
+                       CHECK(state IN ('waiting','ready','approved','rejected','cancelled')),
+                   waiting_on INTEGER NOT NULL DEFAULT 0,
+                   updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                   PRIMARY KEY (submission_id, stage)
+               )""",
+            # The per-stage queues: only ready rows are indexed
+            """CREATE INDEX IF NOT EXISTS idx_submission_stages_ready
+               ON submission_stages (stage, submission_id DESC) WHERE state = 'ready'""",
+            "LOCK TABLE submissions IN SHARE ROW EXCLUSIVE MODE",
+            SUBMISSION_STAGES_BACKFILL,
+            # Superseded by idx_submission_stages_ready
+            "DROP INDEX IF EXISTS idx_submissions_pending_stage",
+        ]),
+    ]
+
+    @property
+    def latest_schema_version(self) -> int:
+        return self.MIGRATIONS[-1][0]
+
+    def get_schema_version(self) -> int:
+        """Get the version the database schema is at (0 for an empty database)"""
         try:
-            cur = self.conn.cursor(cursor_factory=RealDictCursor)
-            cur.execute(
-                "SELECT id, username, role, stage FROM users WHERE username = %s AND password = %s",
-                (username, password)
-            )
-            row = cur.fetchone()
-            if row:
-                return dict(row)
-            return None
+            with self._connection() as conn:
+                cur = conn.cursor()
+                try:
+                    cur.execute("SELECT MAX(version) FROM schema_version")
+                    version = cur.fetchone()[0] or 0
+                except psycopg2.errors.UndefinedTable:
+                    version = 0
+                conn.rollback()
+                return version
         except psycopg2.Error as e:
-            raise Exception(f"Failed to authenticate user: {e}")
+            raise Exception(f"Failed to read schema version: {e}")
+
+    def ensure_schema(self):
+        """Bring the schema up to date; a current database costs a single query"""
+        version = self.get_schema_version()
+        if version > self.latest_schema_version:
+            # Steps are additive, so an older client keeps working; just say so
+            log.warning("Database schema v%s is newer than this client (v%s)", version, self.latest_schema_version)
+        elif version < self.latest_schema_version:
+            self.migrate()
+
+    def migrate(self):
+        """Apply pending migration steps under the migration lock"""
+        try:
+            with self._connection() as conn:
+                cur = conn.cursor()
+                # Serialise concurrent starters; the lock is released at commit
+                cur.execute("SELECT pg_advisory_xact_lock(%s)", (self.MIGRATION_LOCK_ID,))
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS schema_version (
+                        version INTEGER PRIMARY KEY,
+                        description TEXT NOT NULL,
+                        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                # Another client may have migrated while we waited for the lock
+                cur.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+                current = cur.fetchone()[0]
+                for version, description, statements in self.MIGRATIONS:
+                    if version <= current:
+                        continue
+                    for statement in statements:
+                        cur.execute(statement)
+                    cur.execute(
+                        "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                        (version, description)
+                    )
+                    log.info("Applied schema migration %s: %s", version, description)
+                conn.commit()
+        except psycopg2.Error as e:
+            raise Exception(f"Failed to migrate database schema: {e}")
 
     # -------- Submissions --------
-    def add_submission(self, user_id: int, name: str, reg_number: str, reason: str):
-        """Add a new submission request"""
+    def add_submission(self, user_id: int, name: str, reg_number: str, reason: str, workflow_id: int = None):
+        """Add a new submission request at the first stage of its workflow (the default one if None)"""
+        workflow_id = workflow_id or self.router.default_workflow_id
+        stage = self.router.first_stage(workflow_id)
+        stages, states, waiting = zip(*self.router.initial_states(workflow_id))
         try:
-            cur = self.conn.cursor()
-            cur.execute(
-                """INSERT INTO submissions (user_id, name, reg_number, reason, status, approval_stage, process_completed) 
-                   VALUES (%s, %s, %s, %s, 'Pending', 1, FALSE) RETURNING id""",
-                (user_id, name, reg_number, reason)
+            # Insert, stage states, student notification and change events in one statement
+            rows = self._transition(
+                """INSERT INTO submissions (user_id, name, reg_number, reason, status, approval_stage,
+                                            process_completed, workflow_id)
+                   VALUES (%(user_id)s, %(name)s, %(reg_number)s, %(reason)s, 'Pending', %(stage)s,
+                           FALSE, %(workflow_id)s)
+                   RETURNING id, user_id, name, reg_number, approval_stage, status, approval_stage AS old_stage""",
+                "%(message)s",
+                {
+                    'user_id': user_id,
+                    'name': name,
+                    'reg_number': reg_number,
+                    'reason': reason,
+                    'stage': stage,
+                    'workflow_id': workflow_id,
+                    'stages': list(stages),
+                    'states': list(states),
+                    'waiting': list(waiting),
+                    'message': self.submitted_message(stage),
+                },
+                after="""
+                opened AS (
+                    INSERT INTO submission_stages (submission_id, stage, state, waiting_on)
+                    SELECT m.id, r.stage, r.state, r.waiting_on
+                    FROM moved m,
+                         unnest(%(stages)s::integer[], %(states)s::text[], %(waiting)s::integer[])
+                             AS r(stage, state, waiting_on)
+                    RETURNING submission_id, stage, state
+                ),""",
+                stage_events="opened WHERE state = 'ready'",
             )
-            submission_id = cur.fetchone()[0]
-            self.conn.commit()
-            
-            # Add notification to user
-            self.add_notification(user_id, submission_id, "Your request has been submitted and is under review at Stage 1.")
-            
-            return submission_id
+            return rows[0][0]
         except psycopg2.Error as e:
-            self.conn.rollback()
             raise Exception(f"Failed to add submission: {e}")
 
-    def get_pending_for_stage(self, stage: int):
-        """Get all pending submissions for a specific approval stage"""
+    def open_status_stream(self, status: str):
+        """Open a server-side cursor over submissions with a status, newest first.
+
+        Rows match get_by_status, except the reason is cut to 200 characters for
+        listing. The stream holds one pooled connection until it is closed.
+        """
         try:
-            cur = self.conn.cursor()
-            cur.execute(
-                """SELECT id, name, reg_number, reason, approval_stage, created_at 
-                   FROM submissions 
-                   WHERE status = 'Pending' AND approval_stage = %s 
+            return SubmissionStream(
+                self,
+                """SELECT id, name, reg_number, LEFT(reason, 200), approval_stage, created_at
+                   FROM submissions
+                   WHERE status = %s
                    ORDER BY id DESC""",
-                (stage,)
+                (status,)
             )
-            return cur.fetchall()
         except psycopg2.Error as e:
-            raise Exception(f"Failed to get pending submissions: {e}")
+            raise Exception(f"Failed to open {status.lower()} submissions: {e}")
+
+    # -------- Delta refresh --------
+    def get_submission_changes(self, since=None, limit: int = 1000):
+        """Get submissions changed since a watermark as (rows, new_watermark).
 
-    def get_approved_for_stage4_admin(self):
-        """Get all approved submissions that haven't been marked as process completed (for stage 4 admin)"""
+        rows is None when more than limit rows changed, telling the caller a
+        full reload is cheaper; since=None only establishes a watermark.
+        """
         try:
-            cur = self.conn.cursor()
-            cur.execute(
-                """SELECT id, name, reg_number, reason, approval_stage, created_at 
-                   FROM submissions 
-                   WHERE status = 'Approved' AND process_completed = FALSE 
-                   ORDER BY id DESC"""
-            )
-            return cur.fetchall()
+            with self._connection() as conn:
+                cur = conn.cursor()
+                cur.execute("SELECT LOCALTIMESTAMP")
+                watermark = cur.fetchone()[0]
+                if since is None:
+                    conn.commit()
+                    return [], watermark
+                cur.execute(
+                    """SELECT id, user_id, name, reg_number, reason, status, approval_stage,
+                              process_completed, created_at, updated_at, workflow_id,
+                              (SELECT string_agg(st.stage::text, ',') FROM submission_stages st
+                               WHERE st.submission_id = submissions.id AND st.state = 'ready') AS ready_stages
+                       FROM submissions
+                       WHERE updated_at > %s - make_interval(secs => %s)
+                       ORDER BY updated_at
+                       LIMIT %s""",
+                    (since, self.DELTA_OVERLAP_SECONDS, limit + 1)
+                )
+                rows = cur.fetchall()
+                conn.commit()
+                if len(rows) > limit:
+                    return None, watermark
+                return rows, watermark
         except psycopg2.Error as e:
-            raise Exception(f"Failed to get approved submissions: {e}")
-
-    def get_by_status(self, status: str):
-        """Get all submissions with a specific status"""
+            raise Exception(f"Failed to get submission changes: {e}")
+
+    # -------- Stage transitions --------
+    # Every transition is a single statement: the UPDATE carries its own
+    # preconditions in the WHERE clause, and its RETURNING rows feed the
+    # students' notification INSERT and the pg_notify change events. A request
+    # that is no longer in the expected state simply matches no row, so two
+    # admins acting at once cannot both move it. The statements are set-based,
+    # so bulk actions on many ids cost the same single round trip.
+    #
+    # Transitions driven by stage states first lock their submissions in id
+    # order. Each statement then sees the states committed by whoever held a
+    # lock before it, so two admins signing off parallel stages of one request
+    # cannot both miss the other's approval.
+    _TRANSITION_SQL = """
+        WITH {before}moved AS (
+            {update}
+        ),{after}
+        note AS (
+            INSERT INTO notifications (user_id, submission_id, message, is_read)
+            SELECT user_id, id, {message}, FALSE FROM moved
+            RETURNING user_id
+        ),
+        events AS (
+            -- One event per channel and outcome is enough for clients to refresh
+            SELECT DISTINCT ON (e.channel, m.status) e.channel,
+                   json_build_object('event', e.event, 'submission_id', m.id, 'user_id', m.user_id,
+                                     'stage', m.approval_stage, 'status', m.status)::text AS payload
+            FROM moved m
+            CROSS JOIN LATERAL (VALUES
+                ('nt_stage_' || m.old_stage, 'stage_changed'),
+                ('nt_stage_' || m.approval_stage, 'stage_changed'),
+                ({status_channel}, 'status_changed'),
+                ('nt_user_' || m.user_id, 'notification')
+            ) AS e(channel, event)
+            WHERE e.channel IS NOT NULL
+        ),
+        sent AS (
+            SELECT pg_notify(channel, payload) FROM events
+            {stage_events}
+        )
+        SELECT m.id, m.user_id, m.name, m.reg_number, m.approval_stage, m.status
+        FROM moved m, (SELECT COUNT(*) FROM sent) AS delivered
+    """
+    # Queue events for stages a transition opened or closed besides old/new approval_stage
+    _STAGE_EVENTS_SQL = """
+            UNION ALL
+            SELECT pg_notify('nt_stage_' || stage,
+                             json_build_object('event', 'stage_changed', 'submission_id', submission_id,
+                                               'stage', stage)::text)
+            FROM (SELECT DISTINCT ON (stage) stage, submission_id FROM {source}) changed
+    """
+
+    def _transition(self, update: str, message: str, params: dict, status_channel: str = "NULL",
+                    before: str = "", after: str = "", stage_events: str = None, lock_ids=None):
+        """Run one transition statement and return every row it moved.
+
+        before/after add CTEs ahead of or behind the moved UPDATE, stage_events
+        names a relation of (stage, submission_id) rows to send stage events for,
+        and lock_ids are the submissions to lock first.
+        """
+        query = self._TRANSITION_SQL.format(
+            update=update, message=message, status_channel=status_channel, before=before, after=after,
+            stage_events=self._STAGE_EVENTS_SQL.format(source=stage_events) if stage_events else "",
+        )
+        with self._connection() as conn:
+            cur = conn.cursor()
+            if lock_ids is not None:
+                cur.execute("SELECT id FROM submissions WHERE id = ANY(%s::integer[]) ORDER BY id FOR UPDATE",
+                            (list(lock_ids),))
+            cur.execute(query, params)
+            rows = cur.fetchall()
+            conn.commit()
+        self.submission_cache.invalidate(*(row[0] for row in rows))
+        return rows
+
+    def approve_many(self, submission_ids, stage: int):
+        """Approve every listed submission still pending at stage, in one transaction.
+
+        The stage is signed off for each; stages waiting on it become ready
+        once none of their other prerequisites is outstanding, and approval
+        at a workflow's final stage fully approves the request. approval_stage
+        moves to the lowest stage still reviewing it. Returns the moved rows as
+        (id, user_id, name, reg_number, approval_stage, status); ids that were
+        not ready at that stage are left out.
+        """
+        if stage not in self.router.stages:
+            return []
+        # The stages this approval unlocks ride along as arrays; the UPDATE joins on them
+        successors = self.router.successors(stage)
         try:
-            cur = self.conn.cursor()
-            cur.execute(
-                """SELECT id, name, reg_number, reason, approval_stage, created_at 
-                   FROM submissions 
-                   WHERE status = %s 
-                   ORDER BY id DESC""",
-                (status,)
+            return self._transition(
+                """UPDATE submissions s
+                   SET status = CASE WHEN s.workflow_id = ANY(%(final)s::integer[]) THEN 'Approved' ELSE 'Pending' END,
+                       approval_stage = COALESCE(LEAST(
+                           (SELECT MIN(u.stage) FROM unlocked u WHERE u.submission_id = s.id AND u.state = 'ready'),
+                           (SELECT MIN(st.stage) FROM submission_stages st
+                            WHERE st.submission_id = s.id AND st.state = 'ready' AND st.stage <> %(stage)s)
+                       ), s.approval_stage),
+                       updated_at = CURRENT_TIMESTAMP
+                   WHERE s.id IN (SELECT submission_id FROM approved)
+                   RETURNING s.id, s.user_id, s.name, s.reg_number, s.approval_stage, s.status,
+                             %(stage)s AS old_stage""",
+                """CASE WHEN status = 'Approved' THEN %(approved_msg)s
+                        ELSE 'Your request has been moved to Stage ' || approval_stage || ' for review.' END""",
+                {
+                    'ids': list(submission_ids),
+                    'stage': stage,
+                    'final': self.router.workflows_ending_at(stage),
+                    'workflows': [workflow_id for workflow_id, _ in successors],
+                    'unlocks': [following for _, following in successors],
+                    'approved_msg': self.APPROVED_MESSAGE,
+                },
+                status_channel="CASE WHEN m.status = 'Approved' THEN 'nt_status' END",
+                before="""
+                approved AS (
+                    UPDATE submission_stages st
+                    SET state = 'approved', updated_at = CURRENT_TIMESTAMP
+                    FROM submissions s
+                    WHERE st.submission_id = ANY(%(ids)s::integer[]) AND st.stage = %(stage)s AND st.state = 'ready'
+                          AND s.id = st.submission_id AND s.status = 'Pending'
+                    RETURNING st.submission_id, s.workflow_id
+                ),
+                unlocked AS (
+                    UPDATE submission_stages st
+                    SET waiting_on = st.waiting_on - 1,
+                        state = CASE WHEN st.waiting_on = 1 THEN 'ready' ELSE st.state END,
+                        updated_at = CURRENT_TIMESTAMP
+                    FROM approved a, unnest(%(workflows)s::integer[], %(unlocks)s::integer[]) AS r(workflow_id, stage)
+                    WHERE st.submission_id = a.submission_id AND a.workflow_id = r.workflow_id AND st.stage = r.stage
+                    RETURNING st.submission_id, st.stage, st.state
+                ),""",
+                stage_events="unlocked WHERE state = 'ready'",
+                lock_ids=submission_ids,
             )
-            return cur.fetchall()
         except psycopg2.Error as e:
-            raise Exception(f"Failed to get submissions by status: {e}")
+            raise Exception(f"Failed to approve submissions: {e}")
+
+    def reject_many(self, submission_ids, stage: int):
+        """Reject every listed submission ready at stage; returns the rejected rows.
 
-    def get_user_submissions(self, user_id: int):
-        """Get all submissions by a specific user"""
+        Its other open stages are cancelled, leaving their queues too.
+        """
         try:
-            cur = self.conn.cursor()
-            cur.execute(
-                """SELECT id, name, reg_number, reason, status, approval_stage, created_at, updated_at 
-                   FROM submissions 
-                   WHERE user_id = %s 
-                   ORDER BY id DESC""",
-                (user_id,)
+            return self._transition(
+                """UPDATE submissions
+                   SET status = 'Rejected', updated_at = CURRENT_TIMESTAMP
+                   WHERE id IN (SELECT submission_id FROM closed WHERE state = 'rejected') AND status = 'Pending'
+                   RETURNING id, user_id, name, reg_number, approval_stage, status, %(stage)s AS old_stage""",
+                "%(message)s",
+                {
+                    'ids': list(submission_ids),
+                    'stage': stage,
+                    'message': self.REJECTED_MESSAGE,
+                },
+                status_channel="'nt_status'",
+                before="""
+                closed AS (
+                    UPDATE submission_stages
+                    SET state = CASE WHEN stage = %(stage)s THEN 'rejected' ELSE 'cancelled' END,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE submission_id IN (SELECT st.submission_id FROM submission_stages st
+                                            JOIN submissions s ON s.id = st.submission_id
+                                            WHERE st.submission_id = ANY(%(ids)s::integer[]) AND st.stage = %(stage)s
+                                                  AND st.state = 'ready' AND s.status = 'Pending')
+                          AND state IN ('ready', 'waiting')
+                    RETURNING submission_id, stage, state
+                ),""",
+                stage_events="closed",
+                lock_ids=submission_ids,
             )
-            return cur.fetchall()
         except psycopg2.Error as e:
-            raise Exception(f"Failed to get user submissions: {e}")
+            raise Exception(f"Failed to reject submissions: {e}")
 
-    def get_submission(self, submission_id: int):
-        """Get a specific submission by ID"""
+    def mark_process_completed_many(self, submission_ids):
+        """Mark every listed approved submission as process completed; returns the completed rows"""
         try:
-            cur = self.conn.cursor()
-            cur.execute(
-                """SELECT id, user_id, name, reg_number, reason, status, approval_stage, created_at 
-                   FROM submissions 
-                   WHERE id = %s""",
-                (submission_id,)
+            return self._transition(
+                """UPDATE submissions
+                   SET process_completed = TRUE, updated_at = CURRENT_TIMESTAMP
+                   WHERE id = ANY(%(ids)s::integer[]) AND status = 'Approved' AND process_completed = FALSE
+                   RETURNING id, user_id, name, reg_number, approval_stage, status, NULL::integer AS old_stage""",
+                "%(message)s",
+                {
+                    'ids': list(submission_ids),
+                    'message': self.PROCESS_DONE_MESSAGE,
+                },
+                status_channel="'nt_status'",
             )
-            return cur.fetchone()
         except psycopg2.Error as e:
-            raise Exception(f"Failed to get submission: {e}")
+            raise Exception(f"Failed to mark processes completed: {e}")
 
     def update_stage(self, submission_id: int, new_stage: int):
-        """Update the approval stage of a submission"""
+        """Update the approval stage of a submission.
+
+        A pending request is put back (or forward) to new_stage: the stages it
+        waits for count as approved and everything after it is reviewed again.
+        """
+        states_at = self.router.states_at(new_stage)
+        workflows, stages, states, waiting = list(zip(*states_at)) if states_at else [(), (), (), ()]
         try:
-            cur = self.conn.cursor()
-            cur.execute(
-                "UPDATE submissions SET approval_stage = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s",
-                (new_stage, submission_id)
+            rows = self._transition(
+                """UPDATE submissions s
+                   SET approval_stage = %(stage)s, updated_at = CURRENT_TIMESTAMP
+                   FROM (SELECT id, approval_stage FROM submissions WHERE id = %(id)s FOR UPDATE) old
+                   WHERE s.id = old.id
+                   RETURNING s.id, s.user_id, s.name, s.reg_number, s.approval_stage, s.status,
+                             old.approval_stage AS old_stage""",
+                "'Your request has been moved to Stage ' || approval_stage || ' for review.'",
+                {
+                    'id': submission_id,
+                    'stage': new_stage,
+                    'workflows': list(workflows),
+                    'stages': list(stages),
+                    'states': list(states),
+                    'waiting': list(waiting),
+                },
+                before="""
+                reset AS (
+                    UPDATE submission_stages st
+                    SET state = r.state, waiting_on = r.waiting_on, updated_at = CURRENT_TIMESTAMP
+                    FROM submissions s,
+                         unnest(%(workflows)s::integer[], %(stages)s::integer[], %(states)s::text[],
+                                %(waiting)s::integer[]) AS r(workflow_id, stage, state, waiting_on)
+                    WHERE s.id = %(id)s AND s.status = 'Pending' AND st.submission_id = s.id
+                          AND s.workflow_id = r.workflow_id AND st.stage = r.stage
+                    RETURNING st.submission_id, st.stage
+                ),""",
+                stage_events="reset",
+                lock_ids=[submission_id],
             )
-            self.conn.commit()
-            
-            # Get submission details for notification
-            submission = self.get_submission(submission_id)
-            if submission:
-                user_id = submission[1]
-                self.add_notification(user_id, submission_id, f"Your request has been moved to Stage {new_stage} for review.")
+            return rows[0] if rows else None
         except psycopg2.Error as e:
-            self.conn.rollback()
             raise Exception(f"Failed to update stage: {e}")
 
+    # A request leaving Pending outside approve/reject leaves every queue
+    _CANCEL_STAGES_SQL = """UPDATE submission_stages
+                            SET state = 'cancelled', updated_at = CURRENT_TIMESTAMP
+                            WHERE submission_id = %(id)s AND state IN ('ready', 'waiting')"""
+
     def update_status(self, submission_id: int, new_status: str):
         """Update the status of a submission"""
+        messages = {
+            "Approved": self.APPROVED_MESSAGE,
+            "Rejected": self.REJECTED_MESSAGE,
+        }
         try:
-            cur = self.conn.cursor()
-            cur.execute(
-                "UPDATE submissions SET status = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s",
-                (new_status, submission_id)
+            if new_status not in messages:
+                # No student notification for other statuses; keep the plain update
+                with self._connection() as conn:
+                    cur = conn.cursor()
+                    cur.execute(
+                        "UPDATE submissions SET status = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s",
+                        (new_status, submission_id)
+                    )
+                    if new_status != 'Pending':
+                        cur.execute(self._CANCEL_STAGES_SQL, {'id': submission_id})
+                    conn.commit()
+                self.submission_cache.invalidate(submission_id)
+                return None
+
+            rows = self._transition(
+                """UPDATE submissions
+                   SET status = %(status)s, updated_at = CURRENT_TIMESTAMP
+                   WHERE id = %(id)s
+                   RETURNING id, user_id, name, reg_number, approval_stage, status, approval_stage AS old_stage""",
+                "%(message)s",
+                {'id': submission_id, 'status': new_status, 'message': messages[new_status]},
+                status_channel="'nt_status'",
+                before=f"closed AS ({self._CANCEL_STAGES_SQL} RETURNING submission_id, stage),",
+                stage_events="closed",
             )
-            self.conn.commit()
-            
-            # Get submission details for notification
-            submission = self.get_submission(submission_id)
-            if submission:
-                user_id = submission[1]
-                if new_status == "Approved":
-                    self.add_notification(user_id, submission_id, "Congratulations! Your request has been fully approved.")
-                elif new_status == "Rejected":
-                    self.add_notification(user_id, submission_id, "Your request has been rejected. Please contact administration for details.")
+            return rows[0] if rows else None
         except psycopg2.Error as e:
-            self.conn.rollback()
             raise Exception(f"Failed to update status: {e}")
 
-    def mark_process_completed(self, submission_id: int):
-        """Mark a submission as process completed"""
+    def _fetch_submissions(self, submission_ids):
+        """CACHED_COLUMNS rows of the listed submissions, for the submission cache"""
+        with self._connection() as conn:
+            cur = conn.cursor()
+            cur.execute(f"SELECT {self.CACHED_COLUMNS} FROM submissions WHERE id = ANY(%s::integer[])",
+                        (list(submission_ids),))
+            rows = cur.fetchall()
+            conn.commit()
+            return rows
+
+    # -------- Certificates --------
+
+    def claim_certificate_serials(self, submission_ids, serials, issued_at: datetime):
+        """Number the listed approved submissions that have no serial yet, in one statement.
+
+        They take serials from the front of the list in id DESC order and are
+        dated issued_at unless already issued before. Submissions numbered by
+        anyone else first are skipped, so exactly the first len(result)
+        serials are used. Returns the (id, serial) pairs assigned.
+        """
         try:
-            cur = self.conn.cursor()
-            cur.execute(
-                "UPDATE submissions SET process_completed = TRUE, updated_at = CURRENT_TIMESTAMP WHERE id = %s",
-                (submission_id,)
-            )
-            self.conn.commit()
-            
-            # Get submission details for notification
-            submission = self.get_submission(submission_id)
-            if submission:
-                user_id = submission[1]
-                self.add_notification(user_id, submission_id, "🎉 PROCESS COMPLETED! Your bonafide certificate is ready for collection. Please visit the administration office.")
+            with self._connection() as conn:
+                cur = conn.cursor()
+                # Locked rows another issuer numbered meanwhile drop out before they are counted
+                cur.execute(
+                    """WITH open AS (
+                           SELECT id FROM submissions
+                           WHERE id = ANY(%(ids)s::integer[]) AND status = 'Approved' AND certificate_serial IS NULL
+                           ORDER BY id DESC
+                           FOR UPDATE
+                       ),
+                       numbered AS (
+                           SELECT id, row_number() OVER (ORDER BY id DESC) AS n FROM open
+                       )
+                       UPDATE submissions s
+                       SET certificate_serial = (%(serials)s::bigint[])[n.n],
+                           certificate_issued_at = COALESCE(s.certificate_issued_at, %(issued_at)s),
+                           certificate_hash = NULL, updated_at = CURRENT_TIMESTAMP
+                       FROM numbered n
+                       WHERE s.id = n.id
+                       RETURNING s.id, s.certificate_serial""",
+                    {'ids': list(submission_ids), 'serials': list(serials), 'issued_at': issued_at}
+                )
+                rows = cur.fetchall()
+                conn.commit()
         except psycopg2.Error as e:
-            self.conn.rollback()
-            raise Exception(f"Failed to mark process completed: {e}")
-
-    # -------- Notifications --------
-    def add_notification(self, user_id: int, submission_id: int, message: str):
-        """Add a notification for a user"""
+            raise Exception(f"Failed to number certificates: {e}")
+        # Every listed id, so the caller re-reads the winner's serial for those it lost
+        self.submission_cache.invalidate(*submission_ids)
+        return rows
+
+    def record_certificates(self, certificates):
+        """Store the (submission_id, certificate_hash, serial) of rendered certificates in one statement;
+        a hash is only recorded on a row still carrying that serial"""
+        columns = list(zip(*certificates)) if certificates else [(), (), ()]
         try:
-            cur = self.conn.cursor()
-            cur.execute(
-                "INSERT INTO notifications (user_id, submission_id, message, is_read) VALUES (%s, %s, %s, FALSE)",
-                (user_id, submission_id, message)
-            )
-            self.conn.commit()
+            with self._connection() as conn:
+                cur = conn.cursor()
+                cur.execute(
+                    """UPDATE submissions s
+                       SET certificate_hash = c.certificate_hash
+                       FROM unnest(%s::integer[], %s::text[], %s::bigint[]) AS c(id, certificate_hash, serial)
+                       WHERE s.id = c.id AND s.certificate_serial = c.serial""",
+                    [list(column) for column in columns]
+                )
+                conn.commit()
         except psycopg2.Error as e:
-            self.conn.rollback()
-            raise Exception(f"Failed to add notification: {e}")
+            raise Exception(f"Failed to record certificates: {e}")
+        self.submission_cache.invalidate(*(certificate[0] for certificate in certificates))
 
-    def get_user_notifications_with_status(self, user_id: int, limit: int = 50):
-        """Get notifications for a user with submission status"""
+    def allocate_serial_block(self, client: str):
+        """Reserve the next block of certificate serials for client; returns (block_id, first_serial, last_serial)"""
         try:
-            cur = self.conn.cursor()
-            cur.execute("""
-                SELECT n.id, n.submission_id, n.message, n.is_read, n.created_at, 
-                       s.status, s.approval_stage
-                FROM notifications n
-                JOIN submissions s ON n.submission_id = s.id
-                WHERE n.user_id = %s
-                ORDER BY n.id DESC
-                LIMIT %s
-            """, (user_id, limit))
-            return cur.fetchall()
+            with self._connection() as conn:
+                cur = conn.cursor()
+                cur.execute(
+                    """INSERT INTO certificate_serial_blocks (first_serial, last_serial, client)
+                       SELECT b.first_serial, b.first_serial + s.increment_by - 1, %s
+                       FROM (SELECT nextval('certificate_serial_seq') AS first_serial) b, pg_sequences s
+                       WHERE s.schemaname = current_schema() AND s.sequencename = 'certificate_serial_seq'
+                       RETURNING id, first_serial, last_serial""",
+                    (client,)
+                )
+                block = cur.fetchone()
+                conn.commit()
+                return block
         except psycopg2.Error as e:
-            raise Exception(f"Failed to get notifications with status: {e}")
+            raise Exception(f"Failed to reserve certificate serials: {e}")
 
-    def get_user_notifications(self, user_id: int, limit: int = 50):
-        """Get notifications for a user"""
+    def release_serial_block(self, block_id: int, unused_from: int = None):
+        """Close a serial block, recording the first serial it never assigned (None if it was used up)"""
         try:
-            cur = self.conn.cursor()
-            cur.execute(
-                """SELECT id, submission_id, message, is_read, created_at 
-                   FROM notifications 
-                   WHERE user_id = %s 
-                   ORDER BY id DESC 
-                   LIMIT %s""",
-                (user_id, limit)
-            )
-            return cur.fetchall()
+            with self._connection() as conn:
+                cur = conn.cursor()
+                cur.execute(
+                    """UPDATE certificate_serial_blocks
+                       SET released_at = CURRENT_TIMESTAMP, unused_from = %s
+                       WHERE id = %s AND released_at IS NULL""",
+                    (unused_from, block_id)
+                )
+                conn.commit()
         except psycopg2.Error as e:
-            raise Exception(f"Failed to get notifications: {e}")
+            raise Exception(f"Failed to release certificate serials: {e}")
 
-    def mark_notification_read(self, notification_id: int):
-        """Mark a notification as read"""
-        try:
-            cur = self.conn.cursor()
-            cur.execute("UPDATE notifications SET is_read = TRUE WHERE id = %s", (notification_id,))
-            self.conn.commit()
-        except psycopg2.Error as e:
-            self.conn.rollback()
-            raise Exception(f"Failed to mark notification as read: {e}")
+    def close(self):
+        """Close all pooled database connections"""
+        if self._pool:
+            self._pool.closeall()
+            self._last_used.clear()
 
-    def get_unread_count(self, user_id: int):
-        """Get count of unread notifications for a user"""
-        try:
-            cur = self.conn.cursor()
-            cur.execute("SELECT COUNT(*) FROM notifications WHERE user_id = %s AND is_read = FALSE", (user_id,))
-            return cur.fetchone()[0]
-        except psycopg2.Error as e:
-            raise Exception(f"Failed to get unread count: {e}")
 
-    def test_connection(self):
-        """Test database connection"""
+class SubmissionStream:
+    """Batches from a named (server-side) cursor, for lists too long to fetch at once"""
+    _names = itertools.count(1)
+
+    def __init__(self, db: Database, query: str, params):
+        self.db = db
+        self.exhausted = False
+        self._lock = threading.Lock()
+        self._conn = db._checkout()
         try:
-            cur = self.conn.cursor()
-            cur.execute("SELECT 1")
-            return True
+            self._cur = self._conn.cursor(name=f"nt_stream_{next(self._names)}")
+            self._cur.execute(query, params)
         except psycopg2.Error:
-            return False
+            conn, self._conn = self._conn, None
+            db._checkin(conn)
+            raise
+
+    def fetch(self, size: int):
+        """Fetch the next batch of at most size rows"""
+        with self._lock:
+            if self._conn is None:
+                return []
+            try:
+                rows = self._cur.fetchmany(size)
+            except psycopg2.Error as e:
+                raise Exception(f"Failed to fetch submissions: {e}")
+            if len(rows) < size:
+                self.exhausted = True
+            return rows
+
+    def close(self):
+        """Close the cursor and return its connection to the pool"""
+        with self._lock:
+            if self._conn is None:
+                return
+            conn, self._conn = self._conn, None
+            self.exhausted = True
+            try:
+                self._cur.close()
+            except psycopg2.Error:
+                pass
+            self.db._checkin(conn)
+
+
+class KeysetStream:
+    """SubmissionStream over a keyset-paged query, for backends without server-side cursors.
+
+    fetch_page(after_id, limit) returns the next rows ordered by id DESC; no
+    connection is held between batches.
+    """
+    def __init__(self, fetch_page):
+        self._fetch_page = fetch_page
+        self._after_id = None
+        self._lock = threading.Lock()
+        self.exhausted = False
+
+    def fetch(self, size: int):
+        """Fetch the next batch of at most size rows"""
+        with self._lock:
+            if self.exhausted:
+                return []
+            rows = self._fetch_page(self._after_id, size)
+            if len(rows) < size:
+                self.exhausted = True
+            if rows:
+                self._after_id = rows[-1][0]
+            return rows
 
     def close(self):
-        """Close the database connection"""
-        if self.conn:
-            self.conn.close()
+        with self._lock:
+            self.exhausted = True
+
+
+# ========================
+# SQLite Storage Backend
+# ========================
+# Timestamps are stored as local-time ISO text with milliseconds, matching the
+# naive local TIMESTAMP values PostgreSQL returns, and read back as datetime.
+SQLITE_NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')"
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" ", timespec="milliseconds"))
+sqlite3.register_converter("TIMESTAMP", lambda value: datetime.fromisoformat(value.decode()))
+
+_PLACEHOLDER = re.compile(r"%\((\w+)\)s|%s|%%")
+
+
+@lru_cache(maxsize=256)
+def sqlite_sql(query: str) -> str:
+    """Translate %s / %(name)s placeholders to SQLite's ? / :name"""
+    return _PLACEHOLDER.sub(
+        lambda m: f":{m.group(1)}" if m.group(1) else ("?" if m.group(0) == "%s" else "%"),
+        query,
+    )
+
+
+class _SQLiteCursor:
+    """DB-API cursor wrapper that accepts the psycopg2 placeholder style"""
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, query: str, params=()):
+        self._cursor.execute(sqlite_sql(query), () if params is None else params)
+        return self
+
+    def executemany(self, query: str, seq_of_params):
+        self._cursor.executemany(sqlite_sql(query), seq_of_params)
+        return self
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size: int):
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    def close(self):
+        self._cursor.close()
+
+
+class _SQLiteConnection:
+    """Connection wrapper handing out placeholder-translating cursors"""
+    def __init__(self, conn):
+        self.raw = conn
+
+    def cursor(self):
+        return _SQLiteCursor(self.raw.cursor())
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+
+class SQLiteDatabase(StorageBackend):
+    """Single-node backend on an SQLite file, for a department run from one desk PC.
+
+    The file is opened in WAL mode so readers never wait for the writer, and
+    each worker thread borrows its own connection. SQLite runs one writer at a
+    time, so every transition is a plain UPDATE ... RETURNING whose WHERE
+    clause is re-checked under the write lock, followed by the notification
+    INSERT in the same transaction. There is no LISTEN/NOTIFY: the only writer
+    is this process, which refreshes its own views after each action.
+    """
+    NAME = "SQLite"
+    Error = sqlite3.Error
+    IntegrityError = sqlite3.IntegrityError
+
+    MIGRATIONS = [
+        (1, "initial schema", [
+            f"""CREATE TABLE IF NOT EXISTS users (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    username TEXT UNIQUE NOT NULL,
+                    password TEXT NOT NULL,
+                    role TEXT NOT NULL CHECK(role IN ('admin','user')),
+                    stage INTEGER NULL,
+                    created_at TIMESTAMP DEFAULT ({SQLITE_NOW})
+                )""",
+            f"""CREATE TABLE IF NOT EXISTS submissions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL REFERENCES users(id),
+                    name TEXT NOT NULL,
+                    reg_number TEXT NOT NULL,
+                    reason TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'Pending',
+                    approval_stage INTEGER NOT NULL DEFAULT 1,
+                    process_completed BOOLEAN NOT NULL DEFAULT FALSE,
+                    created_at TIMESTAMP DEFAULT ({SQLITE_NOW}),
+                    updated_at TIMESTAMP DEFAULT ({SQLITE_NOW})
+                )""",
+            f"""CREATE TABLE IF NOT EXISTS notifications (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL REFERENCES users(id),
+                    submission_id INTEGER NOT NULL REFERENCES submissions(id),
+                    message TEXT NOT NULL,
+                    is_read BOOLEAN DEFAULT FALSE,
+                    created_at TIMESTAMP DEFAULT ({SQLITE_NOW})
+                )""",
+            # Same shapes as the PostgreSQL indexes
+            """CREATE INDEX IF NOT EXISTS idx_submissions_pending_stage
+               ON submissions (approval_stage, id DESC) WHERE status = 'Pending'""",
+            """CREATE INDEX IF NOT EXISTS idx_submissions_ready_for_process
+               ON submissions (id DESC) WHERE status = 'Approved' AND process_completed = FALSE""",
+            "CREATE INDEX IF NOT EXISTS idx_submissions_status_id ON submissions (status, id DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_submissions_user_id_id ON submissions (user_id, id DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_submissions_updated_at ON submissions (updated_at)",
+            "CREATE INDEX IF NOT EXISTS idx_notifications_user_id_id ON notifications (user_id, id DESC)",
+            # Unread counters kept by row triggers, as on PostgreSQL
+            """CREATE TABLE IF NOT EXISTS unread_counts (
+                   user_id INTEGER PRIMARY KEY REFERENCES users(id),
+                   unread INTEGER NOT NULL DEFAULT 0
+               )""",
+            """CREATE TRIGGER IF NOT EXISTS trg_notifications_unread_insert
+               AFTER INSERT ON notifications WHEN NOT COALESCE(NEW.is_read, FALSE)
+               BEGIN
+                   INSERT INTO unread_counts (user_id, unread) VALUES (NEW.user_id, 1)
+                   ON CONFLICT (user_id) DO UPDATE SET unread = unread + 1;
+               END""",
+            """CREATE TRIGGER IF NOT EXISTS trg_notifications_unread_update
+               AFTER UPDATE OF is_read, user_id ON notifications
+               BEGIN
+                   UPDATE unread_counts SET unread = unread - 1
+                   WHERE user_id = OLD.user_id AND NOT COALESCE(OLD.is_read, FALSE);
+                   INSERT INTO unread_counts (user_id, unread)
+                   SELECT NEW.user_id, 1 WHERE NOT COALESCE(NEW.is_read, FALSE)
+                   ON CONFLICT (user_id) DO UPDATE SET unread = unread + 1;
+               END""",
+            """CREATE TRIGGER IF NOT EXISTS trg_notifications_unread_delete
+               AFTER DELETE ON notifications WHEN NOT COALESCE(OLD.is_read, FALSE)
+               BEGIN
+                   UPDATE unread_counts SET unread = unread - 1 WHERE user_id = OLD.user_id;
+               END""",
+        ]),
+        (2, "default users for testing", [
+            """INSERT INTO users (username, password, role, stage) VALUES
+                   ('user1',  'userpass',  'user',  NULL),
+                   ('user2',  'userpass',  'user',  NULL),
+                   ('admin1', 'adminpass', 'admin', 1),
+                   ('admin2', 'adminpass', 'admin', 2),
+                   ('admin3', 'adminpass', 'admin', 3),
+                   ('admin4', 'adminpass', 'admin', 4)
+               ON CONFLICT (username) DO NOTHING""",
+        ]),
+        (3, "certificate references on submissions", [
+            "ALTER TABLE submissions ADD COLUMN certificate_hash TEXT",
+            "ALTER TABLE submissions ADD COLUMN certificate_issued_at TIMESTAMP",
+        ]),
+        (4, "block-allocated certificate serial numbers", [
+            # No sequences here: blocks follow the highest one logged, which is
+            # safe because SQLite runs one writer at a time
+            f"""CREATE TABLE IF NOT EXISTS certificate_serial_blocks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    first_serial INTEGER NOT NULL,
+                    last_serial INTEGER NOT NULL,
+                    client TEXT NOT NULL,
+                    allocated_at TIMESTAMP NOT NULL DEFAULT ({SQLITE_NOW}),
+                    released_at TIMESTAMP NULL,
+                    unused_from INTEGER NULL
+                )""",
+            "ALTER TABLE submissions ADD COLUMN certificate_serial INTEGER",
+            """CREATE UNIQUE INDEX IF NOT EXISTS idx_submissions_certificate_serial
+               ON submissions (certificate_serial) WHERE certificate_serial IS NOT NULL""",
+        ]),
+        (5, "configurable approval workflows", [
+            """CREATE TABLE IF NOT EXISTS workflows (
+                   id INTEGER PRIMARY KEY AUTOINCREMENT,
+                   certificate_type TEXT UNIQUE NOT NULL,
+                   name TEXT NOT NULL,
+                   first_stage INTEGER NOT NULL,
+                   final_stage INTEGER NOT NULL
+               )""",
+            """CREATE TABLE IF NOT EXISTS workflow_stages (
+                   workflow_id INTEGER NOT NULL REFERENCES workflows(id),
+                   stage INTEGER NOT NULL,
+                   name TEXT NOT NULL,
+                   PRIMARY KEY (workflow_id, stage)
+               )""",
+            """CREATE TABLE IF NOT EXISTS workflow_transitions (
+                   workflow_id INTEGER NOT NULL,
+                   from_stage INTEGER NOT NULL,
+                   to_stage INTEGER NOT NULL,
+                   PRIMARY KEY (workflow_id, from_stage),
+                   FOREIGN KEY (workflow_id, from_stage) REFERENCES workflow_stages (workflow_id, stage),
+                   FOREIGN KEY (workflow_id, to_stage) REFERENCES workflow_stages (workflow_id, stage)
+               )""",
+            """INSERT INTO workflows (id, certificate_type, name, first_stage, final_stage)
+               VALUES (1, 'bonafide', 'Bonafide certificate', 1, 4)
+               ON CONFLICT (id) DO NOTHING""",
+            """INSERT INTO workflow_stages (workflow_id, stage, name) VALUES
+                   (1, 1, 'Stage 1'), (1, 2, 'Stage 2'), (1, 3, 'Stage 3'), (1, 4, 'Stage 4')
+               ON CONFLICT DO NOTHING""",
+            """INSERT INTO workflow_transitions (workflow_id, from_stage, to_stage) VALUES
+                   (1, 1, 2), (1, 2, 3), (1, 3, 4)
+               ON CONFLICT DO NOTHING""",
+            # ADD COLUMN cannot carry a REFERENCES clause with a non-NULL default here
+            "ALTER TABLE submissions ADD COLUMN workflow_id INTEGER NOT NULL DEFAULT 1",
+        ]),
+        (6, "parallel approval stages", [
+            # SQLite cannot change a primary key in place, so the transitions
+            # table is rebuilt with one row per prerequisite edge
+            """CREATE TABLE workflow_transitions_dag (
+                   workflow_id INTEGER NOT NULL,
+                   from_stage INTEGER NOT NULL,
+                   to_stage INTEGER NOT NULL,
+                   PRIMARY KEY (workflow_id, from_stage, to_stage),
+                   FOREIGN KEY (workflow_id, from_stage) REFERENCES workflow_stages (workflow_id, stage),
+                   FOREIGN KEY (workflow_id, to_stage) REFERENCES workflow_stages (workflow_id, stage)
+               )""",
+            "INSERT INTO workflow_transitions_dag SELECT workflow_id, from_stage, to_stage FROM workflow_transitions",
+            "DROP TABLE workflow_transitions",
+            "ALTER TABLE workflow_transitions_dag RENAME TO workflow_transitions",
+            f"""CREATE TABLE IF NOT EXISTS submission_stages (
+                    submission_id INTEGER NOT NULL REFERENCES submissions(id),
+                    stage INTEGER NOT NULL,
+                    state TEXT NOT NULL CHECK(state IN ('waiting','ready','approved','rejected','cancelled')),
+                    waiting_on INTEGER NOT NULL DEFAULT 0,
+                    updated_at TIMESTAMP DEFAULT ({SQLITE_NOW}),
+                    PRIMARY KEY (submission_id, stage)
+                )""",
+            """CREATE INDEX IF NOT EXISTS idx_submission_stages_ready
+               ON submission_stages (stage, submission_id DESC) WHERE state = 'ready'""",
+            SUBMISSION_STAGES_BACKFILL,
+            "DROP INDEX IF EXISTS idx_submissions_pending_stage",
+        ]),
+    ]
+    SERIAL_BLOCK_SIZE = 100
+
+    def __init__(self, path: str = "nt_bonafide.db", cache_size: int = 1024, cache_ttl: float = 30.0,
+                 slow_query_ms: float = 500.0):
+        super().__init__(cache_size, cache_ttl, slow_query_ms)
+        if sqlite3.sqlite_version_info < (3, 35, 0):
+            raise Exception(f"SQLite {sqlite3.sqlite_version} is too old; 3.35 or newer is required")
+        self.path = path
+        self.config = {'backend': 'sqlite', 'path': path}
+        self._local = threading.local()
+        self._idle = []
+        self._idle_lock = threading.Lock()
+        self._opened = 0
+        try:
+            self.ensure_schema()
+            self._router = self.load_workflows()
+        except sqlite3.Error as e:
+            self.close()
+            raise Exception(f"Failed to open SQLite database {path}: {e}")
+
+    # -------- Connections --------
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=10.0, detect_types=sqlite3.PARSE_DECLTYPES,
+                               check_same_thread=False)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA foreign_keys = ON")
+        self._opened += 1
+        return conn
+
+    def _acquire(self):
+        with self._idle_lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._open()
+
+    def _release(self, conn):
+        with self._idle_lock:
+            self._idle.append(conn)
+
+    @contextmanager
+    def _connection(self):
+        """Borrow a connection for the duration of a with-block; nested calls share it"""
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            yield held
+            return
+
+        raw = self._acquire()
+        conn = _SQLiteConnection(raw)
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            if raw.in_transaction:
+                raw.rollback()
+            self._release(raw)
+
+    def pool_stats(self) -> dict:
+        """Get connection statistics"""
+        with self._idle_lock:
+            idle = len(self._idle)
+        return {'backend': self.NAME, 'path': self.path, 'opened': self._opened, 'idle': idle}
+
+    # -------- Schema migrations --------
+    @property
+    def latest_schema_version(self) -> int:
+        return self.MIGRATIONS[-1][0]
+
+    def get_schema_version(self) -> int:
+        """Get the version the database schema is at (0 for an empty database)"""
+        with self._connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute("SELECT MAX(version) FROM schema_version")
+                return cur.fetchone()[0] or 0
+            except sqlite3.OperationalError:
+                return 0
+
+    def ensure_schema(self):
+        """Bring the schema up to date; a current database costs a single query"""
+        if self.get_schema_version() < self.latest_schema_version:
+            self.migrate()
+
+    def migrate(self):
+        """Apply pending migration steps while holding the database write lock"""
+        try:
+            with self._connection() as conn:
+                cur = conn.cursor()
+                cur.execute("BEGIN IMMEDIATE")
+                cur.execute(f"""
+                    CREATE TABLE IF NOT EXISTS schema_version (
+                        version INTEGER PRIMARY KEY,
+                        description TEXT NOT NULL,
+                        applied_at TIMESTAMP DEFAULT ({SQLITE_NOW})
+                    )
+                """)
+                cur.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+                current = cur.fetchone()[0]
+                for version, description, statements in self.MIGRATIONS:
+                    if version <= current:
+                        continue
+                    for statement in statements:
+                        cur.execute(statement)
+                    cur.execute(
+                        "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                        (version, description)
+                    )
+                    log.info("Applied schema migration %s: %s", version, description)
+                conn.commit()
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to migrate database schema: {e}")
+
+    # -------- Submissions --------
+    def add_submission(self, user_id: int, name: str, reg_number: str, reason: str, workflow_id: int = None):
+        """Add a new submission request at the first stage of its workflow (the default one if None)"""
+        workflow_id = workflow_id or self.router.default_workflow_id
+        stage = self.router.first_stage(workflow_id)
+        try:
+            rows = self._transition(
+                """INSERT INTO submissions (user_id, name, reg_number, reason, status, approval_stage,
+                                            process_completed, workflow_id)
+                   VALUES (%s, %s, %s, %s, 'Pending', %s, FALSE, %s)
+                   RETURNING id, user_id, name, reg_number, approval_stage, status""",
+                (user_id, name, reg_number, reason, stage, workflow_id),
+                lambda row: self.submitted_message(row[4]),
+                after=lambda cur, rows: cur.executemany(
+                    "INSERT INTO submission_stages (submission_id, stage, state, waiting_on) VALUES (%s, %s, %s, %s)",
+                    [(rows[0][0], *state) for state in self.router.initial_states(workflow_id)]
+                ),
+            )
+            return rows[0][0]
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to add submission: {e}")
+
+    def open_status_stream(self, status: str):
+        """Stream submissions with a status, newest first, in keyset-paged batches"""
+        def fetch_page(after_id, limit):
+            page_sql, page_params = self._keyset(after_id, limit)
+            try:
+                with self._connection() as conn:
+                    cur = conn.cursor()
+                    cur.execute(
+                        """SELECT id, name, reg_number, substr(reason, 1, 200), approval_stage, created_at
+                           FROM submissions
+                           WHERE status = %s """ + page_sql,
+                        (status,) + page_params
+                    )
+                    return cur.fetchall()
+            except sqlite3.Error as e:
+                raise Exception(f"Failed to fetch submissions: {e}")
+        return KeysetStream(fetch_page)
+
+    # -------- Delta refresh --------
+    def get_submission_changes(self, since=None, limit: int = 1000):
+        """Get submissions changed since a watermark as (rows, new_watermark).
+
+        rows is None when more than limit rows changed, telling the caller a
+        full reload is cheaper; since=None only establishes a watermark.
+        """
+        try:
+            with self._connection() as conn:
+                cur = conn.cursor()
+                cur.execute(f"SELECT {SQLITE_NOW}")
+                watermark = datetime.fromisoformat(cur.fetchone()[0])
+                if since is None:
+                    return [], watermark
+                cur.execute(
+                    """SELECT id, user_id, name, reg_number, reason, status, approval_stage,
+                              process_completed, created_at, updated_at, workflow_id,
+                              (SELECT group_concat(st.stage) FROM submission_stages st
+                               WHERE st.submission_id = submissions.id AND st.state = 'ready') AS ready_stages
+                       FROM submissions
+                       WHERE updated_at > %s
+                       ORDER BY updated_at
+                       LIMIT %s""",
+                    (since - timedelta(seconds=self.DELTA_OVERLAP_SECONDS), limit + 1)
+                )
+                rows = cur.fetchall()
+                if len(rows) > limit:
+                    return None, watermark
+                return rows, watermark
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to get submission changes: {e}")
+
+    # -------- Stage transitions --------
+    def _transition(self, update: str, params, message, before=(), after=None):
+        """Run an UPDATE/INSERT ... RETURNING (id, user_id, name, reg_number,
+        approval_stage, status) and notify each moved student with message(row).
+
+        The before statements run first with the same params, and after(cur, rows)
+        runs behind the update, all in one transaction.
+        """
+        with self._connection() as conn:
+            cur = conn.cursor()
+            for statement in before:
+                cur.execute(statement, params)
+            rows = cur.execute(update, params).fetchall()
+            if after is not None:
+                after(cur, rows)
+            cur.executemany(
+                "INSERT INTO notifications (user_id, submission_id, message, is_read) VALUES (%s, %s, %s, FALSE)",
+                [(row[1], row[0], message(row)) for row in rows]
+            )
+            conn.commit()
+        self.submission_cache.invalidate(*(row[0] for row in rows))
+        return rows
+
+    def approve_many(self, submission_ids, stage: int):
+        """Approve every listed submission still pending at stage, in one transaction.
+
+        The stage is signed off for each; stages waiting on it become ready
+        once none of their other prerequisites is outstanding, and approval
+        at a workflow's final stage fully approves the request. approval_stage
+        moves to the lowest stage still reviewing it. Returns the moved rows as
+        (id, user_id, name, reg_number, approval_stage, status); ids that were
+        not ready at that stage are left out.
+        """
+        if stage not in self.router.stages:
+            return []
+        # Submissions ready at this stage among the listed ids
+        ready = """SELECT submission_id FROM submission_stages
+                   WHERE stage = %(stage)s AND state = 'ready'
+                         AND submission_id IN (SELECT value FROM json_each(%(ids)s))"""
+
+        def sign_off(cur, rows):
+            cur.execute(
+                f"""UPDATE submission_stages SET state = 'approved', updated_at = {SQLITE_NOW}
+                    WHERE stage = %s AND state = 'ready' AND submission_id IN (SELECT value FROM json_each(%s))""",
+                (stage, json.dumps([row[0] for row in rows]))
+            )
+
+        try:
+            return self._transition(
+                f"""UPDATE submissions
+                    SET status = CASE WHEN workflow_id IN (SELECT value FROM json_each(%(final)s))
+                                      THEN 'Approved' ELSE 'Pending' END,
+                        approval_stage = COALESCE(
+                            (SELECT MIN(st.stage) FROM submission_stages st
+                             WHERE st.submission_id = submissions.id AND st.state = 'ready' AND st.stage <> %(stage)s),
+                            approval_stage),
+                        updated_at = {SQLITE_NOW}
+                    WHERE id IN ({ready}) AND status = 'Pending'
+                    RETURNING id, user_id, name, reg_number, approval_stage, status""",
+                {
+                    'ids': json.dumps(list(submission_ids)),
+                    'stage': stage,
+                    'final': json.dumps(self.router.workflows_ending_at(stage)),
+                    'unlocks': json.dumps(self.router.successors(stage)),
+                },
+                lambda row: self.APPROVED_MESSAGE if row[5] == 'Approved' else self.moved_message(row[4]),
+                # Unlock the waiting stages first so approval_stage can move on to them
+                before=[f"""UPDATE submission_stages
+                            SET waiting_on = waiting_on - 1,
+                                state = CASE WHEN waiting_on = 1 THEN 'ready' ELSE state END,
+                                updated_at = {SQLITE_NOW}
+                            FROM submissions s,
+                                 (SELECT json_extract(value, '$[0]') AS workflow_id, json_extract(value, '$[1]') AS stage
+                                  FROM json_each(%(unlocks)s)) AS r
+                            WHERE s.id = submission_stages.submission_id AND s.status = 'Pending'
+                                  AND s.workflow_id = r.workflow_id AND submission_stages.stage = r.stage
+                                  AND s.id IN ({ready})"""],
+                after=sign_off,
+            )
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to approve submissions: {e}")
+
+    def reject_many(self, submission_ids, stage: int):
+        """Reject every listed submission ready at stage; returns the rejected rows.
+
+        Its other open stages are cancelled, leaving their queues too.
+        """
+        try:
+            return self._transition(
+                f"""UPDATE submissions
+                    SET status = 'Rejected', updated_at = {SQLITE_NOW}
+                    WHERE id IN (SELECT submission_id FROM submission_stages
+                                 WHERE stage = %(stage)s AND state = 'rejected'
+                                       AND submission_id IN (SELECT value FROM json_each(%(ids)s)))
+                          AND status = 'Pending'
+                    RETURNING id, user_id, name, reg_number, approval_stage, status""",
+                {'ids': json.dumps(list(submission_ids)), 'stage': stage},
+                lambda row: self.REJECTED_MESSAGE,
+                before=[f"""UPDATE submission_stages
+                            SET state = CASE WHEN stage = %(stage)s THEN 'rejected' ELSE 'cancelled' END,
+                                updated_at = {SQLITE_NOW}
+                            WHERE submission_id IN (SELECT st.submission_id FROM submission_stages st
+                                                    JOIN submissions s ON s.id = st.submission_id
+                                                    WHERE st.submission_id IN (SELECT value FROM json_each(%(ids)s))
+                                                          AND st.stage = %(stage)s AND st.state = 'ready'
+                                                          AND s.status = 'Pending')
+                                  AND state IN ('ready', 'waiting')"""],
+            )
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to reject submissions: {e}")
+
+    def mark_process_completed_many(self, submission_ids):
+        """Mark every listed approved submission as process completed; returns the completed rows"""
+        try:
+            return self._transition(
+                f"""UPDATE submissions
+                    SET process_completed = TRUE, updated_at = {SQLITE_NOW}
+                    WHERE id IN (SELECT value FROM json_each(%(ids)s)) AND status = 'Approved' AND process_completed = FALSE
+                    RETURNING id, user_id, name, reg_number, approval_stage, status""",
+                {'ids': json.dumps(list(submission_ids))},
+                lambda row: self.PROCESS_DONE_MESSAGE,
+            )
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to mark processes completed: {e}")
+
+    def update_stage(self, submission_id: int, new_stage: int):
+        """Update the approval stage of a submission.
+
+        A pending request is put back (or forward) to new_stage: the stages it
+        waits for count as approved and everything after it is reviewed again.
+        """
+        try:
+            rows = self._transition(
+                f"""UPDATE submissions
+                    SET approval_stage = %(stage)s, updated_at = {SQLITE_NOW}
+                    WHERE id = %(id)s
+                    RETURNING id, user_id, name, reg_number, approval_stage, status""",
+                {'id': submission_id, 'stage': new_stage, 'states': json.dumps(self.router.states_at(new_stage))},
+                lambda row: self.moved_message(row[4]),
+                before=[f"""UPDATE submission_stages
+                            SET state = r.state, waiting_on = r.waiting_on, updated_at = {SQLITE_NOW}
+                            FROM submissions s,
+                                 (SELECT json_extract(value, '$[0]') AS workflow_id, json_extract(value, '$[1]') AS stage,
+                                         json_extract(value, '$[2]') AS state, json_extract(value, '$[3]') AS waiting_on
+                                  FROM json_each(%(states)s)) AS r
+                            WHERE s.id = %(id)s AND s.status = 'Pending' AND submission_stages.submission_id = s.id
+                                  AND s.workflow_id = r.workflow_id AND submission_stages.stage = r.stage"""],
+            )
+            return rows[0] if rows else None
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to update stage: {e}")
+
+    # A request leaving Pending outside approve/reject leaves every queue
+    _CANCEL_STAGES_SQL = f"""UPDATE submission_stages
+                             SET state = 'cancelled', updated_at = {SQLITE_NOW}
+                             WHERE submission_id = %(id)s AND state IN ('ready', 'waiting')"""
+
+    def update_status(self, submission_id: int, new_status: str):
+        """Update the status of a submission"""
+        messages = {
+            "Approved": self.APPROVED_MESSAGE,
+            "Rejected": self.REJECTED_MESSAGE,
+        }
+        try:
+            if new_status not in messages:
+                # No student notification for other statuses; keep the plain update
+                with self._connection() as conn:
+                    cur = conn.cursor()
+                    cur.execute(
+                        f"UPDATE submissions SET status = %s, updated_at = {SQLITE_NOW} WHERE id = %s",
+                        (new_status, submission_id)
+                    )
+                    if new_status != 'Pending':
+                        cur.execute(self._CANCEL_STAGES_SQL, {'id': submission_id})
+                    conn.commit()
+                self.submission_cache.invalidate(submission_id)
+                return None
+
+            rows = self._transition(
+                f"""UPDATE submissions
+                    SET status = %(status)s, updated_at = {SQLITE_NOW}
+                    WHERE id = %(id)s
+                    RETURNING id, user_id, name, reg_number, approval_stage, status""",
+                {'id': submission_id, 'status': new_status},
+                lambda row: messages[new_status],
+                before=[self._CANCEL_STAGES_SQL],
+            )
+            return rows[0] if rows else None
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to update status: {e}")
+
+    def _fetch_submissions(self, submission_ids):
+        """CACHED_COLUMNS rows of the listed submissions, for the submission cache"""
+        with self._connection() as conn:
+            cur = conn.cursor()
+            cur.execute(f"SELECT {self.CACHED_COLUMNS} FROM submissions WHERE id IN (SELECT value FROM json_each(%s))",
+                        (json.dumps(list(submission_ids)),))
+            return cur.fetchall()
+
+    # -------- Certificates --------
+
+    def claim_certificate_serials(self, submission_ids, serials, issued_at: datetime):
+        """Number the listed approved submissions that have no serial yet, in one statement.
+
+        They take serials from the front of the list in id DESC order and are
+        dated issued_at unless already issued before. Submissions numbered by
+        anyone else first are skipped, so exactly the first len(result)
+        serials are used. Returns the (id, serial) pairs assigned.
+        """
+        try:
+            with self._connection() as conn:
+                cur = conn.cursor()
+                # One writer at a time: the rows counted are the rows updated
+                rows = cur.execute(
+                    f"""UPDATE submissions
+                        SET certificate_serial = (SELECT value FROM json_each(%(serials)s) WHERE key = n.n - 1),
+                            certificate_issued_at = COALESCE(certificate_issued_at, %(issued_at)s),
+                            certificate_hash = NULL, updated_at = {SQLITE_NOW}
+                        FROM (SELECT id, row_number() OVER (ORDER BY id DESC) AS n
+                              FROM submissions
+                              WHERE id IN (SELECT value FROM json_each(%(ids)s)) AND status = 'Approved'
+                                    AND certificate_serial IS NULL) AS n
+                        WHERE submissions.id = n.id
+                        RETURNING id, certificate_serial""",
+                    {'ids': json.dumps(list(submission_ids)), 'serials': json.dumps(list(serials)),
+                     'issued_at': issued_at}
+                ).fetchall()
+                conn.commit()
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to number certificates: {e}")
+        # Every listed id, so the caller re-reads the winner's serial for those it lost
+        self.submission_cache.invalidate(*submission_ids)
+        return rows
+
+    def record_certificates(self, certificates):
+        """Store the (submission_id, certificate_hash, serial) of rendered certificates;
+        a hash is only recorded on a row still carrying that serial"""
+        try:
+            with self._connection() as conn:
+                cur = conn.cursor()
+                cur.executemany(
+                    "UPDATE submissions SET certificate_hash = %s WHERE id = %s AND certificate_serial = %s",
+                    [(digest, submission_id, serial) for submission_id, digest, serial in certificates]
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to record certificates: {e}")
+        self.submission_cache.invalidate(*(certificate[0] for certificate in certificates))
+
+    def allocate_serial_block(self, client: str):
+        """Reserve the next block of certificate serials for client; returns (block_id, first_serial, last_serial)"""
+        try:
+            with self._connection() as conn:
+                cur = conn.cursor()
+                cur.execute(
+                    """INSERT INTO certificate_serial_blocks (first_serial, last_serial, client)
+                       SELECT COALESCE(MAX(last_serial), 0) + 1, COALESCE(MAX(last_serial), 0) + %s, %s
+                       FROM certificate_serial_blocks
+                       RETURNING id, first_serial, last_serial""",
+                    (self.SERIAL_BLOCK_SIZE, client)
+                )
+                block = cur.fetchone()
+                conn.commit()
+                return block
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to reserve certificate serials: {e}")
+
+    def release_serial_block(self, block_id: int, unused_from: int = None):
+        """Close a serial block, recording the first serial it never assigned (None if it was used up)"""
+        try:
+            with self._connection() as conn:
+                cur = conn.cursor()
+                cur.execute(
+                    f"""UPDATE certificate_serial_blocks
+                        SET released_at = {SQLITE_NOW}, unused_from = %s
+                        WHERE id = %s AND released_at IS NULL""",
+                    (unused_from, block_id)
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to release certificate serials: {e}")
+
+    def close(self):
+        """Close every open connection"""
+        with self._idle_lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class MemoryDatabase(SQLiteDatabase):
+    """SQLite backend held entirely in memory, for benchmarks and demos.
+
+    Every thread shares one connection (a private in-memory database exists
+    per connection), so calls are serialised by a lock; with no disk or
+    network involved each query costs microseconds.
+    """
+    NAME = "in-memory SQLite"
+
+    def __init__(self, cache_size: int = 1024, cache_ttl: float = 30.0, slow_query_ms: float = 500.0):
+        self._shared = None
+        self._shared_lock = threading.RLock()
+        super().__init__(":memory:", cache_size, cache_ttl, slow_query_ms)
+        self.config = {'backend': 'memory'}
+
+    def _open(self):
+        conn = sqlite3.connect(":memory:", detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+        conn.execute("PRAGMA foreign_keys = ON")
+        self._opened += 1
+        return conn
+
+    def _acquire(self):
+        self._shared_lock.acquire()
+        if self._shared is None:
+            self._shared = self._open()
+        return self._shared
+
+    def _release(self, conn):
+        self._shared_lock.release()
+
+    def close(self):
+        with self._shared_lock:
+            if self._shared is not None:
+                self._shared.close()
+                self._shared = None
+
+
+def open_database(config: dict) -> StorageBackend:
+    """Open the storage backend named by config['backend'] (PostgreSQL by default).
+
+    The slow-query threshold comes from config['slow_query_ms'], else the
+    NT_SLOW_QUERY_MS environment variable, else 500 ms.
+    """
+    config = dict(config)
+    backend = config.pop('backend', 'postgresql')
+    slow_query_ms = float(config.pop('slow_query_ms', os.environ.get("NT_SLOW_QUERY_MS", 500)))
+    if backend == 'sqlite':
+        return SQLiteDatabase(config.get('path') or "nt_bonafide.db", slow_query_ms=slow_query_ms)
+    if backend == 'memory':
+        return MemoryDatabase(slow_query_ms=slow_query_ms)
+    return Database(config, slow_query_ms=slow_query_ms)
 
 
 # ========================
 # Sign Up Window
 # ========================
 class SignUpWindow(QWidget):
-    def __init__(self, db: Database, login_window: QWidget):
+    def __init__(self, db: StorageBackend, login_window: QWidget):
         super().__init__()
         self.db = db
         self.login_window = login_window
@@ -498,9 +2860,9 @@ class SignUpWindow(QWidget):
         self.setGeometry(380, 380, 380, 220)
         
         # Set window icon if logo exists
-        logo_pixmap = create_logo_pixmap()
-        if logo_pixmap:
-            self.setWindowIcon(QIcon(logo_pixmap))
+        logo_icon = assets.icon(LOGO)
+        if logo_icon:
+            self.setWindowIcon(logo_icon)
             
         self.setup_ui()
 
@@ -514,10 +2876,10 @@ class SignUpWindow(QWidget):
         header_layout = QHBoxLayout()
         
         # Logo
-        logo_pixmap = create_logo_pixmap()
+        logo_pixmap = create_logo_pixmap(32)
         if logo_pixmap:
             logo_label = QLabel()
-            logo_label.setPixmap(logo_pixmap.scaled(32, 32, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+            logo_label.setPixmap(logo_pixmap)
             header_layout.addWidget(logo_label)
         
         title = QLabel("Create New Account")
@@ -616,9 +2978,9 @@ class LoginWindow(QWidget):
         self.setGeometry(350, 350, 450, 380)
         
         # Set window icon if logo exists
-        logo_pixmap = create_logo_pixmap()
-        if logo_pixmap:
-            self.setWindowIcon(QIcon(logo_pixmap))
+        logo_icon = assets.icon(LOGO)
+        if logo_icon:
+            self.setWindowIcon(logo_icon)
             
         self.setup_ui()
 
@@ -633,10 +2995,10 @@ class LoginWindow(QWidget):
         header_layout.setAlignment(Qt.AlignCenter)
         
         # Logo
-        logo_pixmap = create_logo_pixmap()
+        logo_pixmap = create_logo_pixmap(80)
         if logo_pixmap:
             logo_label = QLabel()
-            logo_label.setPixmap(logo_pixmap.scaled(80, 80, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+            logo_label.setPixmap(logo_pixmap)
             logo_label.setAlignment(Qt.AlignCenter)
             header_layout.addWidget(logo_label)
 
@@ -754,14 +3116,14 @@ class LoginWindow(QWidget):
                 if self.db:
                     self.db.close()
                     
-                self.db = Database(config)
-                self.status_label.setText("✅ Connected to PostgreSQL database")
+                self.db = open_database(config)
+                self.status_label.setText(f"✅ Connected to {self.db.NAME} database")
                 self.status_label.setStyleSheet("font-size: 12px; color: #10b981; margin-bottom: 10px;")
                 self.login_btn.setEnabled(True)
                 self.signup_btn.setEnabled(True)
                 
             except Exception as e:
-                QMessageBox.critical(self, "Database Error", f"Failed to connect to database:\n{str(e)}\n\nPlease check your configuration and ensure PostgreSQL is running.")
+                QMessageBox.critical(self, "Database Error", f"Failed to connect to database:\n{str(e)}\n\nPlease check your configuration and, for PostgreSQL, ensure the server is running.")
                 self.status_label.setText("❌ Database connection failed")
                 self.status_label.setStyleSheet("font-size: 12px; color: #dc2626; margin-bottom: 10px;")
 
@@ -778,13 +3140,14 @@ class LoginWindow(QWidget):
             QMessageBox.warning(self, "Error", "Please enter both username and password.")
             return
         
+        started = time.perf_counter()
         try:
             user = self.db.get_user(username, password)
             if not user:
                 QMessageBox.warning(self, "Error", "Invalid username or password!")
                 return
                 
-            self.main_app = MainApp(self.db, user, login_window=self)
+            self.main_app = MainApp(self.db, user, login_window=self, started_at=started)
             self.main_app.show()
             self.hide()
         except Exception as e:
@@ -804,27 +3167,549 @@ class LoginWindow(QWidget):
 # ========================
 # Utility Functions
 # ========================
-def populate_table(table: QTableWidget, headers, rows):
-    """Populate a table widget with data"""
-    table.setRowCount(len(rows))
-    table.setColumnCount(len(headers))
-    table.setHorizontalHeaderLabels(headers)
-    table.verticalHeader().setVisible(False)
-    table.setEditTriggers(QTableWidget.NoEditTriggers)
-    table.setSelectionBehavior(QTableWidget.SelectRows)
-    table.setSelectionMode(QTableWidget.SingleSelection)
-    table.setWordWrap(True)
-    table.setAlternatingRowColors(True)
-    table.resizeColumnsToContents()
-    table.horizontalHeader().setStretchLastSection(True)
+class KeysetPager:
+    """Cursor state for paging a table ordered by id DESC (newest first)"""
+    def __init__(self, page_size: int = 100):
+        self.page_size = page_size
+        self.cursors = [None]  # after_id of every page visited; the last one is current
+        self.has_more = False
+        self.last_id = None
+
+    @property
+    def after_id(self):
+        return self.cursors[-1]
+
+    @property
+    def page_number(self) -> int:
+        return len(self.cursors)
+
+    @property
+    def fetch_limit(self) -> int:
+        # One look-ahead row tells us whether an older page exists
+        return self.page_size + 1
+
+    def accept(self, rows):
+        """Trim the look-ahead row from a fetched page and remember where it ended"""
+        self.has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.last_id = rows[-1][0] if rows else None
+        return rows
+
+    def older(self) -> bool:
+        if not self.has_more or self.last_id is None:
+            return False
+        self.cursors.append(self.last_id)
+        return True
+
+    def newer(self) -> bool:
+        if len(self.cursors) == 1:
+            return False
+        self.cursors.pop()
+        return True
+
+    def reset(self):
+        self.cursors = [None]
+        self.has_more = False
+        self.last_id = None
+
+
+STATUS_COLORS = {
+    "Approved": "#10b981",
+    "Rejected": "#dc2626",
+    "Pending": "#f59e0b",
+}
+
+
+def format_timestamp(value) -> str:
+    """Format a database timestamp for display"""
+    if hasattr(value, 'strftime'):
+        return value.strftime("%Y-%m-%d %H:%M")
+    return str(value)
+
+
+def stage_text(status: str, stage) -> str:
+    """Describe where a request is in the approval pipeline"""
+    return f"Stage {stage}" if status == "Pending" else f"Final: {stage}"
+
+
+# ========================
+# Table Models
+# ========================
+class TableColumn:
+    """How one column of a RowTableModel renders a row tuple"""
+    def __init__(self, header: str, text, color=None, bold=None):
+        self.header = header
+        self.text = text      # row -> display text
+        self.color = color    # row -> hex colour or None
+        self.bold = bold      # row -> bool
+
+
+class RowTableModel(QAbstractTableModel):
+    """Read-only model over a list of row tuples.
+
+    Cells are rendered on demand in data(), so a refresh is a single model
+    reset and painting cost only depends on the rows the view shows.
+    """
+    def __init__(self, columns, parent=None):
+        super().__init__(parent)
+        self.columns = list(columns)
+        self.rows = []
+        self._colors = {}
+        self._bold_font = QFont()
+        self._bold_font.setBold(True)
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = list(rows)
+        self.endResetModel()
+
+    def row_at(self, row: int):
+        return self.rows[row]
+
+    def _position(self, row_id: int):
+        # Rows are ordered by id DESC: binary search for the slot of row_id
+        lo, hi = 0, len(self.rows)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.rows[mid][0] > row_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def merge_rows(self, changes, newest_loaded: bool = True, oldest_loaded: bool = True):
+        """Apply (id, row) changes in place; row=None removes the id.
+
+        Rows stay ordered by id DESC. New ids are only inserted inside the
+        loaded window: above the top row when the newest rows are loaded,
+        below the bottom row when nothing older is left to load. Updates go
+        through insert/remove/dataChanged so the view keeps its scroll
+        position and selection.
+        """
+        last_column = len(self.columns) - 1
+        for row_id, row in changes:
+            pos = self._position(row_id)
+            present = pos < len(self.rows) and self.rows[pos][0] == row_id
+            if present and row is None:
+                self.beginRemoveRows(QModelIndex(), pos, pos)
+                del self.rows[pos]
+                self.endRemoveRows()
+            elif present:
+                if self.rows[pos] != row:
+                    self.rows[pos] = row
+                    self.dataChanged.emit(self.index(pos, 0), self.index(pos, last_column))
+            elif row is not None:
+                if pos == 0 and not newest_loaded:
+                    continue
+                if pos == len(self.rows) and not oldest_loaded:
+                    continue
+                self.beginInsertRows(QModelIndex(), pos, pos)
+                self.rows.insert(pos, row)
+                self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        column = self.columns[index.column()]
+        row = self.rows[index.row()]
+        if role == Qt.DisplayRole:
+            return column.text(row)
+        if role == Qt.ForegroundRole and column.color is not None:
+            color = column.color(row)
+            if color:
+                if color not in self._colors:
+                    self._colors[color] = QColor(color)
+                return self._colors[color]
+        if role == Qt.FontRole and column.bold is not None and column.bold(row):
+            return self._bold_font
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columns[section].header
+        return None
+
+
+class StreamingRowTableModel(RowTableModel):
+    """RowTableModel that streams rows from a SubmissionStream as the view scrolls.
+
+    The first batch is shown as soon as it arrives; Qt calls fetchMore()
+    whenever the user scrolls near the end, and each batch is fetched on the
+    query executor so scrolling never blocks on the database.
+    """
+    first_batch_loaded = pyqtSignal()
+
+    def __init__(self, columns, executor, key: str, batch_size: int = 200, parent=None):
+        super().__init__(columns, parent)
+        self.executor = executor
+        self.key = key
+        self.batch_size = batch_size
+        self.stream = None
+        self.on_error = None
+        self.complete = False
+        self._token = 0
+        self._fetching = False
+
+    def start(self, open_stream, on_error=None):
+        """Drop the current rows and stream from a new cursor opened by open_stream()"""
+        self.close()
+        self.set_rows([])
+        self.complete = False
+        self.on_error = on_error
+        self._fetching = True
+        token = self._token
+        self.executor.submit(
+            (self.key, token), self._open, open_stream,
+            on_result=partial(self._opened, token),
+            on_error=partial(self._failed, token),
+        )
+
+    def _open(self, open_stream):
+        # Runs on a worker: open the cursor and fetch the first screen in one go
+        stream = open_stream()
+        return stream, stream.fetch(self.batch_size)
+
+    def _opened(self, token: int, result):
+        stream, rows = result
+        if token != self._token:
+            self.executor.submit(("close_stream", id(stream)), stream.close)
+            return
+        self.stream = stream
+        self._append(token, rows)
+        self.first_batch_loaded.emit()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return (not parent.isValid() and self.stream is not None
+                and not self.stream.exhausted and not self._fetching)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self._fetching = True
+        token = self._token
+        self.executor.submit(
+            (self.key, token), self.stream.fetch, self.batch_size,
+            on_result=partial(self._append, token),
+            on_error=partial(self._failed, token),
+        )
+
+    def _append(self, token: int, rows):
+        if token != self._token:
+            return
+        self._fetching = False
+        if rows:
+            first = len(self.rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self.rows.extend(rows)
+            self.endInsertRows()
+        if self.stream is not None and self.stream.exhausted:
+            # Release the connection as soon as the last batch is in
+            self.complete = True
+            self.close()
+
+    def _failed(self, token: int, error):
+        if token != self._token:
+            return
+        self.close()
+        if self.on_error:
+            self.on_error(error)
+
+    def close(self):
+        """Stop streaming and release the cursor's pooled connection"""
+        self._token += 1
+        self._fetching = False
+        if self.stream is not None:
+            stream, self.stream = self.stream, None
+            self.executor.submit(("close_stream", id(stream)), stream.close)
+
+
+class ActionButtonDelegate(QStyledItemDelegate):
+    """Paints a button in every cell of a column instead of creating a widget per row.
+
+    clicked carries the model row; enabled(row) decides whether a row gets a
+    button or falls back to the model's plain text.
+    """
+    clicked = pyqtSignal(int)
+
+    def __init__(self, label: str, color: str, hover_color: str, enabled=None, parent=None):
+        super().__init__(parent)
+        self.label = label
+        self.color = QColor(color)
+        self.hover_color = QColor(hover_color)
+        self.enabled = enabled or (lambda row: True)
+        self._hover = None
+
+    def _button_rect(self, cell: QRect) -> QRect:
+        return cell.adjusted(6, 4, -6, -4)
+
+    def paint(self, painter, option, index):
+        if not self.enabled(index.model().row_at(index.row())):
+            super().paint(painter, option, index)
+            return
+
+        rect = self._button_rect(option.rect)
+        hovered = self._hover == (index.row(), index.column())
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(self.hover_color if hovered else self.color)
+        painter.drawRoundedRect(rect, 6, 6)
+        font = QFont(option.font)
+        font.setBold(True)
+        painter.setFont(font)
+        painter.setPen(QColor("#ffffff"))
+        painter.drawText(rect, Qt.AlignCenter, self.label)
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        width = option.fontMetrics.horizontalAdvance(self.label) + 40
+        return QSize(width, 36)
+
+    def editorEvent(self, event, model, option, index):
+        if not self.enabled(model.row_at(index.row())):
+            return False
+        inside = self._button_rect(option.rect).contains(event.pos()) if hasattr(event, 'pos') else False
+        if event.type() == QEvent.MouseMove:
+            hover = (index.row(), index.column()) if inside else None
+            if hover != self._hover:
+                self._hover = hover
+                if option.widget is not None:
+                    option.widget.viewport().update()
+            return False
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton and inside:
+            self.clicked.emit(index.row())
+            return True
+        return False
+
+
+def submission_columns(stage_header: str = "Stage", date_header: str = "Created At"):
+    """Columns shared by the pending, process-done and status tables"""
+    return [
+        TableColumn("ID", lambda r: str(r[0])),
+        TableColumn("Name", lambda r: r[1]),
+        TableColumn("Reg No", lambda r: r[2]),
+        TableColumn("Reason", lambda r: r[3]),
+        TableColumn(stage_header, lambda r: str(r[4])),
+        TableColumn(date_header, lambda r: format_timestamp(r[5])),
+    ]
+
+
+def create_table_view(columns, multi_select: bool = False, model: RowTableModel = None) -> QTableView:
+    """Create a read-only table view backed by a fresh RowTableModel (or the given model)"""
+    view = QTableView()
+    if model is None:
+        model = RowTableModel(columns)
+    model.setParent(view)
+    view.setModel(model)
+    view.verticalHeader().setVisible(False)
+    # Uniform row heights keep layout cost independent of the row count
+    view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+    view.verticalHeader().setDefaultSectionSize(40)
+    view.setEditTriggers(QTableView.NoEditTriggers)
+    view.setSelectionBehavior(QTableView.SelectRows)
+    view.setSelectionMode(QTableView.ExtendedSelection if multi_select else QTableView.SingleSelection)
+    view.setWordWrap(True)
+    view.setAlternatingRowColors(True)
+    view.setMouseTracking(True)
+    view.horizontalHeader().setStretchLastSection(True)
+    view.setMinimumHeight(400)
+    return view
+
+
+def add_action_column(view: QTableView, column: int, delegate: ActionButtonDelegate):
+    """Attach a painted button delegate to one column of a table view"""
+    delegate.setParent(view)
+    view.setItemDelegateForColumn(column, delegate)
+
+
+def show_rows(view: QTableView, rows):
+    """Replace the rows shown in a table view"""
+    view.model().set_rows(rows)
+    # Only the rows in the viewport are measured (see QTableView::sizeHintForColumn)
+    view.resizeColumnsToContents()
+    view.horizontalHeader().setStretchLastSection(True)
+
+
+
+# ========================
+# Background Query Executor
+# ========================
+class _QuerySignals(QObject):
+    """Signals used by query tasks to hand results back to the GUI thread"""
+    finished = pyqtSignal(object, int, object)
+    failed = pyqtSignal(object, int, object)
+
+
+class _QueryTask(QRunnable):
+    """A single Database call executed on a QThreadPool worker"""
+    def __init__(self, key, generation: int, fn, args, kwargs, signals: _QuerySignals):
+        super().__init__()
+        self.key = key
+        self.generation = generation
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = signals
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(self.key, self.generation, e)
+        else:
+            self.signals.finished.emit(self.key, self.generation, result)
+
+
+class QueryExecutor(QObject):
+    """Run Database calls in the background and deliver results on the GUI thread.
+
+    Every call is submitted under a key (usually the page it feeds). Submitting
+    again under the same key, or cancelling the key, makes any result still in
+    flight stale: it is dropped instead of being delivered to the UI.
+    """
+    def __init__(self, parent=None, max_threads: int = 4):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self._generations = {}
+        self._callbacks = {}
+        self._signals = _QuerySignals()
+        self._signals.finished.connect(self._deliver)
+        self._signals.failed.connect(self._fail)
+
+    def submit(self, key, fn, *args, on_result=None, on_error=None, **kwargs) -> int:
+        """Queue fn(*args, **kwargs); on_result/on_error are called on the GUI thread"""
+        generation = self._generations.get(key, 0) + 1
+        self._generations[key] = generation
+        self._callbacks[key] = (generation, on_result, on_error)
+        self.pool.start(_QueryTask(key, generation, fn, args, kwargs, self._signals))
+        return generation
+
+    def cancel(self, key):
+        """Discard the result of any call still in flight for key"""
+        if key in self._callbacks:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            del self._callbacks[key]
+
+    def cancel_all(self, keep=()):
+        """Discard every in-flight result except those for the keys in keep"""
+        for key in list(self._callbacks):
+            if key not in keep:
+                self.cancel(key)
+
+    def is_pending(self, key) -> bool:
+        """Check whether a call for key is still waiting for its result"""
+        return key in self._callbacks
+
+    def shutdown(self, timeout_ms: int = 2000):
+        """Drop all pending results and wait briefly for running workers"""
+        self.cancel_all()
+        self.pool.clear()
+        self.pool.waitForDone(timeout_ms)
+
+    def _take_callbacks(self, key, generation: int):
+        entry = self._callbacks.get(key)
+        if entry is None or entry[0] != generation:
+            return None  # Stale result from a superseded or cancelled call
+        del self._callbacks[key]
+        return entry
+
+    def _deliver(self, key, generation: int, result):
+        entry = self._take_callbacks(key, generation)
+        if entry and entry[1]:
+            entry[1](result)
+
+    def _fail(self, key, generation: int, error):
+        entry = self._take_callbacks(key, generation)
+        if entry is None:
+            return
+        if entry[2]:
+            entry[2](error)
+        else:
+            log.error("Background query %r failed: %s", key, error)
+
+
+# ========================
+# Change Notification Listener
+# ========================
+class DatabaseListener(QThread):
+    """Background thread that LISTENs on PostgreSQL channels and re-emits events as Qt signals"""
+    notified = pyqtSignal(str, dict)
+    connection_changed = pyqtSignal(bool)
+
+    def __init__(self, db: Database, channels, parent=None, wait_timeout: float = 1.0, retry_delay: float = 5.0):
+        super().__init__(parent)
+        self.db = db
+        self.channels = list(channels)
+        self.wait_timeout = wait_timeout
+        self.retry_delay = retry_delay
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.is_set():
+            conn = None
+            try:
+                conn = self.db.open_listen_connection()
+                cur = conn.cursor()
+                for channel in self.channels:
+                    cur.execute(sql.SQL("LISTEN {}").format(sql.Identifier(channel)))
+                self.connection_changed.emit(True)
+                self._listen(conn)
+            except psycopg2.Error as e:
+                log.warning("Change listener disconnected: %s", e)
+            finally:
+                if conn is not None:
+                    conn.close()
+            if not self._stopped.is_set():
+                self.connection_changed.emit(False)
+                self._stopped.wait(self.retry_delay)
+
+    def _listen(self, conn):
+        """Wait on the connection socket and emit every notification received"""
+        while not self._stopped.is_set():
+            readable, _, _ = select.select([conn], [], [], self.wait_timeout)
+            if not readable:
+                continue
+            conn.poll()
+            while conn.notifies:
+                notify = conn.notifies.pop(0)
+                try:
+                    payload = json.loads(notify.payload) if notify.payload else {}
+                except ValueError:
+                    payload = {}
+                self.notified.emit(notify.channel, payload)
+
+    def stop(self):
+        """Stop listening and wait for the thread to finish"""
+        self._stopped.set()
+        self.wait(int((self.wait_timeout + 1) * 1000))
 
 
 # ========================
 # Main Application with Sidebar
 # ========================
 class MainApp(QWidget):
-    def __init__(self, db: Database, user: dict, login_window: QWidget = None):
+    POLL_INTERVAL_MS = 30000           # Polling while push updates are unavailable
+    FALLBACK_POLL_INTERVAL_MS = 300000  # Safety-net polling while LISTEN is connected
+    PUSH_DEBOUNCE_MS = 250
+    PAGE_SIZE = 100
+    DELTA_LIMIT = 1000  # More changes than this and a full reload is cheaper
+    DIAGNOSTICS_INTERVAL_MS = 1000
+    STARTUP_BUDGET_MS = 300  # Login to usable window, independent of database size
+
+    def __init__(self, db: StorageBackend, user: dict, login_window: QWidget = None, started_at: float = None):
         super().__init__()
+        # Startup timing: phases are measured from the login click when known
+        self.startup_started = started_at if started_at is not None else time.perf_counter()
+        self.startup_phases = [("login", (time.perf_counter() - self.startup_started) * 1000)]
+        self._last_startup_mark = time.perf_counter()
+        self.startup_report = {'usable_ms': None, 'phases': {}, 'home_stats_ms': None}
         self.db = db
         self.user = user
         self.login_window = login_window
@@ -834,16 +3719,79 @@ class MainApp(QWidget):
         self.resize(1100, 700)
         
         # Set window icon if logo exists
-        logo_pixmap = create_logo_pixmap()
-        if logo_pixmap:
-            self.setWindowIcon(QIcon(logo_pixmap))
-            
-        # Set up auto-refresh timer for real-time updates
+        logo_icon = assets.icon(LOGO)
+        if logo_icon:
+            self.setWindowIcon(logo_icon)
+
+        # Database calls run on a background pool so slow queries never block the UI
+        self.executor = QueryExecutor(self)
+
+        # Set up auto-refresh timer; polls every 30 seconds until push updates are
+        # connected, then drops to a slow fallback
         self.refresh_timer = QTimer()
         self.refresh_timer.timeout.connect(self.auto_refresh)
-        self.refresh_timer.start(30000)  # Refresh every 30 seconds
+        self.refresh_timer.start(self.POLL_INTERVAL_MS)
+
+        # Push updates: database events mark pages dirty, and a short debounce
+        # coalesces bursts (e.g. an admin clearing a queue) into one refresh
+        self.dirty_keys = set()
+        self.push_refresh_timer = QTimer()
+        self.push_refresh_timer.setSingleShot(True)
+        self.push_refresh_timer.timeout.connect(self.apply_push_refresh)
+
+        # Keyset pagers for the long lists, keyed like the executor keys
+        self.pagers = {}
+        self.pager_controls = {}
+
+        # Delta refresh: loaded tables are kept current by merging only the
+        # submissions whose updated_at moved past the watermark
+        self.watermark = None
+        self.loaded_keys = set()
+
+        # Diagnostics page (admins): refreshed live only while it is visible
+        self.diagnostics_timer = QTimer()
+        self.diagnostics_timer.timeout.connect(self.update_diagnostics)
+
+        # Certificate worker processes and serial blocks are set up by the first issue
+        # and kept until close
+        self.certificate_renderer = None
+        self.serial_allocator = None
             
+        self.mark_startup("init")
         self.setup_ui()
+        self.mark_startup("ui")
+        self.update_inbox_badge()
+        self.refresh_deltas()
+        self.start_listener()
+        self.mark_startup("background")
+        # Runs on the first event-loop turn after show(), once the window has painted
+        QTimer.singleShot(0, self.report_startup)
+
+    def mark_startup(self, phase: str):
+        """Record how long a startup phase took since the previous mark"""
+        now = time.perf_counter()
+        self.startup_phases.append((phase, (now - self._last_startup_mark) * 1000))
+        self._last_startup_mark = now
+
+    def report_startup(self):
+        """Log the login-to-usable-window time and its phases"""
+        self.mark_startup("show")
+        total_ms = (time.perf_counter() - self.startup_started) * 1000
+        self.startup_report.update(usable_ms=total_ms, phases=dict(self.startup_phases))
+        phases = ", ".join(f"{phase} {ms:.0f} ms" for phase, ms in self.startup_phases)
+        level = logging.WARNING if total_ms > self.STARTUP_BUDGET_MS else logging.INFO
+        log.log(level, "Window usable %.0f ms after login (budget %d ms): %s",
+                total_ms, self.STARTUP_BUDGET_MS, phases)
+
+    def is_final_stage_admin(self) -> bool:
+        """True for an admin whose stage fully approves some workflow; they run Process Done"""
+        return self.user["role"] == "admin" and self.db.router.is_final_stage(self.user.get("stage"))
+
+    def process_done_workflows(self):
+        """Workflow ids this admin completes, or None when their stage ends every workflow"""
+        router = self.db.router
+        stage = self.user.get("stage")
+        return None if router.ends_every_workflow(stage) else router.workflows_ending_at(stage)
 
     def setup_ui(self):
         """Setup the main application UI"""
@@ -903,18 +3851,18 @@ class MainApp(QWidget):
             QLineEdit:focus, QTextEdit:focus {
                 border-color: #3b82f6;
             }
-            QTableWidget {
+            QTableView {
                 background-color: #ffffff;
                 color: #1f2937;
                 border: 1px solid #e5e7eb;
                 border-radius: 8px;
                 gridline-color: #e5e7eb;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
                 border-bottom: 1px solid #f3f4f6;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #dbeafe;
                 color: #1e40af;
             }
@@ -944,10 +3892,10 @@ class MainApp(QWidget):
         top_row = QHBoxLayout()
         
         # Logo
-        logo_pixmap = create_logo_pixmap()
+        logo_pixmap = create_logo_pixmap(32)
         if logo_pixmap:
             logo_label = QLabel()
-            logo_label.setPixmap(logo_pixmap.scaled(32, 32, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+            logo_label.setPixmap(logo_pixmap)
             top_row.addWidget(logo_label)
         
         self.app_label = QLabel("NT-Bonafide")
@@ -985,36 +3933,17 @@ class MainApp(QWidget):
 
         # Sidebar buttons
         self.btn_home = QPushButton("Dashboard")
-        self.btn_home.clicked.connect(lambda: self.stack.setCurrentWidget(self.page_home))
+        self.btn_home.clicked.connect(lambda: self.show_page("home"))
         side_layout.addWidget(self.btn_home)
 
-        # Inbox button for users with notification badge
+        # Inbox button for users with notification badge (count is filled in by update_inbox_badge)
         if self.user["role"] == "user":
-            try:
-                unread_count = self.db.get_unread_count(self.user['id'])
-                inbox_text = f"Inbox ({unread_count})" if unread_count > 0 else "Inbox"
-                self.btn_inbox = QPushButton(inbox_text)
-                self.btn_inbox.clicked.connect(self.open_inbox)
-                if unread_count > 0:
-                    self.btn_inbox.setStyleSheet("""
-                        QPushButton {
-                            background-color: #dc2626;
-                            color: #fff;
-                            border-radius: 8px;
-                            font-weight: bold;
-                            border: none;
-                            padding: 12px 16px;
-                        }
-                        QPushButton:hover {
-                            background-color: #b91c1c;
-                        }
-                    """)
-                side_layout.addWidget(self.btn_inbox)
-            except Exception as e:
-                print(f"Error setting up inbox button: {e}")
+            self.btn_inbox = QPushButton("Inbox")
+            self.btn_inbox.clicked.connect(self.open_inbox)
+            side_layout.addWidget(self.btn_inbox)
 
         self.btn_register = QPushButton("Submit Request")
-        self.btn_register.clicked.connect(lambda: self.stack.setCurrentWidget(self.page_register))
+        self.btn_register.clicked.connect(lambda: self.show_page("register"))
         side_layout.addWidget(self.btn_register)
 
         if self.user["role"] == "user":
@@ -1026,8 +3955,8 @@ class MainApp(QWidget):
         self.btn_pending.clicked.connect(self.open_pending)
         side_layout.addWidget(self.btn_pending)
 
-        # Add Process Done button for Stage 4 admin
-        if self.user["role"] == "admin" and self.user.get("stage") == 4:
+        # Add Process Done button for final-stage admins
+        if self.is_final_stage_admin():
             self.btn_process_done = QPushButton("Process Done")
             self.btn_process_done.setStyleSheet("""
                 QPushButton {
@@ -1053,6 +3982,11 @@ class MainApp(QWidget):
         self.btn_rejected.clicked.connect(self.open_rejected)
         side_layout.addWidget(self.btn_rejected)
 
+        if self.user["role"] == "admin":
+            self.btn_diagnostics = QPushButton("Diagnostics")
+            self.btn_diagnostics.clicked.connect(self.open_diagnostics)
+            side_layout.addWidget(self.btn_diagnostics)
+
         side_layout.addStretch(1)
 
         # Add refresh button
@@ -1090,38 +4024,40 @@ class MainApp(QWidget):
         side_layout.addWidget(self.btn_logout)
 
     def setup_pages(self):
-        """Setup all pages"""
-        self.page_home = self.build_home_page()
-        self.page_register = self.build_register_page()
-        self.page_pending = self.build_pending_page()
-        
-        # Add Process Done page for Stage 4 admin
-        if self.user["role"] == "admin" and self.user.get("stage") == 4:
-            self.page_process_done = self.build_process_done_page()
-            
-        self.page_approved = self.build_status_page("Approved")
-        self.page_rejected = self.build_status_page("Rejected")
-        
-        if self.user["role"] == "user":
-            self.page_inbox = self.build_inbox_page()
-            self.page_my_requests = self.build_my_requests_page()
-
-        self.stack.addWidget(self.page_home)
-        self.stack.addWidget(self.page_register)
-        self.stack.addWidget(self.page_pending)
-        
-        if self.user["role"] == "admin" and self.user.get("stage") == 4:
-            self.stack.addWidget(self.page_process_done)
-            
-        self.stack.addWidget(self.page_approved)
-        self.stack.addWidget(self.page_rejected)
-        
+        """Register the pages; each is built the first time it is shown"""
+        self.page_builders = {
+            "home": self.build_home_page,
+            "register": self.build_register_page,
+            "approved": partial(self.build_status_page, "Approved"),
+            "rejected": partial(self.build_status_page, "Rejected"),
+        }
+        if self.user["role"] == "admin":
+            self.page_builders["pending"] = self.build_pending_page
+            self.page_builders["diagnostics"] = self.build_diagnostics_page
+        # Add Process Done page for final-stage admins
+        if self.is_final_stage_admin():
+            self.page_builders["process_done"] = self.build_process_done_page
         if self.user["role"] == "user":
-            self.stack.addWidget(self.page_inbox)
-            self.stack.addWidget(self.page_my_requests)
+            self.page_builders["inbox"] = self.build_inbox_page
+            self.page_builders["my_requests"] = self.build_my_requests_page
 
         # Default page
-        self.stack.setCurrentWidget(self.page_home)
+        self.show_page("home")
+        self.stack.currentChanged.connect(self.on_page_changed)
+
+    def page(self, name: str) -> QWidget:
+        """Get a page (self.page_<name>), building it on first use"""
+        widget = getattr(self, f"page_{name}", None)
+        if widget is None:
+            started = time.perf_counter()
+            widget = self.page_builders[name]()
+            setattr(self, f"page_{name}", widget)
+            self.stack.addWidget(widget)
+            log.debug("Built %s page in %.1f ms", name, (time.perf_counter() - started) * 1000)
+        return widget
+
+    def show_page(self, name: str):
+        self.stack.setCurrentWidget(self.page(name))
 
     def configure_role_access(self):
         """Configure UI based on user role"""
@@ -1131,40 +4067,202 @@ class MainApp(QWidget):
         # Users see Submit Request; Admins don't need it as much
         self.btn_register.setVisible(self.user["role"] == "user")
 
+    # -------- Push updates (LISTEN/NOTIFY) --------
+    def start_listener(self):
+        """Subscribe to the channels relevant to this user's pages"""
+        self.listener = None
+        if not self.db.supports_notifications:
+            # Single-node backends: this client is the only writer, and it
+            # refreshes its own views after every action
+            return
+        channels = [STATUS_CHANNEL]
+        if self.user["role"] == "user":
+            channels.append(user_channel(self.user['id']))
+        elif self.user.get("stage"):
+            channels.append(stage_channel(self.user['stage']))
+
+        self.listener = DatabaseListener(self.db, channels, parent=self)
+        self.listener.notified.connect(self.on_database_event)
+        self.listener.connection_changed.connect(self.on_listener_connection_changed)
+        self.listener.start()
+
+    def on_listener_connection_changed(self, connected: bool):
+        """Fall back to regular polling whenever push updates are unavailable"""
+        interval = self.FALLBACK_POLL_INTERVAL_MS if connected else self.POLL_INTERVAL_MS
+        if self.refresh_timer.interval() != interval:
+            self.refresh_timer.start(interval)
+        if connected:
+            # Catch up on anything missed while disconnected
+            self.auto_refresh()
+
+    def on_database_event(self, channel: str, payload: dict):
+        """Translate a database event into the set of views that need refreshing"""
+        if payload.get("submission_id") is not None:
+            self.db.submission_cache.invalidate(payload["submission_id"])
+        if channel == STATUS_CHANNEL or channel.startswith("nt_stage_"):
+            self.dirty_keys.add("submissions")
+        elif channel.startswith("nt_user_"):
+            self.dirty_keys.update(("badge", "inbox", "submissions"))
+
+        if not self.push_refresh_timer.isActive():
+            self.push_refresh_timer.start(self.PUSH_DEBOUNCE_MS)
+
+    def apply_push_refresh(self):
+        """Merge submission changes and reload the visible inbox if it is dirty"""
+        dirty, self.dirty_keys = self.dirty_keys, set()
+        if "badge" in dirty:
+            self.update_inbox_badge()
+        if "submissions" in dirty:
+            self.refresh_deltas()
+        if "inbox" in dirty and self.stack.currentWidget() == getattr(self, 'page_inbox', None):
+            self.reload_inbox(silent=True)
+        if dirty and self.stack.currentWidget() == getattr(self, 'page_home', None):
+            self.load_home_stats(silent=True)
+
+    # -------- Delta refresh --------
+    def refresh_deltas(self):
+        """Fetch the submissions changed since the watermark in the background"""
+        # A newer request supersedes one in flight; the watermark only moves
+        # when a result is applied, so the superseded changes are re-read
+        self.executor.submit(
+            "delta", self.db.get_submission_changes, self.watermark, limit=self.DELTA_LIMIT,
+            on_result=self.apply_deltas,
+            on_error=partial(self.report_error, "Failed to refresh changes", silent=True),
+        )
+
+    def apply_deltas(self, result):
+        """Merge changed submissions into every loaded table in place"""
+        changes, watermark = result
+        first = self.watermark is None
+        self.watermark = watermark
+        if changes is None:
+            # Too much changed (e.g. after a long disconnect): reload instead
+            self.db.submission_cache.clear()
+            self.refresh_current_page(silent=True)
+            return
+        if first or not changes:
+            return
+        # Bulk transitions announce one id per channel; the delta names them all
+        self.db.submission_cache.invalidate(*(change[0] for change in changes))
+        for key, table, project, newest_loaded, oldest_loaded in self.delta_targets():
+            if key in self.loaded_keys:
+                table.model().merge_rows(
+                    [(change[0], project(change)) for change in changes],
+                    newest_loaded=newest_loaded, oldest_loaded=oldest_loaded,
+                )
+
+    def delta_targets(self):
+        """(key, table, project, newest_loaded, oldest_loaded) for every delta-refreshed table.
+
+        project maps a get_submission_changes row (id, user_id, name, reg_number,
+        reason, status, approval_stage, process_completed, created_at, updated_at,
+        workflow_id, ready_stages)
+        to the table's row, or None when the submission does not belong in it.
+        """
+        targets = []
+
+        def paged(key):
+            pager = self.pagers[key]
+            return pager.page_number == 1, not pager.has_more
+
+        if hasattr(self, 'tbl_my_requests'):
+            user_id = self.user['id']
+            targets.append(("my_requests", self.tbl_my_requests,
+                            lambda c: (c[0], c[2], c[3], c[4], c[5], c[6], c[8], c[9]) if c[1] == user_id else None)
+                           + paged("my_requests"))
+        if hasattr(self, 'tbl_pending'):
+            stage = self.user.get("stage")
+            targets.append(("pending", self.tbl_pending,
+                            lambda c: (c[0], c[2], c[3], c[4], stage, c[8])
+                            if c[5] == "Pending" and str(stage) in (c[11] or "").split(",") else None)
+                           + paged("pending"))
+        if hasattr(self, 'tbl_process_done'):
+            workflows = self.process_done_workflows()
+            targets.append(("process_done", self.tbl_process_done,
+                            lambda c: (c[0], c[2], c[3], c[4], c[6], c[8])
+                            if c[5] == "Approved" and not c[7] and (workflows is None or c[10] in workflows) else None)
+                           + paged("process_done"))
+        for status, table in self.status_tables():
+            # Streams load newest first, so only the bottom of the window can be open
+            targets.append((f"status:{status}", table,
+                            lambda c, status=status: (c[0], c[2], c[3], c[4][:200], c[6], c[8])
+                            if c[5] == status else None,
+                            True, table.model().complete))
+        return targets
+
+    def status_tables(self):
+        """(status, table) for the Approved/Rejected pages built so far"""
+        return [(status, getattr(self, f"tbl_{status.lower()}")) for status in ("Approved", "Rejected")
+                if hasattr(self, f"tbl_{status.lower()}")]
+
     # -------- Auto-refresh functionality --------
     def auto_refresh(self):
-        """Auto-refresh data every 30 seconds"""
+        """Fallback poll: refresh the badge, merge submission changes and reload the visible inbox"""
         try:
             # Update inbox badge for users
             if self.user["role"] == "user":
                 self.update_inbox_badge()
-            
-            # Refresh current page data
-            current_widget = self.stack.currentWidget()
-            if current_widget == getattr(self, 'page_inbox', None):
-                self.reload_inbox()
-            elif current_widget == getattr(self, 'page_my_requests', None):
-                self.reload_my_requests()
-            elif current_widget == self.page_pending:
-                self.reload_pending()
-            elif current_widget == getattr(self, 'page_process_done', None):
-                self.reload_process_done()
-            elif current_widget == self.page_approved:
-                self.reload_status_table("Approved", self.tbl_approved)
-            elif current_widget == self.page_rejected:
-                self.reload_status_table("Rejected", self.tbl_rejected)
-        except Exception as e:
-            # Silently handle refresh errors to avoid disrupting user experience
-            print(f"Auto-refresh error: {e}")
+
+            # Errors are logged rather than shown
+            self.refresh_deltas()
+            if self.stack.currentWidget() == getattr(self, 'page_inbox', None):
+                self.reload_inbox(silent=True)
+            elif self.stack.currentWidget() == getattr(self, 'page_home', None):
+                self.load_home_stats(silent=True)
+        except Exception:
+            # Logged rather than shown, to avoid disrupting the user
+            log.exception("Auto-refresh failed")
+
+    def refresh_current_page(self, silent: bool = False):
+        """Reload the data behind the page that is currently visible"""
+        current_widget = self.stack.currentWidget()
+        if current_widget == self.page_home:
+            self.load_home_stats(silent)
+        elif current_widget == getattr(self, 'page_inbox', None):
+            self.reload_inbox(silent)
+        elif current_widget == getattr(self, 'page_my_requests', None):
+            self.reload_my_requests(silent)
+        elif current_widget == getattr(self, 'page_pending', None):
+            self.reload_pending(silent)
+        elif current_widget == getattr(self, 'page_process_done', None):
+            self.reload_process_done(silent)
+        elif current_widget == getattr(self, 'page_approved', None):
+            self.reload_status_table("Approved", self.tbl_approved, silent)
+        elif current_widget == getattr(self, 'page_rejected', None):
+            self.reload_status_table("Rejected", self.tbl_rejected, silent)
+        elif current_widget == getattr(self, 'page_diagnostics', None):
+            self.update_diagnostics()
 
     def manual_refresh(self):
         """Manual refresh triggered by user"""
-        try:
-            self.auto_refresh()
-            # Show a brief success message
-            QMessageBox.information(self, "Refresh", "Data refreshed successfully!")
-        except Exception as e:
-            QMessageBox.critical(self, "Refresh Error", f"Failed to refresh data: {str(e)}")
+        if self.user["role"] == "user":
+            self.update_inbox_badge()
+        self.refresh_current_page()
+
+    def on_page_changed(self, index: int):
+        """Discard in-flight loads for pages the user has navigated away from"""
+        current_widget = self.stack.widget(index)
+        for key, page in (("inbox", getattr(self, 'page_inbox', None)),
+                          ("my_requests", getattr(self, 'page_my_requests', None)),
+                          ("pending", getattr(self, 'page_pending', None)),
+                          ("process_done", getattr(self, 'page_process_done', None)),
+                          ("status:Approved", getattr(self, 'page_approved', None)),
+                          ("status:Rejected", getattr(self, 'page_rejected', None))):
+            if page is not current_widget:
+                self.executor.cancel(key)
+        # Hidden status pages give their streaming cursor's connection back to the pool
+        for status, table in self.status_tables():
+            if getattr(self, f"page_{status.lower()}") is not current_widget:
+                table.model().close()
+        if current_widget is not getattr(self, 'page_diagnostics', None):
+            self.diagnostics_timer.stop()
+
+    def report_error(self, message: str, error, silent: bool = False):
+        """Show a background query failure, or just log it for silent refreshes"""
+        if silent:
+            log.warning("%s: %s", message, error)
+        else:
+            QMessageBox.critical(self, "Error", f"{message}: {str(error)}")
 
     # -------- Sidebar toggle --------
     def toggle_sidebar(self):
@@ -1195,10 +4293,10 @@ class MainApp(QWidget):
         header_layout = QHBoxLayout()
         
         # Logo
-        logo_pixmap = create_logo_pixmap()
+        logo_pixmap = create_logo_pixmap(48)
         if logo_pixmap:
             logo_label = QLabel()
-            logo_label.setPixmap(logo_pixmap.scaled(48, 48, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+            logo_label.setPixmap(logo_pixmap)
             header_layout.addWidget(logo_label)
         
         title_layout = QVBoxLayout()
@@ -1212,7 +4310,7 @@ class MainApp(QWidget):
         title_layout.addWidget(sub)
         
         # Connection status
-        conn_status = QLabel("🟢 Connected to PostgreSQL Database")
+        conn_status = QLabel(f"🟢 Connected to {self.db.NAME} database")
         conn_status.setStyleSheet("font-size: 14px; color: #10b981; font-weight: bold;")
         title_layout.addWidget(conn_status)
         
@@ -1231,23 +4329,26 @@ class MainApp(QWidget):
         instructions_title.setStyleSheet("font-size: 18px; font-weight: bold; color: #0c4a6e; margin-bottom: 12px;")
         instructions_layout.addWidget(instructions_title)
 
+        router = self.db.router
+        default_workflow = router.workflows[router.default_workflow_id]
         if self.user["role"] == "user":
             instructions = QLabel(
                 "• Submit requests from any device - they'll be stored in the central database\n"
                 "• Check your 'Inbox' for real-time notifications about your requests\n"
                 "• View 'My Requests' to track all your submissions across devices\n"
                 "• Admins on other devices can approve your requests instantly\n"
-                "• All requests go through a 4-stage approval process\n"
-                "• Data automatically refreshes every 30 seconds"
+                f"• {default_workflow['name']} requests go through a "
+                f"{len(default_workflow['stages'])}-stage approval process\n"
+                "• Status changes appear automatically as soon as admins act"
             )
-        elif self.user["role"] == "admin" and self.user.get("stage") == 4:
+        elif self.is_final_stage_admin():
             instructions = QLabel(
                 f"• Review pending requests for Stage {self.user['stage']} from any device\n"
-                "• Approve requests to complete the 4-stage process\n"
+                "• Approve requests to complete their approval process\n"
                 "• Use 'Process Done' to notify users their certificates are ready\n"
                 "• All actions are immediately visible to other admins and users\n"
                 "• Data syncs in real-time across all connected devices\n"
-                "• Manual refresh available, auto-refresh runs every 30 seconds"
+                "• New approvals appear automatically; manual refresh is always available"
             )
         else:
             instructions = QLabel(
@@ -1255,7 +4356,7 @@ class MainApp(QWidget):
                 "• Approve requests to move them to the next stage\n"
                 "• All approvals are instantly visible to other stage admins\n"
                 "• Users receive real-time notifications about status changes\n"
-                "• Stage 4 approval completes the process\n"
+                f"• Stage {default_workflow['final_stage']} approval completes the process\n"
                 "• Data syncs in real-time across all connected devices"
             )
         
@@ -1275,29 +4376,10 @@ class MainApp(QWidget):
             stats_title.setStyleSheet("font-size: 18px; font-weight: bold; color: #1f2937; margin-bottom: 12px;")
             stats_layout.addWidget(stats_title)
 
-            try:
-                # Get counts based on admin stage
-                if self.user.get("stage") == 4:
-                    # For stage 4 admin, show approved requests awaiting process completion
-                    pending_count = len(self.db.get_pending_for_stage(self.user['stage']))
-                    process_ready_count = len(self.db.get_approved_for_stage4_admin())
-                    approved_count = len(self.db.get_by_status("Approved"))
-                    rejected_count = len(self.db.get_by_status("Rejected"))
-                    
-                    stats_text = QLabel(f"Pending for your stage: {pending_count} | Ready for Process Done: {process_ready_count} | Total Approved: {approved_count} | Total Rejected: {rejected_count}")
-                else:
-                    pending_count = len(self.db.get_pending_for_stage(self.user['stage']))
-                    approved_count = len(self.db.get_by_status("Approved"))
-                    rejected_count = len(self.db.get_by_status("Rejected"))
-                    
-                    stats_text = QLabel(f"Pending for your stage: {pending_count} | Total Approved: {approved_count} | Total Rejected: {rejected_count}")
-                
-                stats_text.setStyleSheet("font-size: 14px; color: #6b7280;")
-                stats_layout.addWidget(stats_text)
-            except Exception as e:
-                error_text = QLabel(f"Error loading stats: {str(e)}")
-                error_text.setStyleSheet("font-size: 14px; color: #dc2626;")
-                stats_layout.addWidget(error_text)
+            # Placeholder until load_home_stats() fills it in
+            self.lbl_home_stats = QLabel("Loading stats…")
+            self.lbl_home_stats.setStyleSheet("font-size: 14px; color: #9ca3af;")
+            stats_layout.addWidget(self.lbl_home_stats)
 
             layout.addWidget(stats_frame)
         
@@ -1311,30 +4393,22 @@ class MainApp(QWidget):
             stats_title.setStyleSheet("font-size: 18px; font-weight: bold; color: #1f2937; margin-bottom: 12px;")
             stats_layout.addWidget(stats_title)
 
-            try:
-                # Get user's submission counts
-                user_submissions = self.db.get_user_submissions(self.user['id'])
-                pending_count = len([s for s in user_submissions if s[4] == 'Pending'])
-                approved_count = len([s for s in user_submissions if s[4] == 'Approved'])
-                rejected_count = len([s for s in user_submissions if s[4] == 'Rejected'])
-                unread_notifications = self.db.get_unread_count(self.user['id'])
-
-                stats_text = QLabel(f"Your Requests - Pending: {pending_count} | Approved: {approved_count} | Rejected: {rejected_count}")
-                stats_text.setStyleSheet("font-size: 14px; color: #6b7280; margin-bottom: 8px;")
-                stats_layout.addWidget(stats_text)
-                
-                if unread_notifications > 0:
-                    notif_text = QLabel(f"You have {unread_notifications} unread notifications")
-                    notif_text.setStyleSheet("font-size: 14px; color: #dc2626; font-weight: bold;")
-                    stats_layout.addWidget(notif_text)
-            except Exception as e:
-                error_text = QLabel(f"Error loading your activity: {str(e)}")
-                error_text.setStyleSheet("font-size: 14px; color: #dc2626;")
-                stats_layout.addWidget(error_text)
+            # Placeholders until load_home_stats() fills them in
+            self.lbl_home_stats = QLabel("Loading your activity…")
+            self.lbl_home_stats.setStyleSheet("font-size: 14px; color: #9ca3af; margin-bottom: 8px;")
+            stats_layout.addWidget(self.lbl_home_stats)
+
+            self.lbl_home_unread = QLabel()
+            self.lbl_home_unread.setStyleSheet("font-size: 14px; color: #dc2626; font-weight: bold;")
+            self.lbl_home_unread.setVisible(False)
+            stats_layout.addWidget(self.lbl_home_unread)
 
             layout.addWidget(stats_frame)
 
         layout.addItem(QSpacerItem(0, 0, QSizePolicy.Minimum, QSizePolicy.Expanding))
+
+        # The page is shown at once; the counters arrive from the background
+        self.load_home_stats()
         return page
 
     def build_register_page(self):
@@ -1374,6 +4448,19 @@ class MainApp(QWidget):
         form_layout = QVBoxLayout(form_frame)
         form_layout.setSpacing(20)
 
+        # Certificate type, when more than one workflow is defined
+        workflows = self.db.router.workflows
+        if len(workflows) > 1:
+            type_label = QLabel("Certificate Type:")
+            type_label.setStyleSheet("font-weight: bold; color: #374151; margin-bottom: 4px;")
+            form_layout.addWidget(type_label)
+
+            self.in_workflow = QComboBox()
+            for workflow in workflows.values():
+                self.in_workflow.addItem(workflow['name'], workflow['id'])
+            self.in_workflow.setCurrentIndex(self.in_workflow.findData(self.db.router.default_workflow_id))
+            form_layout.addWidget(self.in_workflow)
+
         # Name field
         name_label = QLabel("Full Name:")
         name_label.setStyleSheet("font-weight: bold; color: #374151; margin-bottom: 4px;")
@@ -1477,13 +4564,26 @@ class MainApp(QWidget):
                 background-color: #2563eb;
             }
         """)
-        refresh_btn.clicked.connect(self.reload_inbox)
+        refresh_btn.clicked.connect(lambda: self.reload_inbox())
         title_row.addWidget(refresh_btn)
         layout.addLayout(title_row)
 
         # Notifications table
-        self.tbl_inbox = QTableWidget()
-        self.tbl_inbox.setMinimumHeight(400)
+        self.tbl_inbox = create_table_view([
+            TableColumn("Submission ID", lambda r: str(r[1])),
+            TableColumn("Message", lambda r: r[2][:80] + "..." if len(r[2]) > 80 else r[2],
+                        color=lambda r: None if r[3] else "#1f2937", bold=lambda r: not r[3]),
+            TableColumn("Approval Status", lambda r: r[5],
+                        color=lambda r: STATUS_COLORS.get(r[5]), bold=lambda r: r[5] in STATUS_COLORS),
+            TableColumn("Current Stage", lambda r: stage_text(r[5], r[6])),
+            TableColumn("Read Status", lambda r: "Read" if r[3] else "New",
+                        color=lambda r: "#6b7280" if r[3] else "#dc2626", bold=lambda r: not r[3]),
+            TableColumn("Date", lambda r: format_timestamp(r[4])),
+            TableColumn("Mark Read", lambda r: "Read" if r[3] else "", color=lambda r: "#6b7280"),
+        ])
+        mark_read_btn = ActionButtonDelegate("Mark Read", "#10b981", "#059669", enabled=lambda r: not r[3])
+        mark_read_btn.clicked.connect(lambda row: self.mark_read(self.tbl_inbox.model().row_at(row)[0]))
+        add_action_column(self.tbl_inbox, 6, mark_read_btn)
         layout.addWidget(self.tbl_inbox)
 
         return page
@@ -1517,7 +4617,7 @@ class MainApp(QWidget):
                 background-color: #2563eb;
             }
         """)
-        refresh_btn.clicked.connect(self.reload_my_requests)
+        refresh_btn.clicked.connect(lambda: self.reload_my_requests())
         title_row.addWidget(refresh_btn)
         layout.addLayout(title_row)
 
@@ -1527,9 +4627,18 @@ class MainApp(QWidget):
         layout.addWidget(info_text)
 
         # My requests table
-        self.tbl_my_requests = QTableWidget()
-        self.tbl_my_requests.setMinimumHeight(400)
+        self.tbl_my_requests = create_table_view([
+            TableColumn("ID", lambda r: str(r[0])),
+            TableColumn("Name", lambda r: r[1]),
+            TableColumn("Reg No", lambda r: r[2]),
+            TableColumn("Status", lambda r: r[4],
+                        color=lambda r: STATUS_COLORS.get(r[4]), bold=lambda r: r[4] in STATUS_COLORS),
+            TableColumn("Stage", lambda r: stage_text(r[4], r[5])),
+            TableColumn("Created", lambda r: format_timestamp(r[6])),
+            TableColumn("Last Updated", lambda r: format_timestamp(r[7])),
+        ])
         layout.addWidget(self.tbl_my_requests)
+        layout.addLayout(self.build_pager_bar("my_requests"))
 
         return page
 
@@ -1562,10 +4671,47 @@ class MainApp(QWidget):
                 background-color: #2563eb;
             }
         """)
-        refresh_btn.clicked.connect(self.reload_pending)
+        refresh_btn.clicked.connect(lambda: self.reload_pending())
         title_row.addWidget(refresh_btn)
         layout.addLayout(title_row)
 
+        # Bulk actions on the selected rows
+        bulk_row = QHBoxLayout()
+        approve_selected_btn = QPushButton("✅ Approve Selected")
+        approve_selected_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #10b981;
+                color: #fff;
+                padding: 10px 20px;
+                border-radius: 6px;
+                font-weight: bold;
+                border: none;
+            }
+            QPushButton:hover {
+                background-color: #059669;
+            }
+        """)
+        approve_selected_btn.clicked.connect(self.approve_selected)
+        reject_selected_btn = QPushButton("❌ Reject Selected")
+        reject_selected_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #dc2626;
+                color: #fff;
+                padding: 10px 20px;
+                border-radius: 6px;
+                font-weight: bold;
+                border: none;
+            }
+            QPushButton:hover {
+                background-color: #b91c1c;
+            }
+        """)
+        reject_selected_btn.clicked.connect(self.reject_selected)
+        bulk_row.addWidget(approve_selected_btn)
+        bulk_row.addWidget(reject_selected_btn)
+        bulk_row.addStretch()
+        layout.addLayout(bulk_row)
+
         # Multi-user info
         info_text = QLabel("📡 New requests appear instantly from all user devices. Your approvals are immediately visible to other admins and users.")
         info_text.setStyleSheet("font-size: 12px; color: #7c3aed; font-weight: bold; margin-bottom: 10px;")
@@ -1573,14 +4719,23 @@ class MainApp(QWidget):
         layout.addWidget(info_text)
 
         # Table
-        self.tbl_pending = QTableWidget()
-        self.tbl_pending.setMinimumHeight(400)
+        self.tbl_pending = create_table_view(
+            submission_columns() + [TableColumn("Approve", lambda r: ""), TableColumn("Reject", lambda r: "")],
+            multi_select=True,
+        )
+        approve_btn = ActionButtonDelegate("✅ Approve", "#10b981", "#059669")
+        approve_btn.clicked.connect(lambda row: self.approve_submission(self.tbl_pending.model().row_at(row)[0]))
+        add_action_column(self.tbl_pending, 6, approve_btn)
+        reject_btn = ActionButtonDelegate("❌ Reject", "#dc2626", "#b91c1c")
+        reject_btn.clicked.connect(lambda row: self.reject_submission(*self.tbl_pending.model().row_at(row)[:2]))
+        add_action_column(self.tbl_pending, 7, reject_btn)
         layout.addWidget(self.tbl_pending)
+        layout.addLayout(self.build_pager_bar("pending"))
 
         return page
 
     def build_process_done_page(self):
-        """Build the process done page for Stage 4 admin"""
+        """Build the process done page for final-stage admins"""
         page = QFrame()
         page.setObjectName("page")
         layout = QVBoxLayout(page)
@@ -1608,20 +4763,81 @@ class MainApp(QWidget):
                 background-color: #2563eb;
             }
         """)
-        refresh_btn.clicked.connect(self.reload_process_done)
+        refresh_btn.clicked.connect(lambda: self.reload_process_done())
         title_row.addWidget(refresh_btn)
         layout.addLayout(title_row)
 
-        # Info text
+        # Bulk completion of the selected rows
+        bulk_row = QHBoxLayout()
+        done_selected_btn = QPushButton("🎉 Process Done for Selected")
+        done_selected_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #7c3aed;
+                color: #fff;
+                padding: 10px 20px;
+                border-radius: 6px;
+                font-weight: bold;
+                border: none;
+            }
+            QPushButton:hover {
+                background-color: #6d28d9;
+            }
+        """)
+        done_selected_btn.clicked.connect(self.mark_selected_process_done)
+        bulk_row.addWidget(done_selected_btn)
+
+        certificates_btn = QPushButton("📄 Generate Certificates for Selected")
+        certificates_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #059669;
+                color: #fff;
+                padding: 10px 20px;
+                border-radius: 6px;
+                font-weight: bold;
+                border: none;
+            }
+            QPushButton:hover {
+                background-color: #047857;
+            }
+        """)
+        certificates_btn.clicked.connect(self.generate_selected_certificates)
+        bulk_row.addWidget(certificates_btn)
+
+        preview_btn = QPushButton("👁 Preview Certificate")
+        preview_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #6b7280;
+                color: #fff;
+                padding: 10px 20px;
+                border-radius: 6px;
+                font-weight: bold;
+                border: none;
+            }
+            QPushButton:hover {
+                background-color: #4b5563;
+            }
+        """)
+        preview_btn.clicked.connect(lambda: self.open_selected_certificate(self.tbl_process_done))
+        bulk_row.addWidget(preview_btn)
+        bulk_row.addStretch()
+        layout.addLayout(bulk_row)
+
+        # Info text
         info_text = QLabel("📡 These approved requests are ready for final process completion. Students will receive instant notifications across all their devices when you mark them as done.")
         info_text.setStyleSheet("font-size: 14px; color: #6b7280; background-color: #fef3c7; padding: 16px; border-radius: 8px; border-left: 4px solid #f59e0b;")
         info_text.setWordWrap(True)
         layout.addWidget(info_text)
 
         # Table
-        self.tbl_process_done = QTableWidget()
-        self.tbl_process_done.setMinimumHeight(400)
+        self.tbl_process_done = create_table_view(
+            submission_columns("Final Stage", "Approved At") + [TableColumn("Process Done", lambda r: "")],
+            multi_select=True,
+        )
+        process_done_btn = ActionButtonDelegate("🎉 Process Done", "#7c3aed", "#6d28d9")
+        process_done_btn.clicked.connect(lambda row: self.mark_process_done(*self.tbl_process_done.model().row_at(row)[:3]))
+        add_action_column(self.tbl_process_done, 6, process_done_btn)
         layout.addWidget(self.tbl_process_done)
+        layout.addLayout(self.build_pager_bar("process_done"))
 
         return page
 
@@ -1662,12 +4878,31 @@ class MainApp(QWidget):
         info_text.setStyleSheet("font-size: 12px; color: #10b981; font-weight: bold; margin-bottom: 10px;")
         layout.addWidget(info_text)
 
-        # Table
-        table = QTableWidget()
-        table.setMinimumHeight(400)
+        # Table: streams from a server-side cursor as the user scrolls
+        columns = submission_columns("Final Stage")
+        table = create_table_view(columns, model=StreamingRowTableModel(columns, self.executor, f"status:{status}"))
+        table.model().first_batch_loaded.connect(table.resizeColumnsToContents)
         refresh_btn.clicked.connect(lambda _=None, s=status, t=table: self.reload_status_table(s, t))
         layout.addWidget(table)
 
+        if status == "Approved" and self.is_final_stage_admin():
+            reprint_btn = QPushButton("🖨 Reprint Certificate")
+            reprint_btn.setStyleSheet("""
+                QPushButton {
+                    background-color: #059669;
+                    color: #fff;
+                    padding: 10px 20px;
+                    border-radius: 6px;
+                    font-weight: bold;
+                    border: none;
+                }
+                QPushButton:hover {
+                    background-color: #047857;
+                }
+            """)
+            reprint_btn.clicked.connect(lambda: self.open_selected_certificate(table))
+            title_row.insertWidget(title_row.count() - 1, reprint_btn)
+
         # Store table references
         if status == "Approved":
             self.tbl_approved = table
@@ -1676,6 +4911,147 @@ class MainApp(QWidget):
 
         return page
 
+    def build_diagnostics_page(self):
+        """Build the query diagnostics page for admins"""
+        page = QFrame()
+        page.setObjectName("page")
+        layout = QVBoxLayout(page)
+        layout.setContentsMargins(32, 32, 32, 32)
+        layout.setSpacing(24)
+
+        # Title
+        title_row = QHBoxLayout()
+        title = QLabel("Query Diagnostics")
+        title.setStyleSheet("font-size: 22px; font-weight: bold; color: #1f2937;")
+        title_row.addWidget(title)
+        title_row.addStretch()
+
+        threshold_label = QLabel("Slow query threshold (ms)")
+        threshold_label.setStyleSheet("font-size: 13px; color: #6b7280;")
+        title_row.addWidget(threshold_label)
+        self.slow_query_input = QSpinBox()
+        self.slow_query_input.setRange(1, 60000)
+        self.slow_query_input.setValue(int(self.db.metrics.slow_query_ms))
+        self.slow_query_input.valueChanged.connect(self.set_slow_query_threshold)
+        title_row.addWidget(self.slow_query_input)
+
+        reset_btn = QPushButton("Reset")
+        reset_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #3b82f6;
+                color: #fff;
+                padding: 10px 20px;
+                border-radius: 6px;
+                font-weight: bold;
+                border: none;
+            }
+            QPushButton:hover {
+                background-color: #2563eb;
+            }
+        """)
+        reset_btn.clicked.connect(self.reset_diagnostics)
+        title_row.addWidget(reset_btn)
+        layout.addLayout(title_row)
+
+        # Connection, cache and slow-query summary
+        self.lbl_diagnostics = QLabel()
+        self.lbl_diagnostics.setWordWrap(True)
+        self.lbl_diagnostics.setStyleSheet("font-size: 12px; color: #4b5563;")
+        layout.addWidget(self.lbl_diagnostics)
+
+        # Per-method latency table; rows are QueryMetrics.snapshot() entries
+        slow = lambda r: "#dc2626" if r['max_ms'] >= self.db.metrics.slow_query_ms else None
+        self.tbl_diagnostics = create_table_view([
+            TableColumn("Method", lambda r: r['method'], bold=lambda r: True),
+            TableColumn("Calls", lambda r: str(r['calls'])),
+            TableColumn("Errors", lambda r: str(r['errors']), color=lambda r: "#dc2626" if r['errors'] else None),
+            TableColumn("Rows", lambda r: str(r['rows'])),
+            TableColumn("Mean ms", lambda r: f"{r['mean_ms']:.1f}"),
+            TableColumn("p50 ms", lambda r: f"≤{r['p50_ms']:.1f}"),
+            TableColumn("p95 ms", lambda r: f"≤{r['p95_ms']:.1f}"),
+            TableColumn("p99 ms", lambda r: f"≤{r['p99_ms']:.1f}"),
+            TableColumn("Max ms", lambda r: f"{r['max_ms']:.1f}", color=slow),
+            TableColumn("Total ms", lambda r: f"{r['total_ms']:.0f}"),
+        ])
+        layout.addWidget(self.tbl_diagnostics)
+
+        return page
+
+    def build_pager_bar(self, key: str):
+        """Build the Newer/Older navigation row under a paged table"""
+        self.pagers[key] = KeysetPager(self.PAGE_SIZE)
+
+        row = QHBoxLayout()
+        row.addStretch()
+        nav_style = """
+            QPushButton {
+                background-color: #e5e7eb;
+                color: #1f2937;
+                padding: 8px 16px;
+                border-radius: 6px;
+                border: none;
+            }
+            QPushButton:hover {
+                background-color: #d1d5db;
+            }
+            QPushButton:disabled {
+                color: #9ca3af;
+            }
+        """
+        newer_btn = QPushButton("◀ Newer")
+        newer_btn.setStyleSheet(nav_style)
+        newer_btn.setEnabled(False)
+        newer_btn.clicked.connect(lambda: self.change_page(key, older=False))
+
+        page_label = QLabel("Page 1")
+        page_label.setStyleSheet("font-size: 13px; color: #6b7280; margin: 0 12px;")
+
+        older_btn = QPushButton("Older ▶")
+        older_btn.setStyleSheet(nav_style)
+        older_btn.setEnabled(False)
+        older_btn.clicked.connect(lambda: self.change_page(key, older=True))
+
+        row.addWidget(newer_btn)
+        row.addWidget(page_label)
+        row.addWidget(older_btn)
+        self.pager_controls[key] = (newer_btn, page_label, older_btn)
+        return row
+
+    def change_page(self, key: str, older: bool):
+        """Move a paged table one page older or newer and reload it"""
+        pager = self.pagers[key]
+        moved = pager.older() if older else pager.newer()
+        if moved:
+            self.reload_by_key(key)
+
+    def accept_page(self, key: str, rows):
+        """Trim a fetched page and update its navigation controls"""
+        pager = self.pagers[key]
+        rows = pager.accept(rows)
+        if not rows and pager.newer():
+            # The page emptied under us (e.g. its rows were all approved); step back
+            self.reload_by_key(key, silent=True)
+        newer_btn, page_label, older_btn = self.pager_controls[key]
+        newer_btn.setEnabled(pager.page_number > 1)
+        older_btn.setEnabled(pager.has_more)
+        page_label.setText(f"Page {pager.page_number}")
+        return rows
+
+    def reload_by_key(self, key: str, silent: bool = False):
+        """Reload the view identified by an executor key"""
+        if key == "inbox":
+            self.reload_inbox(silent)
+        elif key == "my_requests":
+            self.reload_my_requests(silent)
+        elif key == "pending":
+            self.reload_pending(silent)
+        elif key == "process_done":
+            self.reload_process_done(silent)
+        elif key == "status:Approved":
+            self.reload_status_table("Approved", self.tbl_approved, silent)
+        elif key == "status:Rejected":
+            self.reload_status_table("Rejected", self.tbl_rejected, silent)
+
     # -------- Page actions --------
     def clear_form(self):
         """Clear the registration form"""
@@ -1703,28 +5079,35 @@ class MainApp(QWidget):
         if len(reason) < 10:
             QMessageBox.warning(self, "Error", "Please provide a more detailed reason (at least 10 characters).")
             return
-            
-        try:
-            submission_id = self.db.add_submission(self.user['id'], name, reg, reason)
-            QMessageBox.information(self, "Success", f"Request #{submission_id} submitted successfully!\n\nIt has been stored in the central database and will start at Stage 1 approval.\nAdmins from any device can now approve it in real-time!")
-            self.clear_form()
-            # Update inbox notification count
-            self.update_inbox_badge()
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to submit request: {str(e)}")
+
+        workflow_id = self.in_workflow.currentData() if hasattr(self, "in_workflow") else None
+        self.executor.submit(
+            "submit", self.db.add_submission, self.user['id'], name, reg, reason, workflow_id,
+            on_result=partial(self.on_request_submitted, self.db.router.first_stage(workflow_id)),
+            on_error=partial(self.report_error, "Failed to submit request"),
+        )
+
+    def on_request_submitted(self, first_stage: int, submission_id: int):
+        """Confirm a successful submission"""
+        QMessageBox.information(self, "Success", f"Request #{submission_id} submitted successfully!\n\nIt has been stored in the central database and will start at Stage {first_stage} approval.\nAdmins from any device can now approve it in real-time!")
+        self.clear_form()
+        # Update inbox notification count
+        self.update_inbox_badge()
+        self.refresh_deltas()
 
     def open_inbox(self):
         """Open inbox page"""
         if self.user["role"] != "user":
             return
-        self.stack.setCurrentWidget(self.page_inbox)
+        self.show_page("inbox")
         self.reload_inbox()
 
     def open_my_requests(self):
         """Open my requests page"""
         if self.user["role"] != "user":
             return
-        self.stack.setCurrentWidget(self.page_my_requests)
+        self.show_page("my_requests")
+        self.pagers["my_requests"].reset()
         self.reload_my_requests()
 
     def open_pending(self):
@@ -1732,192 +5115,113 @@ class MainApp(QWidget):
         if self.user["role"] != "admin":
             QMessageBox.information(self, "Info", "Only administrators can view pending approvals.")
             return
-        self.stack.setCurrentWidget(self.page_pending)
+        self.show_page("pending")
+        self.pagers["pending"].reset()
         self.reload_pending()
 
     def open_process_done(self):
-        """Open process done page (Stage 4 admin only)"""
-        if self.user["role"] != "admin" or self.user.get("stage") != 4:
-            QMessageBox.information(self, "Info", "Only Stage 4 administrators can access Process Done.")
+        """Open process done page (final-stage admins only)"""
+        if not self.is_final_stage_admin():
+            QMessageBox.information(self, "Info", "Only final-stage administrators can access Process Done.")
             return
-        self.stack.setCurrentWidget(self.page_process_done)
+        self.show_page("process_done")
+        self.pagers["process_done"].reset()
         self.reload_process_done()
 
     def open_approved(self):
         """Open approved requests page"""
-        self.stack.setCurrentWidget(self.page_approved)
+        self.show_page("approved")
         self.reload_status_table("Approved", self.tbl_approved)
 
     def open_rejected(self):
         """Open rejected requests page"""
-        self.stack.setCurrentWidget(self.page_rejected)
+        self.show_page("rejected")
         self.reload_status_table("Rejected", self.tbl_rejected)
 
-    def reload_inbox(self):
+    def open_diagnostics(self):
+        """Open the query diagnostics page (admins only)"""
+        if self.user["role"] != "admin":
+            return
+        self.show_page("diagnostics")
+        self.update_diagnostics()
+        self.diagnostics_timer.start(self.DIAGNOSTICS_INTERVAL_MS)
+
+    # -------- Table loaders (query in background, populate on the GUI thread) --------
+    def load_home_stats(self, silent: bool = False):
+        """Fetch the dashboard counters for the home page in the background"""
+        if not hasattr(self, 'lbl_home_stats'):
+            return
+        self.executor.submit(
+            "home_stats", self.db.get_dashboard_stats, self.user,
+            on_result=self.populate_home_stats,
+            on_error=partial(self.home_stats_failed, silent=silent),
+        )
+
+    def populate_home_stats(self, stats: dict):
+        """Replace the home page placeholders with the dashboard counters"""
+        if self.user["role"] == "admin":
+            if self.is_final_stage_admin():
+                # For final-stage admins, show approved requests awaiting process completion
+                text = f"Pending for your stage: {stats['pending_for_stage']} | Ready for Process Done: {stats['ready_for_process']} | Total Approved: {stats['approved']} | Total Rejected: {stats['rejected']}"
+            else:
+                text = f"Pending for your stage: {stats['pending_for_stage']} | Total Approved: {stats['approved']} | Total Rejected: {stats['rejected']}"
+            self.lbl_home_stats.setStyleSheet("font-size: 14px; color: #6b7280;")
+        else:
+            text = f"Your Requests - Pending: {stats['pending']} | Approved: {stats['approved']} | Rejected: {stats['rejected']}"
+            self.lbl_home_stats.setStyleSheet("font-size: 14px; color: #6b7280; margin-bottom: 8px;")
+            unread_notifications = stats['unread']
+            self.lbl_home_unread.setText(f"You have {unread_notifications} unread notifications")
+            self.lbl_home_unread.setVisible(unread_notifications > 0)
+        self.lbl_home_stats.setText(text)
+
+        if self.startup_report['home_stats_ms'] is None:
+            self.startup_report['home_stats_ms'] = (time.perf_counter() - self.startup_started) * 1000
+            log.info("Dashboard stats shown %.0f ms after login", self.startup_report['home_stats_ms'])
+
+    def home_stats_failed(self, error, silent: bool = False):
+        """Keep showing the last counters after a silent refresh fails; otherwise show the error"""
+        if silent and not self.lbl_home_stats.text().startswith("Loading"):
+            log.warning("Failed to refresh dashboard stats: %s", error)
+            return
+        what = "stats" if self.user["role"] == "admin" else "your activity"
+        self.lbl_home_stats.setText(f"Error loading {what}: {error}")
+        self.lbl_home_stats.setStyleSheet("font-size: 14px; color: #dc2626;")
+
+    def reload_inbox(self, silent: bool = False):
         """Reload inbox notifications with proper approval status display"""
         if self.user["role"] != "user":
             return
-            
-        try:
-            # Use the new method that joins with submissions to get status
-            notifications = self.db.get_user_notifications_with_status(self.user['id'])
-            headers = ["Submission ID", "Message", "Approval Status", "Current Stage", "Read Status", "Date", "Mark Read"]
-            
-            # Clear the table first
-            self.tbl_inbox.clear()
-            self.tbl_inbox.setRowCount(len(notifications))
-            self.tbl_inbox.setColumnCount(len(headers))
-            self.tbl_inbox.setHorizontalHeaderLabels(headers)
-            self.tbl_inbox.verticalHeader().setVisible(False)
-            self.tbl_inbox.setEditTriggers(QTableWidget.NoEditTriggers)
-            self.tbl_inbox.setSelectionBehavior(QTableWidget.SelectRows)
-            self.tbl_inbox.setSelectionMode(QTableWidget.SingleSelection)
-            self.tbl_inbox.setWordWrap(True)
-            self.tbl_inbox.setAlternatingRowColors(True)
-            
-            for r, notification in enumerate(notifications):
-                notif_id, sub_id, message, is_read, created_at, status, stage = notification
-                
-                # Submission ID
-                self.tbl_inbox.setItem(r, 0, QTableWidgetItem(str(sub_id)))
-                
-                # Message (truncate if too long)
-                display_msg = message[:80] + "..." if len(message) > 80 else message
-                msg_item = QTableWidgetItem(display_msg)
-                if not is_read:
-                    msg_item.setData(Qt.TextColorRole, "#1f2937")
-                    font = msg_item.font()
-                    font.setBold(True)
-                    msg_item.setFont(font)
-                self.tbl_inbox.setItem(r, 1, msg_item)
-                
-                # Approval Status with color coding
-                status_item = QTableWidgetItem(status)
-                if status == "Approved":
-                    status_item.setData(Qt.TextColorRole, "#10b981")
-                    font = status_item.font()
-                    font.setBold(True)
-                    status_item.setFont(font)
-                elif status == "Rejected":
-                    status_item.setData(Qt.TextColorRole, "#dc2626")
-                    font = status_item.font()
-                    font.setBold(True)
-                    status_item.setFont(font)
-                elif status == "Pending":
-                    status_item.setData(Qt.TextColorRole, "#f59e0b")
-                    font = status_item.font()
-                    font.setBold(True)
-                    status_item.setFont(font)
-                self.tbl_inbox.setItem(r, 2, status_item)
-                
-                # Current Stage
-                stage_text = f"Stage {stage}" if status == "Pending" else f"Final: {stage}"
-                stage_item = QTableWidgetItem(stage_text)
-                self.tbl_inbox.setItem(r, 3, stage_item)
-                
-                # Read Status
-                read_status_item = QTableWidgetItem("New" if not is_read else "Read")
-                if not is_read:
-                    read_status_item.setData(Qt.TextColorRole, "#dc2626")
-                    font = read_status_item.font()
-                    font.setBold(True)
-                    read_status_item.setFont(font)
-                else:
-                    read_status_item.setData(Qt.TextColorRole, "#6b7280")
-                self.tbl_inbox.setItem(r, 4, read_status_item)
-                
-                # Date
-                date_str = str(created_at)
-                if hasattr(created_at, 'strftime'):
-                    date_str = created_at.strftime("%Y-%m-%d %H:%M")
-                self.tbl_inbox.setItem(r, 5, QTableWidgetItem(date_str))
 
-                # Mark Read button or indicator
-                if not is_read:
-                    btn_read = QPushButton("Mark Read")
-                    btn_read.setStyleSheet("""
-                        QPushButton {
-                            background-color: #10b981;
-                            color: #fff;
-                            border-radius: 6px;
-                            padding: 6px 12px;
-                            font-size: 12px;
-                            border: none;
-                        }
-                        QPushButton:hover {
-                            background-color: #059669;
-                        }
-                    """)
-                    btn_read.clicked.connect(partial(self.mark_read, notif_id))
-                    self.tbl_inbox.setCellWidget(r, 6, btn_read)
-                else:
-                    read_item = QTableWidgetItem("Read")
-                    read_item.setData(Qt.TextColorRole, "#6b7280")
-                    self.tbl_inbox.setItem(r, 6, read_item)
+        # Use the method that joins with submissions to get status
+        self.executor.submit(
+            "inbox", self.db.get_user_notifications_with_status, self.user['id'],
+            on_result=self.populate_inbox,
+            on_error=partial(self.report_error, "Failed to load notifications", silent=silent),
+        )
 
-            self.tbl_inbox.resizeColumnsToContents()
-            self.tbl_inbox.horizontalHeader().setStretchLastSection(True)
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to load notifications: {str(e)}")
+    def populate_inbox(self, notifications):
+        """Fill the inbox table"""
+        show_rows(self.tbl_inbox, notifications)
 
-    def reload_my_requests(self):
+    def reload_my_requests(self, silent: bool = False):
         """Reload user's own requests"""
         if self.user["role"] != "user":
             return
-            
-        try:
-            requests = self.db.get_user_submissions(self.user['id'])
-            headers = ["ID", "Name", "Reg No", "Status", "Stage", "Created", "Last Updated"]
-            populate_table(self.tbl_my_requests, headers, requests)
-            
-            for r, request in enumerate(requests):
-                req_id, name, reg, reason, status, stage, created, updated = request
-                
-                self.tbl_my_requests.setItem(r, 0, QTableWidgetItem(str(req_id)))
-                self.tbl_my_requests.setItem(r, 1, QTableWidgetItem(name))
-                self.tbl_my_requests.setItem(r, 2, QTableWidgetItem(reg))
-                
-                # Color-code status
-                status_item = QTableWidgetItem(status)
-                if status == "Approved":
-                    status_item.setData(Qt.TextColorRole, "#10b981")
-                    font = status_item.font()
-                    font.setBold(True)
-                    status_item.setFont(font)
-                elif status == "Rejected":
-                    status_item.setData(Qt.TextColorRole, "#dc2626")
-                    font = status_item.font()
-                    font.setBold(True)
-                    status_item.setFont(font)
-                elif status == "Pending":
-                    status_item.setData(Qt.TextColorRole, "#f59e0b")
-                    font = status_item.font()
-                    font.setBold(True)
-                    status_item.setFont(font)
-                self.tbl_my_requests.setItem(r, 3, status_item)
-                
-                stage_text = f"Stage {stage}" if status == "Pending" else f"Final: {stage}"
-                self.tbl_my_requests.setItem(r, 4, QTableWidgetItem(stage_text))
-                
-                # Format dates
-                created_str = str(created)
-                updated_str = str(updated)
-                if hasattr(created, 'strftime'):
-                    created_str = created.strftime("%Y-%m-%d %H:%M")
-                if hasattr(updated, 'strftime'):
-                    updated_str = updated.strftime("%Y-%m-%d %H:%M")
-                    
-                self.tbl_my_requests.setItem(r, 5, QTableWidgetItem(created_str))
-                self.tbl_my_requests.setItem(r, 6, QTableWidgetItem(updated_str))
 
-            self.tbl_my_requests.resizeColumnsToContents()
-            self.tbl_my_requests.horizontalHeader().setStretchLastSection(True)
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to load your requests: {str(e)}")
+        pager = self.pagers["my_requests"]
+        self.executor.submit(
+            "my_requests", self.db.get_user_submissions, self.user['id'],
+            after_id=pager.after_id, limit=pager.fetch_limit,
+            on_result=self.populate_my_requests,
+            on_error=partial(self.report_error, "Failed to load your requests", silent=silent),
+        )
 
-    def reload_pending(self):
+    def populate_my_requests(self, requests):
+        """Fill the my requests table"""
+        self.loaded_keys.add("my_requests")
+        show_rows(self.tbl_my_requests, self.accept_page("my_requests", requests))
+
+    def reload_pending(self, silent: bool = False):
         """Reload pending approvals table"""
         if self.user["role"] != "admin":
             return
@@ -1926,271 +5230,242 @@ class MainApp(QWidget):
         if not stage:
             QMessageBox.warning(self, "Error", "Admin stage not configured.")
             return
-            
-        try:
-            rows = self.db.get_pending_for_stage(stage)
-            headers = ["ID", "Name", "Reg No", "Reason", "Stage", "Created At", "Approve", "Reject"]
-            populate_table(self.tbl_pending, headers, rows)
-            
-            for r, row in enumerate(rows):
-                sub_id, name, reg, reason, approval_stage, created_at = row
-                self.tbl_pending.setItem(r, 0, QTableWidgetItem(str(sub_id)))
-                self.tbl_pending.setItem(r, 1, QTableWidgetItem(name))
-                self.tbl_pending.setItem(r, 2, QTableWidgetItem(reg))
-                self.tbl_pending.setItem(r, 3, QTableWidgetItem(reason))
-                self.tbl_pending.setItem(r, 4, QTableWidgetItem(str(approval_stage)))
-                
-                # Format date
-                created_str = str(created_at)
-                if hasattr(created_at, 'strftime'):
-                    created_str = created_at.strftime("%Y-%m-%d %H:%M")
-                self.tbl_pending.setItem(r, 5, QTableWidgetItem(created_str))
-
-                btn_approve = QPushButton("✅ Approve")
-                btn_approve.setStyleSheet("""
-                    QPushButton {
-                        background-color: #10b981;
-                        color: #fff;
-                        border-radius: 6px;
-                        padding: 8px 16px;
-                        font-weight: bold;
-                        border: none;
-                    }
-                    QPushButton:hover {
-                        background-color: #059669;
-                    }
-                """)
-                btn_approve.clicked.connect(partial(self.approve_submission, sub_id))
-                self.tbl_pending.setCellWidget(r, 6, btn_approve)
-
-                btn_reject = QPushButton("❌ Reject")
-                btn_reject.setStyleSheet("""
-                    QPushButton {
-                        background-color: #dc2626;
-                        color: #fff;
-                        border-radius: 6px;
-                        padding: 8px 16px;
-                        font-weight: bold;
-                        border: none;
-                    }
-                    QPushButton:hover {
-                        background-color: #b91c1c;
-                    }
-                """)
-                btn_reject.clicked.connect(partial(self.reject_submission, sub_id))
-                self.tbl_pending.setCellWidget(r, 7, btn_reject)
-
-            self.tbl_pending.resizeColumnsToContents()
-            self.tbl_pending.horizontalHeader().setStretchLastSection(True)
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to load pending requests: {str(e)}")
 
-    def reload_process_done(self):
-        """Reload process done table (Stage 4 admin only)"""
-        if self.user["role"] != "admin" or self.user.get("stage") != 4:
+        pager = self.pagers["pending"]
+        self.executor.submit(
+            "pending", self.db.get_pending_for_stage, stage,
+            after_id=pager.after_id, limit=pager.fetch_limit,
+            on_result=self.populate_pending,
+            on_error=partial(self.report_error, "Failed to load pending requests", silent=silent),
+        )
+
+    def populate_pending(self, rows):
+        """Fill the pending approvals table"""
+        self.loaded_keys.add("pending")
+        show_rows(self.tbl_pending, self.accept_page("pending", rows))
+
+    def reload_process_done(self, silent: bool = False):
+        """Reload process done table (final-stage admins only)"""
+        if not self.is_final_stage_admin():
             return
-            
-        try:
-            rows = self.db.get_approved_for_stage4_admin()
-            headers = ["ID", "Name", "Reg No", "Reason", "Final Stage", "Approved At", "Process Done"]
-            populate_table(self.tbl_process_done, headers, rows)
-            
-            for r, row in enumerate(rows):
-                sub_id, name, reg, reason, approval_stage, created_at = row
-                self.tbl_process_done.setItem(r, 0, QTableWidgetItem(str(sub_id)))
-                self.tbl_process_done.setItem(r, 1, QTableWidgetItem(name))
-                self.tbl_process_done.setItem(r, 2, QTableWidgetItem(reg))
-                self.tbl_process_done.setItem(r, 3, QTableWidgetItem(reason))
-                self.tbl_process_done.setItem(r, 4, QTableWidgetItem(str(approval_stage)))
-                
-                # Format date
-                created_str = str(created_at)
-                if hasattr(created_at, 'strftime'):
-                    created_str = created_at.strftime("%Y-%m-%d %H:%M")
-                self.tbl_process_done.setItem(r, 5, QTableWidgetItem(created_str))
-
-                btn_process_done = QPushButton("🎉 Process Done")
-                btn_process_done.setStyleSheet("""
-                    QPushButton {
-                        background-color: #7c3aed;
-                        color: #fff;
-                        border-radius: 6px;
-                        padding: 8px 16px;
-                        font-weight: bold;
-                        border: none;
-                    }
-                    QPushButton:hover {
-                        background-color: #6d28d9;
-                    }
-                """)
-                btn_process_done.clicked.connect(partial(self.mark_process_done, sub_id))
-                self.tbl_process_done.setCellWidget(r, 6, btn_process_done)
-
-            self.tbl_process_done.resizeColumnsToContents()
-            self.tbl_process_done.horizontalHeader().setStretchLastSection(True)
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to load process done requests: {str(e)}")
-
-    def reload_status_table(self, status: str, table: QTableWidget):
-        """Reload a status table (Approved/Rejected)"""
-        try:
-            rows = self.db.get_by_status(status)
-            headers = ["ID", "Name", "Reg No", "Reason", "Final Stage", "Created At"]
-            populate_table(table, headers, rows)
-            
-            for r, row in enumerate(rows):
-                sub_id, name, reg, reason, approval_stage, created_at = row
-                table.setItem(r, 0, QTableWidgetItem(str(sub_id)))
-                table.setItem(r, 1, QTableWidgetItem(name))
-                table.setItem(r, 2, QTableWidgetItem(reg))
-                table.setItem(r, 3, QTableWidgetItem(reason))
-                table.setItem(r, 4, QTableWidgetItem(str(approval_stage)))
-                
-                # Format date
-                created_str = str(created_at)
-                if hasattr(created_at, 'strftime'):
-                    created_str = created_at.strftime("%Y-%m-%d %H:%M")
-                table.setItem(r, 5, QTableWidgetItem(created_str))
-                
-            table.resizeColumnsToContents()
-            table.horizontalHeader().setStretchLastSection(True)
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to load {status.lower()} requests: {str(e)}")
 
+        pager = self.pagers["process_done"]
+        self.executor.submit(
+            "process_done", self.db.get_approved_for_stage4_admin,
+            after_id=pager.after_id, limit=pager.fetch_limit, workflow_ids=self.process_done_workflows(),
+            on_result=self.populate_process_done,
+            on_error=partial(self.report_error, "Failed to load process done requests", silent=silent),
+        )
+
+    def populate_process_done(self, rows):
+        """Fill the process done table"""
+        self.loaded_keys.add("process_done")
+        show_rows(self.tbl_process_done, self.accept_page("process_done", rows))
+
+    def reload_status_table(self, status: str, table: QTableView, silent: bool = False):
+        """Restart streaming a status table (Approved/Rejected) from the newest row"""
+        self.loaded_keys.add(f"status:{status}")
+        table.model().start(
+            partial(self.db.open_status_stream, status),
+            on_error=partial(self.report_error, f"Failed to load {status.lower()} requests", silent=silent),
+        )
+
+    # -------- Submission actions --------
     def approve_submission(self, submission_id: int):
-        """Approve a submission"""
-        try:
-            row = self.db.get_submission(submission_id)
-            if not row:
-                QMessageBox.warning(self, "Error", "Submission not found.")
-                return
-                
-            _, _, name, _, _, status, stage, _ = row
-            if status != "Pending":
-                QMessageBox.information(self, "Info", "This request is no longer pending.")
-                self.reload_pending()
-                return
-                
-            # Move to next stage or mark as approved (now 4 stages)
-            if stage < 4:
-                self.db.update_stage(submission_id, stage + 1)
-                QMessageBox.information(self, "Success", f"✅ Request for {name} moved to Stage {stage + 1}.\n\nUsers and other admins will see this update instantly!")
-            else:
-                self.db.update_status(submission_id, "Approved")
+        """Approve a submission pending at this admin's stage"""
+        self.executor.submit(
+            ("approve", submission_id), self.db.approve_submission, submission_id, self.user['stage'],
+            on_result=self.on_submission_approved,
+            on_error=partial(self.report_error, "Failed to approve request"),
+        )
+
+    def on_submission_approved(self, row):
+        """Report the outcome of an approval"""
+        if not row:
+            QMessageBox.information(self, "Info", "This request is no longer pending.")
+        else:
+            _, _, name, _, stage, status = row
+            if status == "Approved":
                 QMessageBox.information(self, "Success", f"🎉 Request for {name} has been fully approved!\n\nThe user will receive instant notification on all their devices!")
-                
-            self.reload_pending()
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to approve request: {str(e)}")
+            else:
+                QMessageBox.information(self, "Success", f"✅ Request for {name} moved to Stage {stage}.\n\nUsers and other admins will see this update instantly!")
+        self.refresh_deltas()
 
-    def reject_submission(self, submission_id: int):
+    def reject_submission(self, submission_id: int, name: str):
         """Reject a submission"""
-        try:
-            row = self.db.get_submission(submission_id)
-            if not row:
-                QMessageBox.warning(self, "Error", "Submission not found.")
-                return
-                
-            _, _, name, _, _, status, _, _ = row
-            if status != "Pending":
-                QMessageBox.information(self, "Info", "This request is no longer pending.")
-                self.reload_pending()
-                return
-                
-            reply = QMessageBox.question(
-                self, "Confirm Rejection", 
-                f"Are you sure you want to reject the request from {name}?\n\nThe user will receive instant notification on all their devices.",
-                QMessageBox.Yes | QMessageBox.No
+        reply = QMessageBox.question(
+            self, "Confirm Rejection", 
+            f"Are you sure you want to reject the request from {name}?\n\nThe user will receive instant notification on all their devices.",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        
+        if reply == QMessageBox.Yes:
+            self.executor.submit(
+                ("reject", submission_id), self.db.reject_submission, submission_id, self.user['stage'],
+                on_result=self.on_submission_rejected,
+                on_error=partial(self.report_error, "Failed to reject request"),
             )
-            
-            if reply == QMessageBox.Yes:
-                self.db.update_status(submission_id, "Rejected")
-                QMessageBox.information(self, "Success", f"❌ Request from {name} has been rejected.\n\nThe user will receive instant notification on all their devices!")
-                self.reload_pending()
-                
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to reject request: {str(e)}")
 
-    def mark_process_done(self, submission_id: int):
+    def on_submission_rejected(self, row):
+        """Report the outcome of a rejection"""
+        if not row:
+            QMessageBox.information(self, "Info", "This request is no longer pending.")
+        else:
+            QMessageBox.information(self, "Success", f"❌ Request from {row[2]} has been rejected.\n\nThe user will receive instant notification on all their devices!")
+        self.refresh_deltas()
+
+    def mark_process_done(self, submission_id: int, name: str, reg: str):
         """Mark a process as completed and notify user"""
-        try:
-            row = self.db.get_submission(submission_id)
-            if not row:
-                QMessageBox.warning(self, "Error", "Submission not found.")
-                return
-                
-            _, _, name, reg, _, status, _, _ = row
-            if status != "Approved":
-                QMessageBox.information(self, "Info", "This request is not approved.")
-                self.reload_process_done()
-                return
-                
-            reply = QMessageBox.question(
-                self, "Confirm Process Completion", 
-                f"Mark the bonafide certificate process as completed for:\n\nName: {name}\nReg No: {reg}\n\nThis will instantly notify the student on all their devices that their certificate is ready for collection.",
-                QMessageBox.Yes | QMessageBox.No
+        reply = QMessageBox.question(
+            self, "Confirm Process Completion", 
+            f"Mark the bonafide certificate process as completed for:\n\nName: {name}\nReg No: {reg}\n\nThis will instantly notify the student on all their devices that their certificate is ready for collection.",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        
+        if reply == QMessageBox.Yes:
+            self.executor.submit(
+                ("process_done", submission_id), self.db.mark_process_completed, submission_id,
+                on_result=self.on_process_done,
+                on_error=partial(self.report_error, "Failed to mark process as done"),
             )
-            
-            if reply == QMessageBox.Yes:
-                self.db.mark_process_completed(submission_id)
-                QMessageBox.information(self, "Success", f"🎉 Process marked as completed!\n\n{name} has been instantly notified on all devices that their bonafide certificate is ready for collection!")
-                self.reload_process_done()
-                
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to mark process as done: {str(e)}")
+
+    def on_process_done(self, row):
+        """Report the outcome of a process completion"""
+        if not row:
+            QMessageBox.information(self, "Info", "This request is not awaiting process completion.")
+        else:
+            QMessageBox.information(self, "Success", f"🎉 Process marked as completed!\n\n{row[2]} has been instantly notified on all devices that their bonafide certificate is ready for collection!")
+        self.refresh_deltas()
+
+    # -------- Bulk actions --------
+    def selected_rows(self, table: QTableView):
+        """Get the selected rows of a table, in selection order"""
+        model = table.model()
+        return [model.row_at(index.row()) for index in table.selectionModel().selectedRows()]
+
+    def selected_submission_ids(self, table: QTableView):
+        """Get the submission ids of the selected rows"""
+        return [row[0] for row in self.selected_rows(table)]
+
+    def approve_selected(self):
+        """Approve every selected pending request after one confirmation"""
+        ids = self.selected_submission_ids(self.tbl_pending)
+        if not ids:
+            QMessageBox.information(self, "Info", "Select one or more requests first.")
+            return
+        reply = QMessageBox.question(
+            self, "Confirm Approval",
+            f"Approve {len(ids)} selected request(s) at Stage {self.user['stage']}?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply == QMessageBox.Yes:
+            self.executor.submit(
+                "bulk_approve", self.db.approve_many, ids, self.user['stage'],
+                on_result=lambda rows: self.on_bulk_done("approved", len(ids), rows),
+                on_error=partial(self.report_error, "Failed to approve requests"),
+            )
+
+    def reject_selected(self):
+        """Reject every selected pending request after one confirmation"""
+        ids = self.selected_submission_ids(self.tbl_pending)
+        if not ids:
+            QMessageBox.information(self, "Info", "Select one or more requests first.")
+            return
+        reply = QMessageBox.question(
+            self, "Confirm Rejection",
+            f"Are you sure you want to reject {len(ids)} selected request(s)?\n\nThe users will receive instant notification on all their devices.",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply == QMessageBox.Yes:
+            self.executor.submit(
+                "bulk_reject", self.db.reject_many, ids, self.user['stage'],
+                on_result=lambda rows: self.on_bulk_done("rejected", len(ids), rows),
+                on_error=partial(self.report_error, "Failed to reject requests"),
+            )
+
+    def mark_selected_process_done(self):
+        """Mark every selected approved request as process completed after one confirmation"""
+        ids = self.selected_submission_ids(self.tbl_process_done)
+        if not ids:
+            QMessageBox.information(self, "Info", "Select one or more requests first.")
+            return
+        reply = QMessageBox.question(
+            self, "Confirm Process Completion",
+            f"Mark the bonafide certificate process as completed for {len(ids)} selected request(s)?\n\nEach student will be notified that their certificate is ready for collection.",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply == QMessageBox.Yes:
+            self.executor.submit(
+                "bulk_process_done", self.db.mark_process_completed_many, ids,
+                on_result=lambda rows: self.on_bulk_done("marked as completed", len(ids), rows),
+                on_error=partial(self.report_error, "Failed to mark processes as done"),
+            )
+
+    def on_bulk_done(self, verb: str, requested: int, rows):
+        """Summarise a bulk action and merge the changes into the tables"""
+        message = f"{len(rows)} request(s) {verb}."
+        skipped = requested - len(rows)
+        if skipped:
+            message += f"\n{skipped} request(s) had already been handled by someone else and were skipped."
+        QMessageBox.information(self, "Success", message)
+        self.refresh_deltas()
 
     def mark_read(self, notification_id: int):
         """Mark a notification as read"""
-        try:
-            self.db.mark_notification_read(notification_id)
-            self.reload_inbox()
-            self.update_inbox_badge()
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to mark notification as read: {str(e)}")
+        self.executor.submit(
+            ("mark_read", notification_id), self.db.mark_notification_read, notification_id,
+            on_result=lambda _: self.on_notification_read(),
+            on_error=partial(self.report_error, "Failed to mark notification as read"),
+        )
+
+    def on_notification_read(self):
+        """Refresh the inbox after a notification was marked read"""
+        self.reload_inbox()
+        self.update_inbox_badge()
 
     def update_inbox_badge(self):
         """Update the inbox button badge"""
         if self.user["role"] == "user" and hasattr(self, 'btn_inbox'):
-            try:
-                unread_count = self.db.get_unread_count(self.user['id'])
-                inbox_text = f"Inbox ({unread_count})" if unread_count > 0 else "Inbox"
-                self.btn_inbox.setText(inbox_text)
-                
-                if unread_count > 0:
-                    self.btn_inbox.setStyleSheet("""
-                        QPushButton {
-                            background-color: #dc2626;
-                            color: #fff;
-                            border-radius: 8px;
-                            font-weight: bold;
-                            border: none;
-                            padding: 12px 16px;
-                        }
-                        QPushButton:hover {
-                            background-color: #b91c1c;
-                        }
-                    """)
-                else:
-                    self.btn_inbox.setStyleSheet("""
-                        QPushButton {
-                            background-color: transparent;
-                            color: #e5e7eb;
-                            text-align: left;
-                            padding: 12px 16px;
-                            border: none;
-                            border-radius: 8px;
-                            font-size: 14px;
-                        }
-                        QPushButton:hover {
-                            background-color: #374151;
-                        }
-                    """)
-            except Exception as e:
-                print(f"Error updating inbox badge: {e}")
+            self.executor.submit(
+                "badge", self.db.get_unread_count, self.user['id'],
+                on_result=self.set_inbox_badge,
+                on_error=partial(self.report_error, "Failed to update inbox badge", silent=True),
+            )
+
+    def set_inbox_badge(self, unread_count: int):
+        """Show the unread notification count on the inbox button"""
+        inbox_text = f"Inbox ({unread_count})" if unread_count > 0 else "Inbox"
+        self.btn_inbox.setText(inbox_text)
+        
+        if unread_count > 0:
+            self.btn_inbox.setStyleSheet("""
+                QPushButton {
+                    background-color: #dc2626;
+                    color: #fff;
+                    border-radius: 8px;
+                    font-weight: bold;
+                    border: none;
+                    padding: 12px 16px;
+                }
+                QPushButton:hover {
+                    background-color: #b91c1c;
+                }
+            """)
+        else:
+            self.btn_inbox.setStyleSheet("""
+                QPushButton {
+                    background-color: transparent;
+                    color: #e5e7eb;
+                    text-align: left;
+                    padding: 12px 16px;
+                    border: none;
+                    border-radius: 8px;
+                    font-size: 14px;
+                }
+                QPushButton:hover {
+                    background-color: #374151;
+                }
+            """)
 
     def logout(self):
         """Logout and return to login window"""
@@ -2204,16 +5479,159 @@ class MainApp(QWidget):
 
     def closeEvent(self, event):
         """Handle window close event"""
-        # Stop the refresh timer when closing
+        # Stop the refresh timer and change listener when closing
         if hasattr(self, 'refresh_timer'):
             self.refresh_timer.stop()
+        self.push_refresh_timer.stop()
+        self.diagnostics_timer.stop()
+        if getattr(self, 'listener', None) is not None:
+            self.listener.stop()
+        # Results still in flight have nowhere to go once the window is closed
+        for status, table in self.status_tables():
+            table.model().close()
+        self.executor.cancel_all()
+        if self.certificate_renderer is not None:
+            self.certificate_renderer.shutdown(wait=False)
+            try:
+                self.serial_allocator.release()
+            except Exception as e:
+                # The block stays open in the log; its unused numbers remain a visible gap
+                self.report_error("Failed to release certificate serials", e, silent=True)
         event.accept()
 
+    # -------- Certificates --------
+    def issue_certificates(self, submission_ids):
+        """Issue certificates for approved submissions and record them on their rows (runs in the background).
+
+        Fields are read from the database rather than the tables, whose
+        reasons may be cut short; a submission that already has a certificate
+        keeps its serial and issue date, so its stored PDF is reused as is.
+        Serials are claimed before rendering: a request another admin (or an
+        earlier click) numbered first is printed with that number, and the
+        serials it would have used go back to this session's block.
+        """
+        rows = self.db.get_certificate_sources(submission_ids)
+        # Serials come from this session's reserved block, without a query per certificate
+        unnumbered = [row[0] for row in rows if row[6] is None]
+        if unnumbered:
+            issued_at = datetime.now()
+            self.serial_allocator.take(
+                len(unnumbered),
+                lambda serials: len(self.db.claim_certificate_serials(unnumbered, serials, issued_at)),
+            )
+            rows = self.db.get_certificate_sources(submission_ids)
+        rows = [row for row in rows if row[6] is not None]
+        certificates = self.certificate_renderer.render_batch(
+            [(*row[:4], row[6]) for row in rows],
+            {row[0]: row[5] for row in rows},
+        )
+        stored = {row[0]: row for row in rows}
+        changed = [(submission_id, digest, stored[submission_id][6])
+                   for submission_id, digest, issued_at, path in certificates
+                   if stored[submission_id][4] != digest]
+        if changed:
+            self.db.record_certificates(changed)
+        return certificates
+
+    def start_certificate_renderer(self):
+        if self.certificate_renderer is None:
+            self.certificate_renderer = CertificateRenderer()
+            self.serial_allocator = SerialAllocator(
+                self.db, f"{self.user['username']}@{socket.gethostname()}:{os.getpid()}")
+
+    def generate_selected_certificates(self):
+        """Issue a bonafide certificate PDF for every selected approved request"""
+        ids = self.selected_submission_ids(self.tbl_process_done)
+        if not ids:
+            QMessageBox.information(self, "Info", "Select one or more requests first.")
+            return
+        self.start_certificate_renderer()
+        started = time.perf_counter()
+        self.executor.submit(
+            "certificates", self.issue_certificates, ids,
+            on_result=lambda certificates: self.on_certificates_generated(certificates, time.perf_counter() - started),
+            on_error=partial(self.report_error, "Failed to generate certificates"),
+        )
+
+    def on_certificates_generated(self, certificates, seconds: float):
+        """Report where a certificate batch was written"""
+        rate = len(certificates) / seconds if seconds else 0
+        log.info("Issued %d certificates in %.2fs (%.0f/s)", len(certificates), seconds, rate)
+        QMessageBox.information(
+            self, "Certificates Ready",
+            f"📄 {len(certificates)} certificate(s) saved to:\n{self.certificate_renderer.output_dir}\n\n"
+            f"Issued in {seconds:.1f}s ({rate:.0f} per second)."
+        )
+
+    def preview_certificates(self, submission_ids):
+        """Render certificates to look at without issuing them (runs in the background).
+
+        An issued certificate comes back exactly as issued, from the store; an
+        unissued request gets a draft with no serial, and nothing is recorded.
+        """
+        rows = self.db.get_certificate_sources(submission_ids)
+        return self.certificate_renderer.render_batch(
+            [(*row[:4], row[6]) for row in rows],
+            {row[0]: row[5] for row in rows if row[6] is not None},
+        )
+
+    def open_selected_certificate(self, table: QTableView):
+        """Open the certificate of the selected request, or a draft if it was never issued"""
+        ids = self.selected_submission_ids(table)[:1]
+        if not ids:
+            QMessageBox.information(self, "Info", "Select a request first.")
+            return
+        self.start_certificate_renderer()
+        self.executor.submit(
+            "certificate_preview", self.preview_certificates, ids,
+            on_result=self.show_certificate,
+            on_error=partial(self.report_error, "Failed to open certificate"),
+        )
+
+    def show_certificate(self, certificates):
+        """Open a previewed certificate in the system PDF viewer"""
+        if not certificates:
+            QMessageBox.information(self, "Info", "Certificates are only issued for approved requests.")
+            return
+        QDesktopServices.openUrl(QUrl.fromLocalFile(certificates[0][3]))
+
+    # -------- Diagnostics --------
+    def update_diagnostics(self):
+        """Show the current query metrics, pool and cache statistics"""
+        metrics = self.db.metrics
+        pool = ", ".join(f"{name}: {value}" for name, value in self.db.pool_stats().items())
+        cache = self.db.submission_cache.stats()
+        text = (
+            f"Connections — {pool}\n"
+            f"Submission cache — {cache['size']}/{cache['max_size']} rows, "
+            f"hit rate {cache['hit_rate']:.0%}, {cache['evictions']} evictions\n"
+            f"Slow queries (≥ {metrics.slow_query_ms:g} ms) — {metrics.slow_queries}, "
+            f"logged to '{slow_query_log.name}' with arguments redacted\n"
+            f"Startup — window usable {self.startup_report['usable_ms'] or 0:.0f} ms after login"
+        )
+        if self.serial_allocator is not None:
+            serials = self.serial_allocator.stats()
+            text += (f"\nCertificate serials — {serials['assigned']} assigned from {serials['blocks']} block(s), "
+                     f"{serials['left_in_block']} left in the current block")
+        self.lbl_diagnostics.setText(text)
+        show_rows(self.tbl_diagnostics, metrics.snapshot())
+
+    def set_slow_query_threshold(self, milliseconds: int):
+        self.db.metrics.slow_query_ms = milliseconds
+        self.update_diagnostics()
+
+    def reset_diagnostics(self):
+        self.db.metrics.reset()
+        self.update_diagnostics()
+
 
 # ========================
 # Entry Point
 # ========================
 if __name__ == "__main__":
+    # Must come first: frozen certificate worker processes start here too
+    multiprocessing.freeze_support()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     app = QApplication(sys.argv)
     
     # Set application-wide style
@@ -2232,7 +5650,7 @@ if __name__ == "__main__":
         login.show()
         sys.exit(app.exec_())
     except Exception as e:
-        print(f"Failed to start application: {e}")
+        log.exception("Failed to start application")
         QMessageBox.critical(None, "Application Error", f"Failed to start application:\n{str(e)}")
         sys.exit(1)
 
@@ -0,0 +1,45 @@
+"""SerialAllocator giving serials back when a claim does not keep them all."""
+import pytest
+
+from mk import SerialAllocator
+
+
+class FakeSerialBlocks:
+    """allocate/release_serial_block over blocks of three serials"""
+    def __init__(self):
+        self.blocks = []
+        self.released = []
+
+    def allocate_serial_block(self, client):
+        first = 3 * len(self.blocks) + 1
+        self.blocks.append(client)
+        return len(self.blocks), first, first + 2
+
+    def release_serial_block(self, block_id, unused_from):
+        self.released.append((block_id, unused_from))
+
+
+def test_claim_keeping_some_gives_the_rest_back():
+    db = FakeSerialBlocks()
+    allocator = SerialAllocator(db, "test")
+    # 1-3 come from the first block, 4 from a second one that stays current
+    assert allocator.take(4, claim=lambda serials: 2) == [1, 2]
+    assert allocator.assigned == 2
+    assert db.released == [(1, 3)]
+    assert allocator.take(1) == [4]
+
+
+def test_claim_raising_gives_every_serial_back():
+    db = FakeSerialBlocks()
+    allocator = SerialAllocator(db, "test")
+    assert allocator.take(2) == [1, 2]
+
+    def claim(serials):
+        raise RuntimeError("claim failed")
+
+    # 3 comes from the first block, 4 and 5 from a second one
+    with pytest.raises(RuntimeError, match="claim failed"):
+        allocator.take(3, claim=claim)
+    assert allocator.assigned == 2
+    assert db.released == [(1, 3)]
+    assert allocator.take(2, claim=len) == [4, 5]